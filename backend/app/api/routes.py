@@ -1,20 +1,41 @@
 """REST API routes"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime, timedelta
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from app.api.serialization import ARTICLE_COLUMNS, article_dict, article_dicts
+from app.core.config import settings
+from app.core.components import components, requires
+from app.db.database import get_async_db
 from app.db.models import Article, SearchQuery
+from app.db.counts import category_counts
+from app.db.pagination import paginate
+from app.db.search import full_text_search
+from app.db.entities import cooccurrence_cache, entity_articles, find_entities, top_entities
 from app.schemas.schemas import (
     ArticleResponse, QueryRequest, RAGResponse, SummarizeRequest, SentimentAnalysisResponse,
-    TrendingTopicsResponse, HeadlinesResponse, ErrorResponse
+    TrendingTopicsResponse, HeadlinesResponse, ErrorResponse, BatchSummarizeRequest,
+    BatchSummarizeResponse, ArticleSummary, SearchResponse, EmergingTopicResponse,
+    EntityResponse, RelatedEntityResponse, EntityArticlesResponse, StoriesResponse,
+    ProfileSummaryResponse
 )
-from app.rag.pipeline import retriever
-from app.rag.llm import rag_engine
-from app.nlp.processors import SentimentAnalyzer, TrendAnalyzer
+from app.rag import pipeline as rag_pipeline
+from app.rag import llm as rag_llm
+from app.rag import summaries
+from app.rag.pipeline import article_id_from_chunk_id
+from app.rag.summaries import summary_is_fresh, store_summary
+from app.nlp import trends
+from app.nlp.stories import recent_stories
 from app.core.logging import logger
+from app.core.metrics import rag_stage_seconds, record_cache_lookup
+from app.core.profiling import PROFILE_ID_PATTERN, list_profiles
+from app.core.security import require_admin_token
 from app.core.exceptions import NoRelevantDocumentsFound
+import os
 import uuid
 
 router = APIRouter(prefix="/api", tags=["news"])
@@ -30,78 +51,133 @@ async def health_check():
     }
 
 
-@router.get("/news/headlines", response_model=HeadlinesResponse)
+@router.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and the event loop responds"""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: READY_COMPONENTS loaded; includes every component's state"""
+    ready = components.is_ready(settings.READY_COMPONENTS)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "starting", "components": components.status()}
+    )
+
+
+@router.get(
+    "/news/headlines",
+    response_model=HeadlinesResponse,
+    dependencies=[Depends(requires("database"))]
+)
 async def get_headlines(
     category: str = Query("general", description="News category"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get top headlines by category"""
     try:
-        skip = (page - 1) * page_size
-        
-        query = db.query(Article)
+        stmt = select(*ARTICLE_COLUMNS)
         if category and category != "all":
-            query = query.filter(Article.category == category)
+            stmt = stmt.where(Article.category == category)
         
-        total_count = query.count()
-        articles = query.order_by(desc(Article.published_at)).offset(skip).limit(page_size).all()
+        total_count = await category_counts.get(db, category)
+        articles, next_cursor = await paginate(db, stmt, page=page, page_size=page_size, cursor=cursor)
         
-        return HeadlinesResponse(
-            articles=[ArticleResponse.from_orm(a) for a in articles],
-            total_count=total_count,
-            page=page,
-            page_size=page_size
-        )
+        return ORJSONResponse({
+            "articles": article_dicts(articles),
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to fetch headlines: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch headlines")
 
 
-@router.get("/news/category/{category}", response_model=HeadlinesResponse)
+@router.get(
+    "/news/category/{category}",
+    response_model=HeadlinesResponse,
+    dependencies=[Depends(requires("database"))]
+)
 async def get_news_by_category(
     category: str,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get news articles by category"""
     try:
-        skip = (page - 1) * page_size
+        stmt = select(*ARTICLE_COLUMNS).where(Article.category == category)
+        total_count = await category_counts.get(db, category)
+        articles, next_cursor = await paginate(db, stmt, page=page, page_size=page_size, cursor=cursor)
         
-        query = db.query(Article).filter(Article.category == category)
-        total_count = query.count()
-        articles = query.order_by(desc(Article.published_at)).offset(skip).limit(page_size).all()
-        
-        return HeadlinesResponse(
-            articles=[ArticleResponse.from_orm(a) for a in articles],
-            total_count=total_count,
-            page=page,
-            page_size=page_size
-        )
+        return ORJSONResponse({
+            "articles": article_dicts(articles),
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to fetch category news: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch news")
 
 
-@router.post("/ai/query", response_model=RAGResponse)
+async def log_search_query(
+    db: AsyncSession,
+    query: str,
+    result_count: int,
+    response_time_ms: float,
+    cached: bool = False
+) -> None:
+    """Record a search query for analytics"""
+    db.add(SearchQuery(
+        id=str(uuid.uuid4()),
+        query=query,
+        result_count=result_count,
+        response_time_ms=response_time_ms,
+        cached=int(cached)
+    ))
+    await db.commit()
+
+
+@router.post(
+    "/ai/query",
+    response_model=RAGResponse,
+    dependencies=[Depends(requires("database", "retriever", "rag_engine"))]
+)
 async def query_with_rag(
     request: QueryRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Answer question using RAG"""
     try:
+        rag_engine = rag_llm.rag_engine
+        retriever = rag_pipeline.retriever
         if not rag_engine or not retriever:
             raise HTTPException(status_code=500, detail="RAG engine not initialized")
         
         start_time = datetime.utcnow()
         
-        # Retrieve relevant documents
+        # Retrieve relevant chunks (embedding and FAISS search are CPU-bound).
+        # Cross-encoder ranking is precise enough to send fewer chunks to the LLM.
+        top_k = settings.RERANK_CONTEXT_CHUNKS if retriever.reranks else settings.RAG_TOP_K
         try:
-            retrieved_docs, scores = retriever.retrieve(
+            results = await run_in_threadpool(
+                retriever.retrieve,
                 request.query,
-                top_k=5,
+                top_k=top_k,
                 similarity_threshold=0.3
             )
         except NoRelevantDocumentsFound:
@@ -113,27 +189,31 @@ async def query_with_rag(
             )
         
         # Fetch full articles
-        articles = db.query(Article).filter(Article.id.in_(retrieved_docs)).all()
+        with rag_stage_seconds.time("db_fetch"):
+            article_ids = list(dict.fromkeys(article_id_from_chunk_id(chunk_id) for chunk_id, _ in results))
+            articles = (await db.execute(
+                select(Article).where(Article.id.in_(article_ids))
+            )).scalars().all()
         
         # Format context for LLM
-        context = "\n\n".join([
-            f"Source: {a.source}\nTitle: {a.title}\nContent: {a.content[:500]}"
-            for a in articles
-        ])
+        with rag_stage_seconds.time("context_build"):
+            context = "\n\n".join([
+                f"Source: {a.source}\nTitle: {a.title}\nContent: {(a.content or '')[:500]}"
+                for a in articles
+            ])
         
         # Generate answer using LLM
-        result = rag_engine.answer_query(request.query, context)
+        with rag_stage_seconds.time("llm_generate"):
+            result = await run_in_threadpool(rag_engine.answer_query, request.query, context)
         
-        # Log search query
-        query_record = SearchQuery(
-            id=str(uuid.uuid4()),
-            query=request.query,
+        response_time = (datetime.utcnow() - start_time).total_seconds()
+        rag_stage_seconds.observe(response_time, "total")
+        await log_search_query(
+            db,
+            request.query,
             result_count=len(articles),
-            response_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
-            cached=0
+            response_time_ms=response_time * 1000
         )
-        db.add(query_record)
-        db.commit()
         
         return RAGResponse(
             answer=result["answer"],
@@ -146,76 +226,221 @@ async def query_with_rag(
         raise HTTPException(status_code=500, detail="Query processing failed")
 
 
-@router.get("/news/search")
+@router.get(
+    "/news/search",
+    response_model=SearchResponse,
+    dependencies=[Depends(requires("database"))]
+)
 async def search_articles(
     q: str = Query(..., min_length=1, max_length=100),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Search articles by keyword"""
+    """Search articles by keyword, ranked by relevance"""
     try:
-        skip = (page - 1) * page_size
-        
-        # Simple full-text search
-        query = db.query(Article).filter(
-            (Article.title.ilike(f"%{q}%")) |
-            (Article.content.ilike(f"%{q}%"))
-        )
-        
-        total_count = query.count()
-        articles = query.order_by(desc(Article.published_at)).offset(skip).limit(page_size).all()
-        
-        return HeadlinesResponse(
-            articles=[ArticleResponse.from_orm(a) for a in articles],
-            total_count=total_count,
+        hits, total_count, next_cursor = await full_text_search(
+            db,
+            q,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            count_cap=settings.SEARCH_COUNT_CAP,
+            columns=ARTICLE_COLUMNS
         )
+        
+        return ORJSONResponse({
+            "articles": [
+                {**article_dict(hit.article), "score": hit.score, "snippet": hit.snippet}
+                for hit in hits
+            ],
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Search failed: {e}")
         raise HTTPException(status_code=500, detail="Search failed")
 
 
-@router.get("/trending/topics", response_model=list[TrendingTopicsResponse])
+@router.get(
+    "/trending/topics",
+    response_model=list[TrendingTopicsResponse],
+    dependencies=[Depends(requires("database"))]
+)
 async def get_trending_topics(
     hours: int = Query(24, ge=1, le=168),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get trending topics"""
+    """Get trending topics over the last `hours` hourly buckets"""
     try:
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        articles = db.query(Article).filter(
-            Article.published_at >= cutoff_time
-        ).all()
+        rollup = trends.trend_rollup
+        await rollup.refresh(db)
+        return rollup.top_topics(hours)
+    except Exception as e:
+        logger.error(f"Failed to fetch trending topics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch trends")
+
+
+@router.get(
+    "/trending/emerging",
+    response_model=list[EmergingTopicResponse],
+    dependencies=[Depends(requires("database", "burst_detector"))]
+)
+async def get_emerging_topics(
+    limit: int = Query(20, ge=1, le=100),
+    min_count: float = Query(3.0, ge=0, description="Minimum recent mentions"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get topics and entities whose mention rate is bursting above baseline"""
+    burst_detector = await trends.refresh_burst_detector(db)
+    if not burst_detector:
+        raise HTTPException(status_code=500, detail="Trend engine not initialized")
+    
+    return burst_detector.emerging(limit=limit, min_count=min_count)
+
+
+@router.get(
+    "/stories",
+    response_model=StoriesResponse,
+    dependencies=[Depends(requires("database"))]
+)
+async def get_stories(
+    hours: int = Query(24, ge=1, le=168),
+    min_articles: int = Query(1, ge=1, description="Only stories covered this many times"),
+    limit: int = Query(20, ge=1, le=100),
+    articles_per_story: int = Query(5, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get recent stories, each grouping the articles covering one event"""
+    try:
+        stories, next_cursor = await recent_stories(
+            db, hours=hours, min_articles=min_articles, limit=limit,
+            articles_per_story=articles_per_story, cursor=cursor, columns=ARTICLE_COLUMNS
+        )
         
-        trends = TrendAnalyzer.detect_trending_topics(
-            [ArticleResponse.from_orm(a).model_dump() for a in articles],
-            time_window_hours=hours
+        return ORJSONResponse({
+            "stories": [{**story, "articles": article_dicts(story["articles"])} for story in stories],
+            "next_cursor": next_cursor,
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to fetch stories: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch stories")
+
+
+@router.get(
+    "/entities/top",
+    response_model=list[EntityResponse],
+    dependencies=[Depends(requires("database"))]
+)
+async def get_top_entities(
+    hours: Optional[int] = Query(None, ge=1, le=720, description="Window; all time if omitted"),
+    entity_type: Optional[str] = Query(None, alias="type", description="PERSON, ORG, GPE, ..."),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the most mentioned entities"""
+    try:
+        return await top_entities(db, hours=hours, entity_type=entity_type, limit=limit)
+    except Exception as e:
+        logger.error(f"Failed to fetch top entities: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch entities")
+
+
+@router.get(
+    "/entities/{name}/articles",
+    response_model=EntityArticlesResponse,
+    dependencies=[Depends(requires("database"))]
+)
+async def get_entity_articles(
+    name: str,
+    entity_type: Optional[str] = Query(None, alias="type", description="PERSON, ORG, GPE, ..."),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get articles mentioning an entity, newest first"""
+    try:
+        entities = await find_entities(db, name, entity_type)
+        if not entities:
+            raise HTTPException(status_code=404, detail="Entity not found")
+        
+        articles, next_cursor = await entity_articles(
+            db, [e.id for e in entities], page=page, page_size=page_size, cursor=cursor, columns=ARTICLE_COLUMNS
         )
         
-        return trends
+        return ORJSONResponse({
+            "articles": article_dicts(articles),
+            "total_count": sum(e.article_count for e in entities),
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "entities": [
+                {"name": e.name, "entity_type": e.entity_type, "article_count": e.article_count}
+                for e in entities
+            ],
+        })
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Failed to fetch trending topics: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch trends")
+        logger.error(f"Failed to fetch entity articles: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch entity articles")
 
 
-@router.post("/ai/summarize", response_model=dict)
+@router.get(
+    "/entities/{name}/related",
+    response_model=list[RelatedEntityResponse],
+    dependencies=[Depends(requires("database"))]
+)
+async def get_related_entities(
+    name: str,
+    entity_type: Optional[str] = Query(None, alias="type", description="PERSON, ORG, GPE, ..."),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get entities most often mentioned alongside an entity"""
+    try:
+        entities = await find_entities(db, name, entity_type)
+        if not entities:
+            raise HTTPException(status_code=404, detail="Entity not found")
+        
+        return await cooccurrence_cache.related(db, [e.id for e in entities], limit=limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch related entities: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch related entities")
+
+
+@router.post("/ai/summarize", response_model=dict, dependencies=[Depends(requires("database", "rag_engine"))])
 async def summarize_article(
     request: SummarizeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Summarize an article"""
     try:
+        rag_engine = rag_llm.rag_engine
         if not rag_engine:
             raise HTTPException(status_code=500, detail="LLM engine not initialized")
         
-        article = db.query(Article).filter(Article.id == request.article_id).first()
+        article = await db.get(Article, request.article_id)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
         
-        # Use cached summary if available
-        if article.summary:
+        # Use cached summary if it matches the current content
+        fresh = summary_is_fresh(article)
+        record_cache_lookup("summary", fresh)
+        if fresh:
             return {
                 "article_id": article.id,
                 "summary": article.summary,
@@ -223,14 +448,15 @@ async def summarize_article(
             }
         
         # Generate summary
-        summary = rag_engine.summarize_article(
+        summary = await run_in_threadpool(
+            rag_engine.summarize_article,
             article.content,
             max_length=request.max_length or 300
         )
         
         # Cache summary
-        article.summary = summary
-        db.commit()
+        store_summary(article, summary)
+        await db.commit()
         
         return {
             "article_id": article.id,
@@ -244,14 +470,75 @@ async def summarize_article(
         raise HTTPException(status_code=500, detail="Summarization failed")
 
 
-@router.get("/ai/sentiment/{article_id}", response_model=SentimentAnalysisResponse)
+@router.post(
+    "/ai/summarize/batch",
+    response_model=BatchSummarizeResponse,
+    dependencies=[Depends(requires("database", "summary_precomputer"))]
+)
+async def summarize_articles_batch(
+    request: BatchSummarizeRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Summarize several articles, serving precomputed summaries where possible"""
+    try:
+        precomputer = summaries.summary_precomputer
+        if not precomputer:
+            raise HTTPException(status_code=500, detail="LLM engine not initialized")
+        
+        article_ids = list(dict.fromkeys(request.article_ids))
+        articles = (await db.execute(
+            select(Article).where(Article.id.in_(article_ids))
+        )).scalars().all()
+        found = {a.id: a for a in articles}
+        cached_ids = {a.id for a in articles if summary_is_fresh(a)}
+        
+        # Only cache misses reach the LLM provider
+        generated = await precomputer.summarize_articles(
+            articles,
+            max_length=request.max_length or 300
+        )
+        if generated:
+            await db.commit()
+        
+        results = []
+        failed = []
+        for article_id in article_ids:
+            article = found.get(article_id)
+            if article is None:
+                continue
+            if not summary_is_fresh(article):
+                failed.append(article_id)
+                continue
+            results.append(ArticleSummary(
+                article_id=article_id,
+                summary=article.summary,
+                cached=article_id in cached_ids
+            ))
+        
+        return BatchSummarizeResponse(
+            summaries=results,
+            missing=[a for a in article_ids if a not in found],
+            failed=failed
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch summarization failed: {e}")
+        raise HTTPException(status_code=500, detail="Summarization failed")
+
+
+@router.get(
+    "/ai/sentiment/{article_id}",
+    response_model=SentimentAnalysisResponse,
+    dependencies=[Depends(requires("database"))]
+)
 async def get_sentiment(
     article_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get sentiment analysis for article"""
     try:
-        article = db.query(Article).filter(Article.id == article_id).first()
+        article = await db.get(Article, article_id)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
         
@@ -266,3 +553,23 @@ async def get_sentiment(
     except Exception as e:
         logger.error(f"Sentiment analysis failed: {e}")
         raise HTTPException(status_code=500, detail="Sentiment analysis failed")
+
+
+@router.get(
+    "/admin/profiles",
+    response_model=list[ProfileSummaryResponse],
+    dependencies=[Depends(require_admin_token)]
+)
+async def get_profiles(limit: int = Query(50, ge=1, le=500)):
+    """List stored request profiles, newest first"""
+    profiles = await run_in_threadpool(list_profiles)
+    return profiles[:limit]
+
+
+@router.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin_token)])
+async def get_profile_stacks(profile_id: str = Path(..., pattern=PROFILE_ID_PATTERN)):
+    """Collapsed stacks of a profile, for flamegraph.pl or speedscope"""
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.folded")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -0,0 +1,27 @@
+"""
+Fast JSON responses for article listings
+
+List endpoints select only the columns ArticleResponse exposes and return
+the rows as plain dicts in an ORJSONResponse, which encodes them straight
+to bytes: no per-row pydantic model, no response validation and no
+jsonable_encoder pass. The JSON is the same the response models produce;
+the response_model on each route still documents the shape.
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence
+from app.db.models import Article
+from app.schemas.schemas import ArticleResponse
+
+# ArticleResponse fields, in its serialization order, and their columns
+ARTICLE_FIELDS = tuple(ArticleResponse.model_fields)
+ARTICLE_COLUMNS = tuple(getattr(Article, name) for name in ARTICLE_FIELDS)
+
+
+def article_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """ArticleResponse dict of a row selected with ARTICLE_COLUMNS (values in that order)"""
+    return dict(zip(ARTICLE_FIELDS, row))
+
+
+def article_dicts(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """article_dict of each row"""
+    return [dict(zip(ARTICLE_FIELDS, row)) for row in rows]
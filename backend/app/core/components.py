@@ -0,0 +1,199 @@
+"""Parallel, dependency-ordered loading of application components"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.logging import logger
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+class ComponentUnavailable(Exception):
+    """Raised when a component failed to load or is still loading"""
+    pass
+
+
+class Component:
+    """A named loader and the state of its single run"""
+
+    def __init__(self, name: str, loader: Callable[[], Any], depends_on: Sequence[str]):
+        self.name = name
+        self.loader = loader
+        self.depends_on = tuple(depends_on)
+        self.future: Future = Future()
+        self.state = PENDING
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class ComponentRegistry:
+    """
+    Loads components on a thread pool as soon as their dependencies are ready
+
+    Model loads (embedding model, FAISS index, cross-encoder, LLM client)
+    are mostly I/O and native code, so they overlap well in threads. The
+    app starts serving immediately; routes await only the components they
+    use, and /api/health/ready reports the readiness components.
+    """
+
+    def __init__(self, max_workers: int = settings.STARTUP_WORKERS):
+        """Initialize registry"""
+        self.max_workers = max_workers
+        self._components: Dict[str, Component] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def register(self, name: str, loader: Callable[[], Any], depends_on: Sequence[str] = ()) -> None:
+        """Add a component; its loader runs once all of depends_on loaded"""
+        with self._lock:
+            if self._executor is not None:
+                raise RuntimeError("Cannot register components after start()")
+            self._components[name] = Component(name, loader, depends_on)
+
+    def start(self, max_workers: Optional[int] = None) -> None:
+        """Begin loading every registered component; returns immediately"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            missing = {
+                dep for c in self._components.values() for dep in c.depends_on
+                if dep not in self._components
+            }
+            if missing:
+                raise ValueError(f"Unregistered component dependencies: {sorted(missing)}")
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers or self.max_workers, thread_name_prefix="component-loader"
+            )
+        self._schedule_dependents()
+
+    def _load(self, component: Component) -> None:
+        start = time.perf_counter()
+        try:
+            value = component.loader()
+        except BaseException as e:
+            component.seconds = time.perf_counter() - start
+            component.error = str(e) or type(e).__name__
+            component.state = FAILED
+            logger.error(f"Component {component.name} failed to load: {component.error}")
+            component.future.set_exception(ComponentUnavailable(f"{component.name} failed to load"))
+        else:
+            component.seconds = time.perf_counter() - start
+            component.state = READY
+            logger.info(f"Component {component.name} ready in {component.seconds:.2f}s")
+            component.future.set_result(value)
+        self._schedule_dependents()
+
+    def _schedule_dependents(self) -> None:
+        """Submit pending components whose dependencies have all loaded"""
+        to_submit = []
+        with self._lock:
+            changed = True
+            while changed:  # failures cascade through chains of dependents
+                changed = False
+                for component in self._components.values():
+                    if component.state != PENDING:
+                        continue
+                    deps = [self._components[name] for name in component.depends_on]
+                    failed = [dep.name for dep in deps if dep.state == FAILED]
+                    if failed:
+                        component.state = FAILED
+                        component.error = f"dependency failed: {', '.join(failed)}"
+                        component.future.set_exception(
+                            ComponentUnavailable(f"{component.name} unavailable ({component.error})")
+                        )
+                        changed = True
+                    elif all(dep.state == READY for dep in deps):
+                        component.state = LOADING
+                        to_submit.append(component)
+        for component in to_submit:
+            self._executor.submit(self._load, component)
+
+    def get(self, name: str) -> Any:
+        """Loaded value of a ready component"""
+        component = self._components.get(name)
+        if component is None or component.state != READY:
+            raise ComponentUnavailable(f"{name} is not loaded")
+        return component.future.result()
+
+    def is_ready(self, names: Iterable[str]) -> bool:
+        return all(
+            name in self._components and self._components[name].state == READY
+            for name in names
+        )
+
+    async def wait_for(self, names: Sequence[str], timeout: float) -> None:
+        """
+        Wait until every named component is ready
+
+        Before start() nothing is loading (scripts and tests set the module
+        globals themselves), so this returns at once and the route's own
+        checks apply.
+
+        Raises:
+            ComponentUnavailable: a component failed, is not registered, or
+            did not load within timeout seconds
+        """
+        if self._executor is None or self.is_ready(names):
+            return
+
+        futures = []
+        for name in names:
+            component = self._components.get(name)
+            if component is None:
+                raise ComponentUnavailable(f"{name} is not loaded")
+            # Shielded so a timed-out waiter cannot cancel the shared load
+            futures.append(asyncio.shield(asyncio.wrap_future(component.future)))
+        try:
+            await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except asyncio.TimeoutError:
+            loading = [name for name in names if not self.is_ready([name])]
+            raise ComponentUnavailable(f"Still loading: {', '.join(loading)}")
+
+    def wait_all(self, timeout: Optional[float] = None) -> None:
+        """Block until every component settled (scripts and benchmarks)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for component in list(self._components.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                component.future.result(remaining)
+            except ComponentUnavailable:
+                pass
+            except TimeoutError:
+                return
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """State, load time and error of every component"""
+        return {
+            c.name: {
+                "state": c.state,
+                "seconds": round(c.seconds, 3) if c.seconds is not None else None,
+                "error": c.error,
+            }
+            for c in self._components.values()
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def requires(*names: str, timeout: float = settings.COMPONENT_WAIT_SECONDS) -> Callable:
+    """Route dependency: wait for components, or 503 if they are unavailable"""
+    async def wait_for_components() -> None:
+        try:
+            await components.wait_for(names, timeout)
+        except ComponentUnavailable as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": str(settings.COMPONENT_RETRY_AFTER_SECONDS)}
+            )
+    return wait_for_components
+
+
+# Global instance (components are registered in app.main)
+components = ComponentRegistry()
@@ -1,19 +1,43 @@
 """Logging configuration"""
 
+import atexit
+import json
 import logging
 import logging.handlers
 import os
+import queue
 from app.core.config import settings
+from app.core.metrics import registry
+
+# Handlers doing I/O run on the listener thread; request paths only enqueue
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Plain text for application logs, one JSON object per access record"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        access = getattr(record, "access", None)
+        if isinstance(access, dict):
+            return json.dumps({
+                "time": self.formatTime(record, self.datefmt),
+                "logger": record.name,
+                **access
+            })
+        return super().format(record)
 
 
 def setup_logging():
     """Configure application logging"""
-    
-    # Create logs directory if not exists
-    os.makedirs(os.path.dirname(settings.LOG_FILE), exist_ok=True)
+    global _listener
     
     # Get logger
     logger = logging.getLogger("ai_news_intelligence")
+    if _listener is not None:
+        return logger
+    
+    # Create logs directory if not exists
+    os.makedirs(os.path.dirname(settings.LOG_FILE), exist_ok=True)
     logger.setLevel(settings.LOG_LEVEL)
     
     # File handler
@@ -27,7 +51,7 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     
     # Formatter
-    formatter = logging.Formatter(
+    formatter = StructuredFormatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
@@ -35,11 +59,45 @@ def setup_logging():
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Enqueue records; a listener thread writes them to the handlers
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_stop_listener)
+    os.register_at_fork(after_in_child=_restart_listener)
     
     return logger
 
 
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener():
+    """Forked workers inherit the queue handler but not the listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    for handler in logging.getLogger("ai_news_intelligence").handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
 logger = setup_logging()
+access_logger = logger.getChild("access")
+
+registry.gauge(
+    "log_queue_depth",
+    "Log records waiting for the listener thread",
+    lambda: _listener.queue.qsize() if _listener else None
+)
@@ -0,0 +1,311 @@
+"""In-process metrics with Prometheus text exposition"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+from app.core.profiling import current_profile
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond FAISS lookups up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _ThreadLocalMetric:
+    """
+    Base for metrics whose hot path never takes a lock
+
+    Every thread writes to its own shard, created on the thread's first
+    observation (the only time the registration lock is taken). A scrape sums
+    the shards; reading another thread's counters while it writes can miss an
+    in-flight observation, which the next scrape picks up.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], list]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, ...], list]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        """Exposition lines for this metric"""
+        raise NotImplementedError
+
+
+class Counter(_ThreadLocalMetric):
+    """Monotonic counter"""
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = [0.0]
+        cell[0] += amount
+
+    def value(self, *labels: str) -> float:
+        """Current total across threads"""
+        return self._merged().get(labels, [0.0])[0]
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        totals: Dict[Tuple[str, ...], list] = {}
+        for shard in list(self._shards):
+            for labels, cell in list(shard.items()):
+                totals.setdefault(labels, [0.0])[0] += cell[0]
+        return totals
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, labels)} {_format_value(cell[0])}"
+            for labels, cell in sorted(self._merged().items())
+        ]
+
+
+class Histogram(_ThreadLocalMetric):
+    """Bucketed distribution of observed values"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            cell = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the wall time of the block in seconds"""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        """Number of observations across threads"""
+        cell = self._merged().get(labels)
+        return cell[-1] if cell else 0
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        totals: Dict[Tuple[str, ...], list] = {}
+        for shard in list(self._shards):
+            for labels, cell in list(shard.items()):
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(cell)
+                else:
+                    for i, value in enumerate(cell):
+                        total[i] += value
+        return totals
+
+    def collect(self) -> List[str]:
+        lines = []
+        for labels, cell in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), cell):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(cell[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cell[-1]}")
+        return lines
+
+
+class _Timer:
+    """
+    Histogram timer; a plain class is cheaper than @contextmanager
+
+    Inside a profiled request the block is also recorded as a span, and
+    the thread running it is sampled by the request's profiler.
+    """
+
+    __slots__ = ("histogram", "labels", "start", "profile")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.profile = current_profile.get()
+        if self.profile is not None:
+            self.profile.attach()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed, *self.labels)
+        if self.profile is not None:
+            self.profile.add_span(":".join(self.labels), elapsed)
+            self.profile.detach()
+
+
+class Gauge:
+    """
+    Point-in-time value read at scrape time
+
+    The callback returns a number, or a dict mapping label-value tuples to
+    numbers. Returning None (component not initialized) omits the sample.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], object],
+        labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def collect(self) -> List[str]:
+        value = self.callback()
+        if value is None:
+            return []
+        samples = value if isinstance(value, dict) else {(): value}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(sample)}"
+            for labels, sample in sorted(samples.items())
+            if sample is not None
+        ]
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a scrape"""
+
+    def __init__(self):
+        """Initialize registry"""
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric; re-registering a name returns the existing one"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], object],
+        labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, callback, labelnames))
+
+    def render(self) -> str:
+        """Prometheus text format (0.0.4) for every registered metric"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.collect()
+            except Exception:
+                # A broken gauge callback must not take the whole scrape down
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the metrics shared across modules
+registry = MetricsRegistry()
+
+rag_stage_seconds = registry.histogram(
+    "rag_stage_duration_seconds",
+    "Time spent in each stage of a RAG query",
+    labelnames=("stage",)
+)
+ingestion_stage_seconds = registry.histogram(
+    "ingestion_stage_duration_seconds",
+    "Time spent in each stage of ingestion (per article for clean and ner)",
+    labelnames=("stage",)
+)
+cache_lookups = registry.counter(
+    "cache_lookups",
+    "Cache lookups by cache and result (hit or miss)",
+    labelnames=("cache", "result")
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count one cache hit or miss"""
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+
+
+def cache_hit_ratios() -> Dict[Tuple[str], float]:
+    """Hits over lookups since start for every cache looked up so far"""
+    lookups: Dict[str, List[float]] = {}
+    for (cache, result), cell in cache_lookups._merged().items():
+        lookups.setdefault(cache, [0.0, 0.0])[result == "hit"] += cell[0]
+    return {(cache,): hit / (hit + miss) for cache, (miss, hit) in lookups.items()}
+
+
+registry.gauge(
+    "cache_hit_ratio",
+    "Cache hits over lookups since process start",
+    cache_hit_ratios,
+    labelnames=("cache",)
+)
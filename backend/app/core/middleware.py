@@ -1,79 +1,263 @@
-"""Rate limiting middleware"""
+"""Rate limiting, response caching and request logging middleware (pure ASGI)"""
 
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-import redis
+import random
 import time
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
-from app.core.logging import logger
+from app.core.logging import access_logger, logger
+from app.core.profiling import Profile, current_profile
+from app.core.ratelimit import RateLimiter
+from app.core.response_cache import ResponseCache, cache_key, etag_matches, response_cache
+from app.core.security import is_admin_token
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Rate limiting middleware using Redis"""
     
-    def __init__(self, app, redis_url: str = None):
+    def __init__(self, app: ASGIApp, redis_url: str = None, redis_client=None, limiter: RateLimiter = None):
         """Initialize rate limiter"""
-        super().__init__(app)
-        try:
-            self.redis_client = redis.from_url(redis_url or settings.REDIS_URL)
-            self.enabled = settings.RATE_LIMIT_ENABLED
-            logger.info("Rate limiting middleware initialized")
-        except Exception as e:
-            logger.warning(f"Failed to initialize Redis: {e}. Rate limiting disabled.")
-            self.redis_client = None
-            self.enabled = False
+        self.app = app
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        if limiter is None:
+            if redis_client is None:
+                import redis.asyncio as aioredis
+                
+                # Connections are lazy; a down Redis switches the limiter to memory
+                redis_client = aioredis.from_url(
+                    redis_url or settings.REDIS_URL,
+                    socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS
+                )
+            limiter = RateLimiter(redis_client)
+        self.limiter = limiter
+        logger.info("Rate limiting middleware initialized")
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Rate limit incoming requests"""
-        if not self.enabled or not self.redis_client:
-            return await call_next(request)
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not self.enabled or path in settings.RATE_LIMIT_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        try:
-            # Get client identifier (IP or API key)
-            client_id = request.headers.get("x-api-key") or request.client.host
-            
-            # Check rate limit
-            key = f"rate_limit:{client_id}"
-            current = self.redis_client.get(key)
-            
-            if current and int(current) >= settings.RATE_LIMIT_REQUESTS:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Too many requests. Please try again later."
-                )
-            
-            # Increment counter
-            if current:
-                self.redis_client.incr(key)
-            else:
-                self.redis_client.setex(key, settings.RATE_LIMIT_WINDOW_SECONDS, 1)
+        # Get client identifier (API key or IP)
+        client = scope.get("client")
+        client_id = Headers(scope=scope).get("x-api-key") or (client[0] if client else "unknown")
+        result = await self.limiter.check(client_id, path)
+        headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+        }
+        
+        if not result.allowed:
+            headers["Retry-After"] = str(max(1, int(result.retry_after + 0.999)))
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Too many requests. Please try again later."},
+                headers=headers
+            )
+            await response(scope, receive, send)
+            return
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve GET responses of RESPONSE_CACHE_ROUTES from the response cache
+    
+    Responses carry a strong ETag naming the cache entry and a
+    Cache-Control max-age; a matching If-None-Match is answered with 304
+    before the cache or the route is consulted. Only 200 responses are
+    stored. Add it inside the rate limiter so cached requests still count.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: ResponseCache = None,
+        routes: dict = None,
+        max_age_seconds: int = settings.RESPONSE_CACHE_MAX_AGE_SECONDS,
+        max_body_bytes: int = settings.RESPONSE_CACHE_MAX_BODY_BYTES
+    ):
+        """Initialize middleware (defaults to the global cache and RESPONSE_CACHE_ROUTES)"""
+        self.app = app
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.cache = cache or response_cache
+        routes = settings.RESPONSE_CACHE_ROUTES if routes is None else routes
+        # Longest prefix first
+        self.route_ttls = sorted(routes.items(), key=lambda item: len(item[0]), reverse=True)
+        self.max_age_seconds = max_age_seconds
+        self.max_body_bytes = max_body_bytes
+    
+    def ttl_for(self, path: str):
+        for prefix, ttl_seconds in self.route_ttls:
+            if path.startswith(prefix):
+                return ttl_seconds
+        return None
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer from the cache, or run the route and store its response"""
+        ttl_seconds = self.ttl_for(scope.get("path", "")) if scope["type"] == "http" else None
+        if not self.enabled or ttl_seconds is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        
+        key = cache_key(
+            scope["path"], scope.get("query_string", b"").decode("latin-1"),
+            await self.cache.generation(), ttl_seconds
+        )
+        headers = {"ETag": f'"{key}"', "Cache-Control": f"public, max-age={min(self.max_age_seconds, ttl_seconds)}"}
+        
+        if etag_matches(Headers(scope=scope).get("if-none-match"), headers["ETag"]):
+            await Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)(scope, receive, send)
+            return
+        
+        cached = await self.cache.get(key)
+        if cached is not None:
+            media_type, body = cached
+            await Response(body, media_type=media_type, headers={**headers, "X-Cache": "HIT"})(scope, receive, send)
+            return
+        
+        response = {"status": None, "media_type": None, "chunks": [], "bytes": 0}
+        
+        async def send_and_store(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if message["status"] == status.HTTP_200_OK:
+                    response_headers = MutableHeaders(scope=message)
+                    response_headers.update({**headers, "X-Cache": "MISS"})
+                    response["media_type"] = response_headers.get("content-type", "application/json")
+                await send(message)
+                return
             
-            response = await call_next(request)
-            return response
-        except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
-            return await call_next(request)
+            await send(message)
+            if message["type"] != "http.response.body" or response["status"] != status.HTTP_200_OK:
+                return
+            body = message.get("body", b"")
+            response["bytes"] += len(body)
+            if response["bytes"] > self.max_body_bytes:
+                response["status"] = None  # too large to cache
+                return
+            response["chunks"].append(body)
+            if not message.get("more_body", False):
+                await self.cache.set(key, response["media_type"], b"".join(response["chunks"]), ttl_seconds)
+        
+        await self.app(scope, receive, send_and_store)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests and responses"""
+class RequestLoggingMiddleware:
+    """Log one structured access record per request"""
+    
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware"""
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next):
-        """Log request details"""
-        import time
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Time the request and record status and response size"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        start_time = time.time()
+        start_time = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
         
-        # Log request
-        logger.info(f"{request.method} {request.url.path}")
+        async def send_and_record(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
         
-        response = await call_next(request)
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            client = scope.get("client")
+            access_logger.info(
+                f"{scope['method']} {scope['path']} {response['status']} {duration_ms:.1f}ms",
+                extra={"access": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": response["status"],
+                    "duration_ms": round(duration_ms, 2),
+                    "bytes": response["bytes"],
+                    "client": client[0] if client else None,
+                }}
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Sample-profile opted-in requests
+    
+    A request is profiled when it sends "X-Profile: 1" with a valid
+    X-Admin-Token (or DEBUG is on), or when it falls in the sampled share of
+    PROFILE_PATH_PREFIXES traffic. Profiled responses carry a Server-Timing
+    header with the span breakdown and X-Profile-Id naming the stored
+    collapsed stacks. Only add it when profiling is configured; other
+    requests then pay a header scan.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.PROFILE_SAMPLE_RATE,
+        path_prefixes: list = settings.PROFILE_PATH_PREFIXES,
+        profile_dir: str = settings.PROFILE_DIR
+    ):
+        """Initialize middleware"""
+        self.app = app
+        self.sample_rate = sample_rate
+        self.path_prefixes = tuple(path_prefixes)
+        self.profile_dir = profile_dir
+    
+    def wants_profile(self, scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        if headers.get("x-profile") == "1" and (settings.DEBUG or is_admin_token(headers.get("x-admin-token"))):
+            return True
+        return (
+            self.sample_rate > 0
+            and scope["path"].startswith(self.path_prefixes)
+            and random.random() < self.sample_rate
+        )
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Profile the request if it opted in or was sampled"""
+        if scope["type"] != "http" or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
         
-        # Log response
-        process_time = time.time() - start_time
-        logger.info(f"Status: {response.status_code} | Time: {process_time:.2f}s")
+        profile = Profile(scope["method"], scope["path"])
         
-        return response
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.stop()
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+                headers.append("X-Profile-Id", profile.profile_id)
+            await send(message)
+        
+        token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            profile.stop()
+            current_profile.reset(token)
+            try:
+                await run_in_threadpool(profile.save, self.profile_dir)
+            except OSError as e:
+                logger.warning(f"Failed to store profile {profile.profile_id}: {e}")
 
 
 class CORSMiddleware:
@@ -0,0 +1,174 @@
+"""Opt-in sampling profiler for individual requests"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+PROFILE_ID_PATTERN = r"^[0-9a-f]{32}$"
+
+# Profile of the request running in this context; contextvars follow the
+# request into run_in_threadpool workers
+current_profile: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+
+
+def collapse_stack(frame) -> str:
+    """Root-first "function (file:line);..." stack in collapsed-stack format"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profile:
+    """
+    Wall-clock stack samples and span timings for one request
+
+    A sampler thread snapshots the stacks of the threads working on the
+    request every interval_ms: the event loop thread, plus any worker
+    thread while it is inside a span. The loop thread is shared, so its
+    samples include other requests running concurrently.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        interval_ms: float = settings.PROFILE_INTERVAL_MS
+    ):
+        """Initialize profile"""
+        self.profile_id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.interval = interval_ms / 1000
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.spans: List[Tuple[str, float]] = []
+        self.samples: Counter = Counter()
+        self._threads: Dict[int, Tuple[str, int]] = {}  # thread id -> (label, span depth)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._start = 0.0
+
+    def attach(self, label: Optional[str] = None) -> None:
+        """Sample the calling thread until the matching detach()"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            name, depth = self._threads.get(thread_id, (label or threading.current_thread().name, 0))
+            self._threads[thread_id] = (name, depth + 1)
+
+    def detach(self) -> None:
+        thread_id = threading.get_ident()
+        with self._lock:
+            name, depth = self._threads.get(thread_id, ("", 1))
+            if depth <= 1:
+                self._threads.pop(thread_id, None)
+            else:
+                self._threads[thread_id] = (name, depth - 1)
+
+    def add_span(self, name: str, seconds: float) -> None:
+        self.spans.append((name, seconds))
+
+    def start(self) -> None:
+        """Start sampling the calling (event loop) thread"""
+        self._start = time.perf_counter()
+        self.attach("event-loop")
+        self._sampler = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling; safe to call more than once"""
+        if self._sampler is None or self._stop.is_set():
+            return
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        self._stop.set()
+        self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self._threads.items())
+            for thread_id, (label, _) in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[f"{label};{collapse_stack(frame)}"] += 1
+
+    def span_totals(self) -> Dict[str, float]:
+        """Seconds per span name, summed over repeated spans"""
+        totals: Dict[str, float] = {}
+        for name, seconds in list(self.spans):
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: span durations in milliseconds"""
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.span_totals().items()]
+        entries.append(f"request;dur={self.duration_ms:.2f}")
+        return ", ".join(entries)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+            "spans_ms": {name: round(seconds * 1000, 2) for name, seconds in self.span_totals().items()},
+        }
+
+    def save(self, directory: str = settings.PROFILE_DIR, max_files: int = settings.PROFILE_MAX_FILES) -> str:
+        """
+        Write collapsed stacks (<id>.folded) and the summary (<id>.json)
+
+        The .folded file is the input format of flamegraph.pl and speedscope.
+        Only the newest max_files profiles are kept.
+
+        Returns:
+            Path of the collapsed-stack file
+        """
+        os.makedirs(directory, exist_ok=True)
+        folded_path = os.path.join(directory, f"{self.profile_id}.folded")
+        with open(folded_path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(directory, f"{self.profile_id}.json"), "w") as f:
+            json.dump(self.summary(), f)
+
+        summaries = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        for entry in summaries[max_files:]:
+            for suffix in (".json", ".folded"):
+                try:
+                    os.remove(entry.path[:-len(".json")] + suffix)
+                except FileNotFoundError:
+                    pass
+        return folded_path
+
+
+def list_profiles(directory: str = settings.PROFILE_DIR) -> List[Dict[str, Any]]:
+    """Stored profile summaries, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # pruned or half-written
+    return sorted(profiles, key=lambda p: p["started_at"], reverse=True)
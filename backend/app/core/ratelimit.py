@@ -0,0 +1,205 @@
+"""Distributed GCRA rate limiting with local admission and degraded mode"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.logging import logger
+
+# Generic cell rate algorithm in one atomic call. The key stores the
+# theoretical arrival time (TAT) in ms. ARGV: emission interval ms, burst
+# tolerance ms, cost of this request, requests already admitted locally.
+# Locally admitted requests are always charged, even when this one is denied.
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local served = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+tat = tat + emission * served
+
+local new_tat = tat + emission * cost
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    if served > 0 then
+        redis.call('SET', KEYS[1], tat, 'PX', math.max(1, math.ceil(tat - now)))
+    end
+    return {0, math.ceil(allow_at - now), 0}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(1, math.ceil(new_tat - now)))
+return {1, 0, math.floor((tolerance - (new_tat - now)) / emission)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`requests` per `window_seconds`, enforced smoothly (GCRA)"""
+    requests: int
+    window_seconds: float
+
+    @property
+    def emission_ms(self) -> float:
+        return self.window_seconds * 1000 / self.requests
+
+    @property
+    def tolerance_ms(self) -> float:
+        return self.window_seconds * 1000
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse "requests/seconds", e.g. "20/60" """
+        requests, window = value.split("/")
+        return cls(int(requests), float(window))
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0  # seconds
+
+
+@dataclass
+class Lease:
+    """Requests a worker may admit locally after a Redis check"""
+    credit: int
+    served: int
+    expires_at: float
+    remaining: int
+
+
+class LocalGCRA:
+    """In-process GCRA used when Redis is unavailable"""
+
+    def __init__(self, max_keys: int = 100000):
+        """Initialize empty state"""
+        self.max_keys = max_keys
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def check(self, key: str, limit: RateLimit) -> RateLimitResult:
+        now = time.monotonic() * 1000
+        with self._lock:
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + limit.emission_ms
+            allow_at = new_tat - limit.tolerance_ms
+            if allow_at > now:
+                return RateLimitResult(False, limit.requests, 0, (allow_at - now) / 1000)
+
+            self._tats[key] = new_tat
+            if len(self._tats) > self.max_keys:
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+            remaining = int((limit.tolerance_ms - (new_tat - now)) // limit.emission_ms)
+            return RateLimitResult(True, limit.requests, remaining)
+
+
+class RateLimiter:
+    """
+    Rate limiter backed by one Lua GCRA call per Redis round trip
+
+    Three layers keep Redis off the hot path:
+
+    - a client denied by Redis is denied locally until its retry time;
+    - after an allowed check, the worker may admit a share of the client's
+      remaining quota locally (divided across workers) for a short lease,
+      charging those requests to Redis on the next call;
+    - if Redis fails, a per-worker in-memory GCRA enforces an even share of
+      each limit until Redis is retried.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        default_limit: Optional[RateLimit] = None,
+        route_limits: Optional[Dict[str, str]] = None,
+        workers: int = settings.WEB_CONCURRENCY,
+        local_share: float = settings.RATE_LIMIT_LOCAL_SHARE,
+        lease_seconds: float = settings.RATE_LIMIT_LEASE_SECONDS,
+        retry_seconds: float = settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+    ):
+        """Initialize limiter (redis_client is a redis.asyncio client)"""
+        self.redis = redis_client
+        self.script = redis_client.register_script(GCRA_SCRIPT) if redis_client is not None else None
+        self.default_limit = default_limit or RateLimit(
+            settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_WINDOW_SECONDS
+        )
+        routes = settings.RATE_LIMIT_ROUTES if route_limits is None else route_limits
+        # Longest prefix first
+        self.route_limits = sorted(
+            ((prefix, RateLimit.parse(value)) for prefix, value in routes.items()),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.workers = max(1, workers)
+        self.local_share = local_share
+        self.lease_seconds = lease_seconds
+        self.retry_seconds = retry_seconds
+        self.local = LocalGCRA()
+        self.redis_down_until = 0.0
+        self._leases: Dict[str, Lease] = {}
+        self._blocked: Dict[str, float] = {}
+
+    def limit_for(self, path: str) -> Tuple[str, RateLimit]:
+        """(bucket name, limit) for a request path"""
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
+        return "default", self.default_limit
+
+    def degraded_limit(self, limit: RateLimit) -> RateLimit:
+        """This worker's share of a limit while Redis is unavailable"""
+        return RateLimit(max(1, limit.requests // self.workers), limit.window_seconds)
+
+    async def check(self, client_id: str, path: str) -> RateLimitResult:
+        """Count one request from client_id to path against its limit"""
+        bucket, limit = self.limit_for(path)
+        key = f"rate_limit:{bucket}:{client_id}"
+        now = time.monotonic()
+
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return RateLimitResult(False, limit.requests, 0, blocked_until - now)
+            del self._blocked[key]
+
+        lease = self._leases.get(key)
+        if lease is not None and lease.expires_at > now and lease.served < lease.credit:
+            lease.served += 1
+            return RateLimitResult(True, limit.requests, max(0, lease.remaining - lease.served))
+
+        if self.script is None or now < self.redis_down_until:
+            return self.local.check(key, self.degraded_limit(limit))
+
+        served = self._leases.pop(key).served if lease is not None else 0
+        try:
+            allowed, retry_after_ms, remaining = await self.script(
+                keys=[key], args=[limit.emission_ms, limit.tolerance_ms, 1, served]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, limiting in memory: {e}")
+            self.redis_down_until = now + self.retry_seconds
+            return self.local.check(key, self.degraded_limit(limit))
+
+        if not allowed:
+            self._blocked[key] = now + retry_after_ms / 1000
+            return RateLimitResult(False, limit.requests, 0, retry_after_ms / 1000)
+
+        credit = int(remaining * self.local_share / self.workers)
+        if credit > 0:
+            self._leases[key] = Lease(credit, 0, now + self.lease_seconds, int(remaining))
+        if len(self._leases) > 100000 or len(self._blocked) > 100000:
+            self._prune(now)
+        return RateLimitResult(True, limit.requests, int(remaining))
+
+    def _prune(self, now: float) -> None:
+        """Drop expired leases and blocks; uncharged lease use is bounded by its credit"""
+        self._leases = {k: v for k, v in self._leases.items() if v.expires_at > now}
+        self._blocked = {k: v for k, v in self._blocked.items() if v > now}
@@ -0,0 +1,191 @@
+"""Cached read-endpoint responses, invalidated by an ingestion generation counter"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import record_cache_lookup
+
+GENERATION_KEY = "response_cache:generation"
+ENTRY_KEY_PREFIX = "response_cache:entry:"
+
+
+def cache_key(path: str, query_string: str, generation: str, ttl_seconds: float, now: Optional[float] = None) -> str:
+    """
+    Key (and strong ETag value) of a response
+
+    Combines the generation, the TTL window the request falls in (wall
+    clock, so every worker rolls over together) and a digest of the path
+    and its sorted query parameters.
+    """
+    params = urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+    digest = hashlib.sha256(f"{path}?{params}".encode("utf-8")).hexdigest()[:24]
+    window = int((time.time() if now is None else now) // ttl_seconds)
+    return f"{generation}.{window}.{digest}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """
+    Response bodies of read endpoints, valid for one ingestion generation
+
+    The generation is a Redis counter that ingestion and retention bump
+    after committing article changes. Keys embed the generation, so a bump
+    invalidates every worker's entries without deleting any: the old keys
+    are no longer asked for and age out of the LRU and Redis. Workers
+    re-read the generation at most every generation_ttl_seconds. Bodies are
+    looked up in a per-worker LRU first, then Redis.
+
+    If Redis fails, the worker uses a generation of its own, which only its
+    own bumps advance, and skips Redis for retry_seconds. Entries are then
+    still bounded by the route TTL.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        sync_redis_client=None,
+        redis_url: Optional[str] = settings.REDIS_URL,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        generation_ttl_seconds: float = settings.RESPONSE_CACHE_GENERATION_TTL_SECONDS,
+        timeout_seconds: float = settings.RESPONSE_CACHE_REDIS_TIMEOUT_SECONDS,
+        retry_seconds: float = settings.RESPONSE_CACHE_REDIS_RETRY_SECONDS
+    ):
+        """Initialize cache (redis_client is a redis.asyncio client; clients are made from redis_url on first use)"""
+        self._redis = redis_client
+        self._sync_redis = sync_redis_client
+        self.redis_url = redis_url
+        self.max_entries = max_entries
+        self.generation_ttl_seconds = generation_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.retry_seconds = retry_seconds
+        self.redis_down_until = 0.0
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._generation: Optional[Tuple[str, float]] = None  # (generation, expires at)
+        # Fallback generation: unique to this process, advanced by its own bumps
+        self._local_token = f"{os.getpid():x}{int(time.time()):x}"
+        self._local_generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as aioredis
+
+            # Connections are lazy; a down Redis switches the cache to memory
+            self._redis = aioredis.from_url(
+                self.redis_url, socket_timeout=self.timeout_seconds, socket_connect_timeout=self.timeout_seconds
+            )
+        return self._redis
+
+    @property
+    def sync_redis(self):
+        if self._sync_redis is None and self.redis_url:
+            import redis
+
+            self._sync_redis = redis.Redis.from_url(
+                self.redis_url, socket_timeout=self.timeout_seconds, socket_connect_timeout=self.timeout_seconds
+            )
+        return self._sync_redis
+
+    def _redis_available(self, now: float) -> bool:
+        return now >= self.redis_down_until and self.redis is not None
+
+    def _redis_failed(self, now: float, e: Exception) -> None:
+        logger.warning(f"Response cache store unavailable, caching in memory: {e}")
+        self.redis_down_until = now + self.retry_seconds
+
+    async def generation(self) -> str:
+        """Current ingestion generation"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._generation
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        generation = None
+        if self._redis_available(now):
+            try:
+                generation = f"g{int(await self.redis.get(GENERATION_KEY) or 0)}"
+            except Exception as e:
+                self._redis_failed(now, e)
+        with self._lock:
+            if generation is None:
+                generation = f"l{self._local_token}.{self._local_generation}"
+            self._generation = (generation, now + self.generation_ttl_seconds)
+        return generation
+
+    def bump_generation(self) -> None:
+        """Invalidate every cached response (synchronous; call after committing article changes)"""
+        with self._lock:
+            self._local_generation += 1
+            self._generation = None
+        now = time.monotonic()
+        if now < self.redis_down_until or self.sync_redis is None:
+            return
+        try:
+            self.sync_redis.incr(GENERATION_KEY)
+        except Exception as e:
+            self._redis_failed(now, e)
+
+    async def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(media type, body) stored under key, or None"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            record_cache_lookup("responses", True)
+            return entry
+
+        now = time.monotonic()
+        if self._redis_available(now):
+            try:
+                value = await self.redis.get(ENTRY_KEY_PREFIX + key)
+            except Exception as e:
+                self._redis_failed(now, e)
+                value = None
+            if value is not None:
+                media_type, _, body = value.partition(b"\n")
+                entry = (media_type.decode("latin-1"), body)
+                self._remember(key, entry)
+        record_cache_lookup("responses", entry is not None)
+        return entry
+
+    async def set(self, key: str, media_type: str, body: bytes, ttl_seconds: float) -> None:
+        """Store a response for ttl_seconds (in Redis; the LRU evicts by use)"""
+        self._remember(key, (media_type, body))
+        now = time.monotonic()
+        if self._redis_available(now):
+            try:
+                await self.redis.set(
+                    ENTRY_KEY_PREFIX + key, media_type.encode("latin-1") + b"\n" + body, px=int(ttl_seconds * 1000)
+                )
+            except Exception as e:
+                self._redis_failed(now, e)
+
+    def _remember(self, key: str, entry: Tuple[str, bytes]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Global instance; ingestion bumps its generation
+response_cache = ResponseCache()
+
+
+def bump_generation() -> None:
+    """Invalidate cached read-endpoint responses in every worker"""
+    response_cache.bump_generation()
@@ -1,11 +1,12 @@
 """Security utilities for authentication and authorization"""
 
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthCredentials
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 
 # Password hashing
@@ -48,7 +49,7 @@ def decode_token(token: str) -> dict:
         return None
 
 
-async def verify_token(credentials: HTTPAuthCredentials = Depends(security)) -> dict:
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Verify JWT token from request headers"""
     token = credentials.credentials
     payload = decode_token(token)
@@ -68,3 +69,19 @@ def validate_api_key(api_key: str) -> bool:
     # In production, validate against a database or external service
     valid_keys = ["mobile-app-key-123", "web-client-key-456"]  # Example
     return api_key in valid_keys
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check of an X-Admin-Token value (always False when ADMIN_TOKEN is unset)"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject admin requests without a valid X-Admin-Token header"""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
@@ -0,0 +1,96 @@
+"""Hourly topic aggregates maintained at ingest"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db.models import Article, TopicHourlyStat
+
+DEFAULT_TOPIC = "General"
+
+# (bucket_start, topic) -> [article_count delta, sentiment_sum delta]
+TopicDeltas = Dict[Tuple[datetime, str], List[float]]
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour"""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def topic_contribution(
+    published_at: Optional[datetime],
+    topic: Optional[str],
+    sentiment_score: Optional[float]
+) -> Optional[Tuple[Tuple[datetime, str], float]]:
+    """Bucket key and sentiment an article adds to the aggregates"""
+    if published_at is None:
+        return None
+    return (hour_bucket(published_at), topic or DEFAULT_TOPIC), sentiment_score or 0.0
+
+
+def new_topic_deltas() -> TopicDeltas:
+    return defaultdict(lambda: [0, 0.0])
+
+
+def add_contribution(deltas: TopicDeltas, contribution, sign: int = 1) -> None:
+    """Add (sign=1) or retract (sign=-1) one article's contribution"""
+    if contribution is None:
+        return
+    key, sentiment = contribution
+    deltas[key][0] += sign
+    deltas[key][1] += sign * sentiment
+
+
+def increment_topic_stats(db: Session, deltas: TopicDeltas) -> None:
+    """Apply topic deltas to topic_hourly_stats within the caller's transaction"""
+    now = datetime.utcnow()
+    for (bucket_start, topic), (count, sentiment) in deltas.items():
+        if not count and not sentiment:
+            continue
+
+        updated = db.query(TopicHourlyStat).filter(
+            TopicHourlyStat.bucket_start == bucket_start,
+            TopicHourlyStat.topic == topic
+        ).update({
+            TopicHourlyStat.article_count: TopicHourlyStat.article_count + count,
+            TopicHourlyStat.sentiment_sum: TopicHourlyStat.sentiment_sum + sentiment,
+            TopicHourlyStat.updated_at: now,
+        }, synchronize_session=False)
+        if not updated:
+            db.add(TopicHourlyStat(
+                bucket_start=bucket_start,
+                topic=topic,
+                article_count=count,
+                sentiment_sum=sentiment,
+                updated_at=now
+            ))
+
+
+def backfill_topic_stats(db: Session, hours: int) -> int:
+    """
+    Rebuild aggregates for the last `hours` from the articles table
+
+    Used once for databases that predate topic_hourly_stats.
+
+    Returns:
+        Number of articles aggregated
+    """
+    cutoff = hour_bucket(datetime.utcnow() - timedelta(hours=hours))
+    deltas = new_topic_deltas()
+    rows = db.query(
+        Article.published_at, Article.main_topic, Article.sentiment_score
+    ).filter(Article.published_at >= cutoff).yield_per(1000)
+
+    n_articles = 0
+    for published_at, topic, sentiment_score in rows:
+        add_contribution(deltas, topic_contribution(published_at, topic, sentiment_score))
+        n_articles += 1
+
+    db.query(TopicHourlyStat).filter(TopicHourlyStat.bucket_start >= cutoff).delete()
+    increment_topic_stats(db, deltas)
+    return n_articles
+
+
+def topic_stats_empty(db: Session) -> bool:
+    return not db.query(func.count()).select_from(TopicHourlyStat).scalar()
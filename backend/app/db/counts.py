@@ -0,0 +1,91 @@
+"""Cached per-category article counts"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import Select, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.db.models import Article, CategoryStat
+
+ALL_CATEGORIES = "all"
+
+
+def count_statement(category: str) -> Select:
+    """Build an exact article count query for a category"""
+    stmt = select(func.count()).select_from(Article)
+    if category != ALL_CATEGORIES:
+        stmt = stmt.where(Article.category == category)
+    return stmt
+
+
+def increment_category_counts(db: Session, deltas: Dict[str, int]) -> None:
+    """
+    Apply count deltas to category_stats within the caller's transaction
+
+    Categories without a stats row yet are seeded with an exact count, so
+    the table converges even on databases that predate it.
+    """
+    for category, delta in deltas.items():
+        if not delta:
+            continue
+
+        updated = db.query(CategoryStat).filter(
+            CategoryStat.category == category
+        ).update(
+            {CategoryStat.article_count: CategoryStat.article_count + delta},
+            synchronize_session=False
+        )
+        if not updated:
+            db.flush()
+            count = db.execute(count_statement(category)).scalar_one()
+            db.add(CategoryStat(category=category, article_count=count))
+
+
+class CategoryCountCache:
+    """In-process TTL cache in front of the category_stats table"""
+
+    def __init__(self, ttl_seconds: int = settings.COUNT_CACHE_TTL_SECONDS):
+        """Initialize cache"""
+        self.ttl_seconds = ttl_seconds
+        self._counts: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, db: AsyncSession, category: Optional[str]) -> int:
+        """Get article count for a category ("all" or None for every category)"""
+        category = category or ALL_CATEGORIES
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._counts.get(category)
+        hit = bool(cached and cached[1] > now)
+        record_cache_lookup("category_counts", hit)
+        if hit:
+            return cached[0]
+
+        count = (await db.execute(
+            select(CategoryStat.article_count).where(CategoryStat.category == category)
+        )).scalar_one_or_none()
+        if count is None:
+            count = (await db.execute(count_statement(category))).scalar_one()
+            try:
+                db.add(CategoryStat(category=category, article_count=count))
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()  # Seeded concurrently by another request
+
+        with self._lock:
+            self._counts[category] = (count, now + self.ttl_seconds)
+        return count
+
+    def invalidate(self) -> None:
+        """Drop cached counts after ingestion changed them"""
+        with self._lock:
+            self._counts.clear()
+
+
+# Global instance
+category_counts = CategoryCountCache()
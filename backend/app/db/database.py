@@ -1,11 +1,24 @@
 """Database connection and session management"""
 
+from typing import AsyncIterator, Tuple
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 from app.db.models import Base
+from app.db.search import ensure_search_schema
+from app.db.aggregates import backfill_topic_stats, topic_stats_empty
+from app.db.entities import backfill_article_entities, entity_index_empty
+from app.core.logging import logger
 
-# Create engine
+# Async driver for each sync driver in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Create engine (migrations, ingestion and scripts)
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
@@ -18,9 +31,63 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(database_url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.drivername != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=ASYNC_DRIVERS[backend])
+    return url.render_as_string(hide_password=False)
+
+
+def worker_pool_size(
+    max_connections: int = settings.DATABASE_MAX_CONNECTIONS,
+    workers: int = settings.WEB_CONCURRENCY
+) -> Tuple[int, int]:
+    """
+    Split the database connection budget across worker processes
+
+    Returns:
+        Tuple of (pool_size, max_overflow) for one worker
+    """
+    per_worker = max(2, max_connections // max(1, workers))
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+def create_async_db_engine(database_url: str = settings.DATABASE_URL):
+    """Create the async engine used by API routes"""
+    url = async_database_url(database_url)
+    options = {"echo": settings.DATABASE_ECHO, "pool_pre_ping": True}
+    if make_url(url).get_backend_name() != "sqlite":
+        pool_size, max_overflow = worker_pool_size()
+        options.update(pool_size=pool_size, max_overflow=max_overflow)
+    return create_async_engine(url, **options)
+
+
+# Async engine and session factory (API routes)
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
 def init_db():
-    """Initialize database, create tables"""
+    """Initialize database, create tables and the full-text search index"""
     Base.metadata.create_all(bind=engine)
+    ensure_search_schema(engine)
+    
+    # Databases created before the aggregate and entity tables need a one-off backfill
+    with SessionLocal() as db:
+        if topic_stats_empty(db):
+            n_articles = backfill_topic_stats(db, hours=settings.TREND_MAX_WINDOW_HOURS)
+            db.commit()
+            if n_articles:
+                logger.info(f"Backfilled topic aggregates from {n_articles} articles")
+        
+        if entity_index_empty(db):
+            n_articles = backfill_article_entities(db)
+            db.commit()
+            if n_articles:
+                logger.info(f"Backfilled entity index from {n_articles} articles")
 
 
 def get_db() -> Session:
@@ -30,3 +97,9 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session for dependency injection"""
+    async with AsyncSessionLocal() as db:
+        yield db
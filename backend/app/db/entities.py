@@ -0,0 +1,368 @@
+"""Normalized entity index over articles"""
+
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import desc, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.db.models import Article, ArticleEntity, Entity
+from app.db.pagination import decode_cursor, encode_cursor
+
+# (normalized_name, entity_type)
+EntityKey = Tuple[str, str]
+
+
+def normalize_entity_name(name: str) -> str:
+    """Lookup key for an entity name: collapsed whitespace, casefolded"""
+    return " ".join(name.split()).casefold()
+
+
+def entity_mentions(
+    entities: Any,
+    entity_types: Sequence[str] = settings.ENTITY_INDEX_TYPES
+) -> Dict[EntityKey, str]:
+    """
+    Map NER output ({type: [names]} or its JSON) to entity keys
+
+    Returns:
+        Dict of (normalized_name, entity_type) -> display name
+    """
+    if isinstance(entities, str):
+        entities = json.loads(entities or "{}")
+
+    mentions: Dict[EntityKey, str] = {}
+    for entity_type, names in (entities or {}).items():
+        if entity_type not in entity_types:
+            continue
+        for name in names:
+            display_name = " ".join(name.split())[:255]
+            if display_name:
+                mentions.setdefault((normalize_entity_name(display_name), entity_type), display_name)
+    return mentions
+
+
+def _insert_ignoring_duplicates(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert entities, skipping ones a concurrent ingest already created"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        db.execute(insert(Entity), rows)
+        return
+    db.execute(dialect_insert(Entity).on_conflict_do_nothing(), rows)
+
+
+def resolve_entity_ids(db: Session, mentions: Dict[EntityKey, str]) -> Dict[EntityKey, int]:
+    """Get IDs for entity keys, creating missing entities in bulk"""
+    def lookup(keys: Iterable[EntityKey]) -> Dict[EntityKey, int]:
+        keys = set(keys)
+        rows = db.execute(
+            select(Entity.id, Entity.normalized_name, Entity.entity_type)
+            .where(Entity.normalized_name.in_({name for name, _ in keys}))
+        ).all()
+        return {(name, entity_type): entity_id for entity_id, name, entity_type in rows
+                if (name, entity_type) in keys}
+
+    ids = lookup(mentions)
+    missing = [key for key in mentions if key not in ids]
+    if missing:
+        _insert_ignoring_duplicates(db, [
+            {"name": mentions[key], "normalized_name": key[0], "entity_type": key[1],
+             "article_count": 0, "created_at": datetime.utcnow()}
+            for key in missing
+        ])
+        ids.update(lookup(missing))
+    return ids
+
+
+def sync_article_entities(
+    db: Session,
+    articles: Sequence[Tuple[str, Optional[datetime], Any]]
+) -> None:
+    """
+    Bring article_entities in line with the articles' NER output
+
+    Runs in the caller's transaction with a fixed number of statements per
+    batch: links are diffed against what is stored, so re-ingesting an
+    unchanged article writes nothing, and entity article_counts are
+    adjusted by the difference.
+
+    Args:
+        articles: (article_id, published_at, entities) tuples
+    """
+    if not articles:
+        return
+
+    article_mentions = {article_id: entity_mentions(entities) for article_id, _, entities in articles}
+    published = {article_id: published_at for article_id, published_at, _ in articles}
+
+    all_mentions: Dict[EntityKey, str] = {}
+    for mentions in article_mentions.values():
+        for key, display_name in mentions.items():
+            all_mentions.setdefault(key, display_name)
+    entity_ids = resolve_entity_ids(db, all_mentions) if all_mentions else {}
+
+    wanted = {
+        (article_id, entity_ids[key])
+        for article_id, mentions in article_mentions.items()
+        for key in mentions
+        if key in entity_ids
+    }
+    stored = {
+        (article_id, entity_id): published_at
+        for article_id, entity_id, published_at in db.execute(
+            select(ArticleEntity.article_id, ArticleEntity.entity_id, ArticleEntity.published_at)
+            .where(ArticleEntity.article_id.in_(article_mentions))
+        ).all()
+    }
+
+    added = wanted - stored.keys()
+    removed = stored.keys() - wanted
+    moved = [
+        link for link in wanted & stored.keys()
+        if stored[link] != published[link[0]]
+    ]
+
+    if added:
+        db.execute(insert(ArticleEntity), [
+            {"article_id": article_id, "entity_id": entity_id, "published_at": published[article_id]}
+            for article_id, entity_id in added
+        ])
+    if removed:
+        db.query(ArticleEntity).filter(
+            tuple_(ArticleEntity.article_id, ArticleEntity.entity_id).in_(removed)
+        ).delete(synchronize_session=False)
+    for article_id in {article_id for article_id, _ in moved}:
+        db.query(ArticleEntity).filter(ArticleEntity.article_id == article_id).update(
+            {ArticleEntity.published_at: published[article_id]}, synchronize_session=False
+        )
+
+    deltas: Dict[int, int] = defaultdict(int)
+    for _, entity_id in added:
+        deltas[entity_id] += 1
+    for _, entity_id in removed:
+        deltas[entity_id] -= 1
+    by_delta: Dict[int, List[int]] = defaultdict(list)
+    for entity_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(entity_id)
+    for delta, ids in by_delta.items():
+        db.query(Entity).filter(Entity.id.in_(ids)).update(
+            {Entity.article_count: Entity.article_count + delta}, synchronize_session=False
+        )
+
+
+def backfill_article_entities(db: Session, batch_size: int = 1000) -> int:
+    """
+    Build the entity index from Article.entities JSON
+
+    Used once for databases that predate the entity tables.
+
+    Returns:
+        Number of articles indexed
+    """
+    rows = db.query(Article.id, Article.published_at, Article.entities).filter(
+        Article.entities.isnot(None)
+    ).yield_per(batch_size)
+
+    batch = []
+    n_articles = 0
+    for row in rows:
+        batch.append(tuple(row))
+        if len(batch) >= batch_size:
+            sync_article_entities(db, batch)
+            n_articles += len(batch)
+            batch = []
+    sync_article_entities(db, batch)
+    return n_articles + len(batch)
+
+
+def entity_index_empty(db: Session) -> bool:
+    return not db.query(func.count()).select_from(Entity).scalar()
+
+
+async def find_entities(
+    db: AsyncSession,
+    name: str,
+    entity_type: Optional[str] = None
+) -> List[Entity]:
+    """Entities matching a name (any type unless one is given)"""
+    stmt = select(Entity).where(Entity.normalized_name == normalize_entity_name(name))
+    if entity_type:
+        stmt = stmt.where(Entity.entity_type == entity_type)
+    return list((await db.execute(stmt.order_by(desc(Entity.article_count)))).scalars())
+
+
+async def entity_articles(
+    db: AsyncSession,
+    entity_ids: Sequence[int],
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    columns: Optional[Sequence[Any]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Articles mentioning any of the entities, newest first
+
+    Walks idx_article_entities_entity_published_at, so only the page's
+    links and articles are read. Cursors match paginate(). Returns Article
+    objects, or rows of columns (which must include Article.id) if given.
+
+    Raises:
+        ValueError: If the cursor is malformed
+
+    Returns:
+        Tuple of (articles, next_cursor)
+    """
+    stmt = select(ArticleEntity.article_id, ArticleEntity.published_at).where(
+        ArticleEntity.entity_id.in_(entity_ids)
+    ).distinct().order_by(desc(ArticleEntity.published_at), desc(ArticleEntity.article_id))
+
+    if cursor:
+        published_at, article_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            ArticleEntity.published_at.isnot(None),
+            tuple_(ArticleEntity.published_at, ArticleEntity.article_id) < tuple_(published_at, article_id)
+        )
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+
+    links = (await db.execute(stmt.limit(page_size + 1))).all()
+    has_more = len(links) > page_size
+    links = links[:page_size]
+    if not links:
+        return [], None
+
+    result = await db.execute(
+        select(*(columns or [Article])).where(Article.id.in_([article_id for article_id, _ in links]))
+    )
+    articles = {a.id: a for a in (result.all() if columns else result.scalars())}
+    ordered = [articles[article_id] for article_id, _ in links if article_id in articles]
+
+    next_cursor = None
+    if has_more and links[-1][1] is not None:
+        next_cursor = encode_cursor(links[-1][1], links[-1][0])
+    return ordered, next_cursor
+
+
+async def top_entities(
+    db: AsyncSession,
+    hours: Optional[int] = None,
+    entity_type: Optional[str] = None,
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Most mentioned entities, all time or within the last `hours`
+
+    All-time ranking reads the maintained article_count; windowed ranking
+    aggregates the published_at index range.
+    """
+    if hours is None:
+        stmt = select(Entity.name, Entity.entity_type, Entity.article_count).where(
+            Entity.article_count > 0
+        )
+        if entity_type:
+            stmt = stmt.where(Entity.entity_type == entity_type)
+        stmt = stmt.order_by(desc(Entity.article_count)).limit(limit)
+    else:
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        counts = select(
+            ArticleEntity.entity_id, func.count().label("article_count")
+        ).where(ArticleEntity.published_at >= cutoff).group_by(ArticleEntity.entity_id).subquery()
+        stmt = select(Entity.name, Entity.entity_type, counts.c.article_count).join(
+            counts, counts.c.entity_id == Entity.id
+        )
+        if entity_type:
+            stmt = stmt.where(Entity.entity_type == entity_type)
+        stmt = stmt.order_by(desc(counts.c.article_count)).limit(limit)
+
+    return [
+        {"name": name, "entity_type": etype, "article_count": count}
+        for name, etype, count in (await db.execute(stmt)).all()
+    ]
+
+
+class CooccurrenceCache:
+    """
+    LRU + TTL cache of related entities
+
+    Related entities are those sharing the most articles with an entity in
+    the last ENTITY_COOCCURRENCE_DAYS, computed by a self-join on
+    article_entities that starts from the entity's index range.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.ENTITY_COOCCURRENCE_CACHE_SIZE,
+        ttl_seconds: int = settings.ENTITY_COOCCURRENCE_TTL_SECONDS,
+        window_days: int = settings.ENTITY_COOCCURRENCE_DAYS
+    ):
+        """Initialize cache"""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.window_days = window_days
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def related(
+        self,
+        db: AsyncSession,
+        entity_ids: Sequence[int],
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Entities co-mentioned with any of entity_ids, most shared articles first"""
+        key = (tuple(sorted(entity_ids)), limit)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[1] > now:
+                self._entries.move_to_end(key)
+                record_cache_lookup("entity_cooccurrence", True)
+                return cached[0]
+        record_cache_lookup("entity_cooccurrence", False)
+
+        source = aliased(ArticleEntity)
+        other = aliased(ArticleEntity)
+        cutoff = datetime.utcnow() - timedelta(days=self.window_days)
+        shared = select(
+            other.entity_id, func.count(func.distinct(other.article_id)).label("shared_articles")
+        ).join(source, source.article_id == other.article_id).where(
+            source.entity_id.in_(entity_ids),
+            source.published_at >= cutoff,
+            other.entity_id.notin_(entity_ids)
+        ).group_by(other.entity_id).order_by(desc("shared_articles")).limit(limit).subquery()
+
+        rows = (await db.execute(
+            select(Entity.name, Entity.entity_type, shared.c.shared_articles)
+            .join(shared, shared.c.entity_id == Entity.id)
+            .order_by(desc(shared.c.shared_articles), Entity.name)
+        )).all()
+        related = [
+            {"name": name, "entity_type": entity_type, "shared_articles": count}
+            for name, entity_type, count in rows
+        ]
+
+        with self._lock:
+            self._entries[key] = (related, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return related
+
+    def invalidate(self) -> None:
+        """Drop cached lookups after ingestion added mentions"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance
+cooccurrence_cache = CooccurrenceCache()
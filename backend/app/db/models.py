@@ -1,6 +1,6 @@
 """Database models for news articles and metadata"""
 
-from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Index
+from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -31,11 +31,18 @@ class Article(Base):
     # Vector DB reference
     embedding_id = Column(String(255), nullable=True)
     
+    # Summary cache bookkeeping (sha256 of content)
+    content_hash = Column(String(64), nullable=True)
+    summary_content_hash = Column(String(64), nullable=True)  # content_hash the summary was generated from
+    
     __table_args__ = (
         Index("idx_source", "source"),
         Index("idx_category", "category"),
         Index("idx_published_at", "published_at"),
         Index("idx_created_at", "created_at"),
+        # Keyset pagination: ORDER BY published_at DESC, id DESC
+        Index("idx_published_at_id", "published_at", "id"),
+        Index("idx_category_published_at_id", "category", "published_at", "id"),
     )
 
 
@@ -87,5 +94,90 @@ class SearchQuery(Base):
     
     __table_args__ = (
         Index("idx_user_id", "user_id"),
-        Index("idx_created_at", "created_at"),
+        Index("idx_search_queries_created_at", "created_at"),
+    )
+
+
+class CategoryStat(Base):
+    """Per-category article counts maintained incrementally at ingest"""
+    __tablename__ = "category_stats"
+    
+    category = Column(String(100), primary_key=True)  # "all" holds the overall total
+    article_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TopicHourlyStat(Base):
+    """Hourly per-topic article counts and sentiment sums maintained at ingest"""
+    __tablename__ = "topic_hourly_stats"
+    
+    bucket_start = Column(DateTime, primary_key=True)  # published_at truncated to the hour
+    topic = Column(String(100), primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("idx_topic_hourly_stats_updated_at", "updated_at"),
+    )
+
+
+class Entity(Base):
+    """Named entity extracted from articles"""
+    __tablename__ = "entities"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), nullable=False)  # display form, as first seen
+    normalized_name = Column(String(255), nullable=False)  # casefolded lookup key
+    entity_type = Column(String(50), nullable=False)  # PERSON, ORG, GPE, ...
+    article_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("normalized_name", "entity_type", name="uq_entities_name_type"),
+        Index("idx_entities_article_count", "article_count"),
+    )
+
+
+class ArticleEntity(Base):
+    """Article to entity mention link"""
+    __tablename__ = "article_entities"
+    
+    article_id = Column(String(255), primary_key=True)
+    entity_id = Column(Integer, primary_key=True)
+    published_at = Column(DateTime, nullable=True)  # copied from the article for index-only listing
+    
+    __table_args__ = (
+        Index("idx_article_entities_entity_published_at", "entity_id", "published_at", "article_id"),
+        Index("idx_article_entities_published_at", "published_at"),
+    )
+
+
+class StoryCluster(Base):
+    """Event-level story grouping near-duplicate articles across sources"""
+    __tablename__ = "story_clusters"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    title = Column(String(1024), nullable=False)  # title of the founding article
+    centroid = Column(LargeBinary, nullable=False)  # float32 unit vector
+    article_count = Column(Integer, nullable=False, default=0)
+    first_seen_at = Column(DateTime, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_story_clusters_last_seen_at", "last_seen_at"),
+    )
+
+
+class StoryArticle(Base):
+    """Story cluster membership"""
+    __tablename__ = "story_articles"
+    
+    article_id = Column(String(255), primary_key=True)
+    story_id = Column(Integer, nullable=False)
+    published_at = Column(DateTime, nullable=True)
+    similarity = Column(Float, nullable=True)  # to the centroid at assignment; null for founders
+    
+    __table_args__ = (
+        Index("idx_story_articles_story_published_at", "story_id", "published_at"),
     )
@@ -0,0 +1,106 @@
+"""Keyset (cursor) pagination for article listings"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import Select, desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Article
+
+
+def encode_token(values: list) -> str:
+    """Encode JSON-serializable sort key values as an opaque URL-safe token"""
+    payload = json.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> list:
+    """
+    Decode a token produced by encode_token
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {token}")
+    return values
+
+
+def encode_cursor(published_at: datetime, article_id: str) -> str:
+    """Encode the sort key of the last article on a page as an opaque cursor"""
+    return encode_token([published_at.isoformat(), article_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        published_at, article_id = decode_token(cursor)
+        return datetime.fromisoformat(published_at), str(article_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of articles ordered by (published_at, id) descending
+
+    stmt selects either Article (the page holds Article objects) or
+    Article columns including published_at and id (the page holds rows).
+
+    With a cursor the page starts right after the cursor position using an
+    index range scan. Without one, page/page_size are applied as an OFFSET
+    for compatibility. Either way a next_cursor is returned when more rows
+    follow, so offset clients can switch to cursors after the first page.
+    Cursor mode only walks dated articles; ingestion always sets published_at.
+
+    Raises:
+        ValueError: If the cursor is malformed
+
+    Returns:
+        Tuple of (articles, next_cursor)
+    """
+    stmt = stmt.order_by(desc(Article.published_at), desc(Article.id))
+
+    if cursor:
+        published_at, article_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            Article.published_at.isnot(None),
+            tuple_(Article.published_at, Article.id) < tuple_(published_at, article_id)
+        )
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(stmt.limit(page_size + 1))
+    articles = list(result.scalars() if len(stmt.column_descriptions) == 1 else result.all())
+    has_more = len(articles) > page_size
+    articles = articles[:page_size]
+
+    next_cursor = None
+    if has_more and articles[-1].published_at is not None:
+        next_cursor = encode_cursor(articles[-1].published_at, articles[-1].id)
+
+    return articles, next_cursor
+
+
+async def count_capped(db: AsyncSession, stmt: Select, cap: int) -> int:
+    """Count statement rows, stopping once cap rows have been seen"""
+    subquery = stmt.with_only_columns(Article.id).limit(cap).subquery()
+    return (await db.execute(select(func.count()).select_from(subquery))).scalar_one()
@@ -0,0 +1,291 @@
+"""Full-text article search (Postgres tsvector / SQLite FTS5)"""
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, event, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.logging import logger
+from app.db.models import Article
+from app.db.pagination import count_capped, decode_token, encode_token, paginate
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+# The database marks matches with private-use characters; the snippet text is
+# HTML-escaped before they become tags, so scraped markup stays inert
+SNIPPET_START_SENTINEL = "\ue000"
+SNIPPET_END_SENTINEL = "\ue001"
+
+# The search index is kept current by triggers on articles, so every write
+# path (ingestion upserts, summary updates, manual fixes) maintains it in the
+# same transaction. Only title/content changes re-index a row.
+POSTGRES_DDL = [
+    "ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION articles_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS articles_search_vector_trigger ON articles",
+    """
+    CREATE TRIGGER articles_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON articles
+    FOR EACH ROW EXECUTE FUNCTION articles_search_vector_update()
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_articles_search_vector ON articles USING GIN (search_vector)",
+    # Backfill rows written before the trigger existed
+    """
+    UPDATE articles SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    WHERE search_vector IS NULL
+    """,
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+    USING fts5(article_id UNINDEXED, title, content, tokenize='porter unicode61')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (article_id, title, content)
+        VALUES (new.id, new.title, coalesce(new.content, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, content ON articles BEGIN
+        DELETE FROM articles_fts WHERE article_id = old.id;
+        INSERT INTO articles_fts (article_id, title, content)
+        VALUES (new.id, new.title, coalesce(new.content, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        DELETE FROM articles_fts WHERE article_id = old.id;
+    END
+    """,
+    # Backfill rows written before the triggers existed
+    """
+    INSERT INTO articles_fts (article_id, title, content)
+    SELECT id, title, coalesce(content, '') FROM articles
+    WHERE id NOT IN (SELECT article_id FROM articles_fts)
+    """,
+]
+
+DROP_DDL = {
+    "postgresql": ["DROP FUNCTION IF EXISTS articles_search_vector_update() CASCADE"],
+    "sqlite": ["DROP TABLE IF EXISTS articles_fts"],
+}
+
+CREATE_DDL = {
+    "postgresql": POSTGRES_DDL,
+    "sqlite": SQLITE_DDL,
+}
+
+# BM25 column weights for (article_id, title, content)
+SQLITE_BM25_WEIGHTS = "0.0, 4.0, 1.0"
+
+SQLITE_SEARCH = f"""
+    SELECT article_id, score FROM (
+        SELECT article_id, -bm25(articles_fts, {SQLITE_BM25_WEIGHTS}) AS score
+        FROM articles_fts WHERE articles_fts MATCH :match
+    )
+    {{keyset}}
+    ORDER BY score DESC, article_id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+SQLITE_SNIPPETS = f"""
+    SELECT article_id, snippet(articles_fts, -1, '{SNIPPET_START_SENTINEL}', '{SNIPPET_END_SENTINEL}', '...', 24)
+    FROM articles_fts WHERE articles_fts MATCH :match AND article_id IN :ids
+"""
+
+SQLITE_COUNT = """
+    SELECT count(*) FROM (
+        SELECT 1 FROM articles_fts WHERE articles_fts MATCH :match LIMIT :cap
+    )
+"""
+
+POSTGRES_SEARCH = """
+    SELECT id, score FROM (
+        SELECT id, ts_rank(search_vector, query) AS score
+        FROM articles, websearch_to_tsquery('english', :match) query
+        WHERE search_vector @@ query
+    ) ranked
+    {keyset}
+    ORDER BY score DESC, id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+POSTGRES_SNIPPETS = f"""
+    SELECT id, ts_headline(
+        'english', coalesce(nullif(content, ''), title), websearch_to_tsquery('english', :match),
+        'StartSel={SNIPPET_START_SENTINEL}, StopSel={SNIPPET_END_SENTINEL}, MaxWords=35, MinWords=15'
+    )
+    FROM articles WHERE id IN :ids
+"""
+
+POSTGRES_COUNT = """
+    SELECT count(*) FROM (
+        SELECT 1 FROM articles WHERE search_vector @@ websearch_to_tsquery('english', :match)
+        LIMIT :cap
+    ) matched
+"""
+
+STATEMENTS = {
+    "postgresql": (POSTGRES_SEARCH, POSTGRES_SNIPPETS, POSTGRES_COUNT),
+    "sqlite": (SQLITE_SEARCH, SQLITE_SNIPPETS, SQLITE_COUNT),
+}
+
+# Resumes after the last (score, id) of the previous page
+KEYSET_FILTER = "WHERE score < :after_score OR (score = :after_score AND {id_column} < :after_id)"
+ID_COLUMNS = {"postgresql": "id", "sqlite": "article_id"}
+
+
+@dataclass
+class SearchHit:
+    """One ranked search result"""
+    article: Any  # Article, or a row of the requested columns
+    score: Optional[float] = None
+    snippet: Optional[str] = None
+
+
+def _create_search_schema(target, connection, **kw):
+    """Create search columns, indexes and triggers after the articles table"""
+    for statement in CREATE_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def _drop_search_schema(target, connection, **kw):
+    """Drop search objects before the articles table"""
+    for statement in DROP_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+event.listen(Article.__table__, "after_create", _create_search_schema)
+event.listen(Article.__table__, "before_drop", _drop_search_schema)
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a database snippet, then turn its match sentinels into <mark> tags"""
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(SNIPPET_START_SENTINEL, SNIPPET_START)
+        .replace(SNIPPET_END_SENTINEL, SNIPPET_END)
+    )
+
+
+def ensure_search_schema(engine: Engine) -> None:
+    """Install the search index on an existing articles table and backfill it"""
+    with engine.begin() as connection:
+        _create_search_schema(Article.__table__, connection)
+    logger.info(f"Full-text search index ready ({engine.dialect.name})")
+
+
+def build_match_query(q: str, dialect: str) -> str:
+    """Turn free text into a safe match expression (all terms required)"""
+    terms = re.findall(r"\w+", q.lower())
+    if dialect == "sqlite":
+        # Quote every term so FTS5 operators in user input are literal
+        return " ".join(f'"{term}"' for term in terms)
+    return " ".join(terms)
+
+
+async def full_text_search(
+    db: AsyncSession,
+    q: str,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    count_cap: int = 1000,
+    columns: Optional[Sequence[Any]] = None
+) -> Tuple[List[SearchHit], int, Optional[str]]:
+    """
+    Search articles ranked by relevance (ts_rank on Postgres, BM25 on SQLite)
+
+    Pages are keyed on (score, id) when a cursor is given, otherwise offset by
+    page. Snippets are only generated for the returned page. Other databases
+    fall back to an ILIKE scan ordered by recency. Hits carry Article objects,
+    or rows of columns (which must include Article.id) if given.
+
+    Raises:
+        ValueError: If the cursor is malformed
+
+    Returns:
+        Tuple of (hits, total_count capped at count_cap, next_cursor)
+    """
+    dialect = db.bind.dialect.name
+    if dialect not in STATEMENTS:
+        return await _ilike_search(db, q, page, page_size, cursor, count_cap, columns)
+
+    match = build_match_query(q, dialect)
+    if not match:
+        return [], 0, None
+
+    search_sql, snippets_sql, count_sql = STATEMENTS[dialect]
+    params = {"match": match, "limit": page_size + 1, "offset": (page - 1) * page_size}
+    keyset = ""
+
+    if cursor:
+        try:
+            after_score, after_id = decode_token(cursor)
+            params.update(after_score=float(after_score), after_id=str(after_id), offset=0)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        keyset = KEYSET_FILTER.format(id_column=ID_COLUMNS[dialect])
+
+    rows = (await db.execute(text(search_sql.format(keyset=keyset)), params)).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    total_count = (await db.execute(text(count_sql), {"match": match, "cap": count_cap})).scalar_one()
+    if not rows:
+        return [], total_count, None
+
+    ids = [row[0] for row in rows]
+    snippets: Dict[str, str] = {
+        article_id: render_snippet(snippet)
+        for article_id, snippet in (await db.execute(
+            text(snippets_sql).bindparams(bindparam("ids", expanding=True)),
+            {"match": match, "ids": ids}
+        )).all()
+    }
+    result = await db.execute(select(*(columns or [Article])).where(Article.id.in_(ids)))
+    articles = {a.id: a for a in (result.all() if columns else result.scalars())}
+
+    hits = [
+        SearchHit(article=articles[article_id], score=float(score), snippet=snippets.get(article_id))
+        for article_id, score in rows
+        if article_id in articles
+    ]
+    next_cursor = encode_token([float(rows[-1][1]), rows[-1][0]]) if has_more else None
+    return hits, total_count, next_cursor
+
+
+async def _ilike_search(
+    db: AsyncSession,
+    q: str,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    count_cap: int,
+    columns: Optional[Sequence[Any]] = None
+) -> Tuple[List[SearchHit], int, Optional[str]]:
+    """Substring search for databases without a full-text index"""
+    stmt = select(*(columns or [Article])).where(
+        (Article.title.ilike(f"%{q}%")) |
+        (Article.content.ilike(f"%{q}%"))
+    )
+    total_count = await count_capped(db, stmt, count_cap)
+    articles, next_cursor = await paginate(db, stmt, page=page, page_size=page_size, cursor=cursor)
+    return [SearchHit(article=a) for a in articles], total_count, next_cursor
@@ -0,0 +1,430 @@
+"""
+Bulk export and import of the corpus as Parquet or Arrow IPC files
+
+A corpus directory holds articles.<ext>, chunks.<ext> and embeddings.<ext>
+(ext is parquet or arrow). Rows stream through in record batches, so
+neither side holds a whole table in memory. Embeddings are stored as a
+fixed-size float32 list column: export wraps the FAISS index storage and
+import hands the column buffers to FAISS without copying them (Arrow files
+are memory-mapped).
+
+    python -m app.ingestion.columnar export /data/corpus
+    python -m app.ingestion.columnar export /data/corpus --format arrow --since 2024-01-01
+    python -m app.ingestion.columnar import /data/corpus
+    python -m app.ingestion.columnar import /data/corpus --tables articles
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.core.logging import logger
+from app.core.response_cache import bump_generation
+from app.db.database import SessionLocal
+from app.db.models import Article, Chunk
+from app.ingestion.pipeline import NewsIndexer, NewsStore
+from app.rag.pipeline import article_id_from_chunk_id
+
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}  # format -> file extension
+TABLES = ("articles", "chunks", "embeddings")
+DEFAULT_BATCH_SIZE = 10000
+
+ARTICLE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("url", pa.string()),
+    ("title", pa.string()),
+    ("content", pa.string()),
+    ("summary", pa.string()),
+    ("source", pa.string()),
+    ("category", pa.string()),
+    ("published_at", pa.timestamp("us")),
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+    ("sentiment_score", pa.float64()),
+    ("sentiment_label", pa.string()),
+    ("main_topic", pa.string()),
+    ("entities", pa.string()),  # JSON, as stored
+    ("embedding_id", pa.string()),
+    ("content_hash", pa.string()),
+    ("summary_content_hash", pa.string()),
+])
+
+CHUNK_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("article_id", pa.string()),
+    ("chunk_index", pa.int32()),
+    ("text", pa.string()),
+    ("embedding_id", pa.string()),  # index position in the exporting deployment
+])
+
+
+def embedding_schema(dimension: int, model_name: str = settings.EMBEDDING_MODEL) -> pa.Schema:
+    """Chunk vectors keyed by chunk ID; the model and dimension travel as metadata"""
+    return pa.schema(
+        [
+            ("doc_id", pa.string()),
+            ("source", pa.string()),
+            ("embedding", pa.list_(pa.float32(), dimension)),
+        ],
+        metadata={"embedding_model": model_name, "dimension": str(dimension)},
+    )
+
+
+def table_path(directory: str, table: str, fmt: str) -> str:
+    return os.path.join(directory, f"{table}.{FORMATS[fmt]}")
+
+
+def find_table(directory: str, table: str) -> Optional[Tuple[str, str]]:
+    """(path, format) of a table's file in directory, or None"""
+    for fmt in FORMATS:
+        path = table_path(directory, table, fmt)
+        if os.path.exists(path):
+            return path, fmt
+    return None
+
+
+def open_writer(path: str, schema: pa.Schema, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(path, schema)
+
+
+def read_batches(path: str, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    """Schema and record batches of a table file; Arrow files are memory-mapped, not read"""
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=batch_size)
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+
+def vectors_to_arrow(vectors: np.ndarray) -> pa.FixedSizeListArray:
+    """(n, dim) float32 array as a fixed-size list column (no copy for C-contiguous input)"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1)), vectors.shape[1])
+
+
+def arrow_to_vectors(column: pa.Array) -> np.ndarray:
+    """Fixed-size list column as an (n, dim) float32 view of its buffer"""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    return column.flatten().to_numpy(zero_copy_only=True).reshape(len(column), column.type.list_size)
+
+
+def export_corpus(
+    directory: str,
+    tables: Sequence[str] = TABLES,
+    fmt: str = "parquet",
+    since: Optional[datetime] = None,
+    session_factory=SessionLocal,
+    vector_db=None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Write tables to directory; since limits the export to articles published since then
+
+    Returns:
+        Rows written per table
+    """
+    if fmt not in FORMATS:
+        raise IngestionException(f"Unknown export format: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    article_filter = Article.published_at >= since if since is not None else None
+    counts = {}
+
+    with session_factory() as db:
+        if "articles" in tables:
+            stmt = select(*[getattr(Article, name) for name in ARTICLE_SCHEMA.names]).order_by(Article.id)
+            if article_filter is not None:
+                stmt = stmt.where(article_filter)
+            counts["articles"] = _export_rows(db, stmt, ARTICLE_SCHEMA, table_path(directory, "articles", fmt), fmt, batch_size)
+
+        if "chunks" in tables:
+            stmt = select(*[getattr(Chunk, name) for name in CHUNK_SCHEMA.names]).order_by(Chunk.article_id, Chunk.chunk_index)
+            if article_filter is not None:
+                stmt = stmt.where(Chunk.article_id.in_(select(Article.id).where(article_filter)))
+            counts["chunks"] = _export_rows(db, stmt, CHUNK_SCHEMA, table_path(directory, "chunks", fmt), fmt, batch_size)
+
+        article_ids = None
+        if "embeddings" in tables and article_filter is not None:
+            article_ids = set(db.execute(select(Article.id).where(article_filter)).scalars())
+
+    if "embeddings" in tables:
+        if vector_db is None:
+            raise IngestionException("Exporting embeddings needs the vector index")
+        counts["embeddings"] = _export_embeddings(
+            vector_db, table_path(directory, "embeddings", fmt), fmt, batch_size, article_ids
+        )
+    logger.info(f"Exported corpus to {directory}: {counts}")
+    return counts
+
+
+def _export_rows(db, stmt, schema: pa.Schema, path: str, fmt: str, batch_size: int) -> int:
+    n_rows = 0
+    # Server-side cursor on Postgres: batch_size rows in memory at a time
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    with open_writer(path, schema, fmt) as writer:
+        for partition in result.partitions():
+            columns = zip(*partition)
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            n_rows += len(partition)
+    return n_rows
+
+
+def _export_embeddings(vector_db, path: str, fmt: str, batch_size: int, article_ids: Optional[set]) -> int:
+    schema = embedding_schema(vector_db.embedding_dim)
+    n_rows = 0
+    with open_writer(path, schema, fmt) as writer:
+        for doc_ids, sources, vectors in vector_db.iter_vectors(batch_size):
+            keep = [
+                i for i, doc_id in enumerate(doc_ids)
+                if doc_id is not None and (article_ids is None or article_id_from_chunk_id(doc_id) in article_ids)
+            ]
+            if not keep:
+                continue
+            if len(keep) < len(doc_ids):
+                doc_ids, sources, vectors = [doc_ids[i] for i in keep], [sources[i] for i in keep], vectors[keep]
+            writer.write_batch(pa.record_batch(
+                [pa.array(doc_ids, pa.string()), pa.array(sources, pa.string()), vectors_to_arrow(vectors)],
+                schema=schema
+            ))
+            n_rows += len(doc_ids)
+    return n_rows
+
+
+def import_corpus(
+    directory: str,
+    tables: Sequence[str] = TABLES,
+    session_factory=SessionLocal,
+    vector_db=None,
+    lexical_index=None,
+    lexical_path: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    Load the tables found in directory
+
+    Articles are upserted by URL through NewsStore, so category counts,
+    topic stats and entity links follow; an article whose URL is already
+    stored under another ID keeps that ID, and its chunks are renamed to
+    match (also when only chunks or embeddings are imported, as long as
+    the articles file is in the directory). Imported embeddings replace any stored under the same chunk IDs
+    and imported chunks replace the stored chunks of their articles (and
+    their BM25 entries). Chunk embedding IDs point at the imported vectors.
+
+    Returns:
+        Rows imported per table
+    """
+    counts = {}
+    id_map: Dict[str, str] = {}  # file article ID -> stored article ID, where they differ
+    positions: Dict[str, Any] = {}  # chunk ID -> position of its imported vector
+
+    if "articles" in tables and find_table(directory, "articles"):
+        counts["articles"] = _import_articles(*find_table(directory, "articles"), session_factory, batch_size, id_map)
+    elif find_table(directory, "articles"):
+        _map_stored_ids(*find_table(directory, "articles"), session_factory, batch_size, id_map)
+
+    if "embeddings" in tables and find_table(directory, "embeddings"):
+        if vector_db is None:
+            raise IngestionException("Importing embeddings needs the vector index")
+        counts["embeddings"] = _import_embeddings(
+            *find_table(directory, "embeddings"), session_factory, vector_db, batch_size, id_map, positions
+        )
+
+    if "chunks" in tables and find_table(directory, "chunks"):
+        counts["chunks"] = _import_chunks(
+            *find_table(directory, "chunks"), session_factory, lexical_index, batch_size, id_map, positions
+        )
+        if lexical_index is not None:
+            lexical_index.save(lexical_path or settings.LEXICAL_INDEX_PATH)
+
+    logger.info(f"Imported corpus from {directory}: {counts}")
+    return counts
+
+
+def _rename_chunk(chunk_id: str, id_map: Dict[str, str]) -> str:
+    article_id = article_id_from_chunk_id(chunk_id)
+    if article_id not in id_map:
+        return chunk_id
+    return id_map[article_id] + chunk_id[len(article_id):]
+
+
+def _import_articles(path: str, fmt: str, session_factory, batch_size: int, id_map: Dict[str, str]) -> int:
+    store = NewsStore(session_factory)
+    n_rows = 0
+    _, batches = read_batches(path, fmt, batch_size)
+    for batch in batches:
+        rows = batch.to_pylist()
+        articles = [
+            {**row, "entities": json.loads(row["entities"]) if row.get("entities") else {}}
+            for row in rows
+        ]
+        n_rows += store.save_articles(articles)
+
+        # save_articles keeps ingest semantics (new created_at, summary awaiting
+        # validation); restore the exported bookkeeping
+        restored = []
+        for row, article in zip(rows, articles):
+            if article["id"] != row["id"]:
+                id_map[row["id"]] = article["id"]
+            values = {"id": article["id"], "created_at": row["created_at"], "updated_at": row["updated_at"]}
+            if row.get("summary_content_hash") and row["summary_content_hash"] == row.get("content_hash"):
+                values["summary"] = row["summary"]
+                values["summary_content_hash"] = row["summary_content_hash"]
+            restored.append({key: value for key, value in values.items() if value is not None})
+        with session_factory() as db:
+            db.bulk_update_mappings(Article, restored)
+            db.commit()
+        bump_generation()
+    return n_rows
+
+
+def _map_stored_ids(path: str, fmt: str, session_factory, batch_size: int, id_map: Dict[str, str]) -> None:
+    """Map file article IDs to the IDs their URLs are stored under, without importing the articles"""
+    _, batches = read_batches(path, fmt, batch_size)
+    for batch in batches:
+        file_ids = dict(zip(batch.column("url").to_pylist(), batch.column("id").to_pylist()))
+        with session_factory() as db:
+            stored = db.execute(select(Article.url, Article.id).where(Article.url.in_(list(file_ids)))).all()
+        id_map.update((file_ids[url], article_id) for url, article_id in stored if file_ids[url] != article_id)
+
+
+def _import_embeddings(
+    path: str,
+    fmt: str,
+    session_factory,
+    vector_db,
+    batch_size: int,
+    id_map: Dict[str, str],
+    positions: Dict[str, Any]
+) -> int:
+    schema, batches = read_batches(path, fmt, batch_size)
+    metadata = {key.decode(): value.decode() for key, value in (schema.metadata or {}).items()}
+    if int(metadata.get("dimension", -1)) != vector_db.embedding_dim:
+        raise IngestionException(
+            f"Embeddings have dimension {metadata.get('dimension')}, the vector index {vector_db.embedding_dim}"
+        )
+    if metadata.get("embedding_model") != settings.EMBEDDING_MODEL:
+        raise IngestionException(
+            f"Embeddings were made with {metadata.get('embedding_model')}, queries use {settings.EMBEDDING_MODEL}; "
+            "reindex instead"
+        )
+
+    # Replace, not duplicate, vectors of chunks already in the index (one rebuild)
+    _, doc_id_batches = read_batches(path, fmt, batch_size)
+    vector_db.remove(
+        _rename_chunk(doc_id, id_map)
+        for batch in doc_id_batches
+        for doc_id in batch.column("doc_id").to_pylist()
+    )
+
+    n_rows = 0
+    for batch in batches:
+        doc_ids = [_rename_chunk(doc_id, id_map) for doc_id in batch.column("doc_id").to_pylist()]
+        sources = batch.column("source").to_pylist()
+        vectors = arrow_to_vectors(batch.column("embedding"))
+        if settings.VECTOR_DB_SHARDING == "time":
+            published = _published_at(session_factory, {article_id_from_chunk_id(d) for d in doc_ids})
+            batch_positions = vector_db.add(
+                vectors, doc_ids, sources=sources, save=False,
+                timestamps=[published.get(article_id_from_chunk_id(d)) for d in doc_ids]
+            )
+        else:
+            batch_positions = vector_db.add(vectors, doc_ids, sources=sources, save=False)
+        positions.update(zip(doc_ids, batch_positions))
+        n_rows += len(doc_ids)
+    vector_db.save()
+    return n_rows
+
+
+def _published_at(session_factory, article_ids: Iterable[str]) -> Dict[str, Optional[datetime]]:
+    with session_factory() as db:
+        return dict(db.execute(select(Article.id, Article.published_at).where(Article.id.in_(list(article_ids)))).all())
+
+
+def _import_chunks(
+    path: str,
+    fmt: str,
+    session_factory,
+    lexical_index,
+    batch_size: int,
+    id_map: Dict[str, str],
+    positions: Dict[str, Any]
+) -> int:
+    indexer = NewsIndexer(session_factory)
+    n_rows = 0
+
+    def save(rows: List[Dict[str, Any]]) -> None:
+        chunk_ids = [_rename_chunk(row["id"], id_map) for row in rows]
+        texts = [row["text"] for row in rows]
+        indexer.save_chunks(
+            chunk_ids,
+            [id_map.get(row["article_id"], row["article_id"]) for row in rows],
+            texts,
+            [positions.get(chunk_id) for chunk_id in chunk_ids]
+        )
+        if lexical_index is not None:
+            lexical_index.remove(chunk_ids)
+            lexical_index.add(chunk_ids, texts)
+
+    # save_chunks replaces all chunks of the articles it is given, so an
+    # article's chunks (exported in article order) must not straddle batches
+    pending: List[Dict[str, Any]] = []
+    _, batches = read_batches(path, fmt, batch_size)
+    for batch in batches:
+        rows = pending + batch.to_pylist()
+        split = len(rows)
+        while split and rows[split - 1]["article_id"] == rows[-1]["article_id"]:
+            split -= 1
+        rows, pending = rows[:split], rows[split:]
+        if rows:
+            save(rows)
+            n_rows += len(rows)
+    if pending:
+        save(pending)
+        n_rows += len(pending)
+    return n_rows
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+    from app.rag import pipeline as rag_pipeline
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="write the corpus to a directory")
+    export_parser.add_argument("directory")
+    export_parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="only articles published since (ISO date)")
+    import_parser = subparsers.add_parser("import", help="load a corpus directory")
+    import_parser.add_argument("directory")
+    for subparser in (export_parser, import_parser):
+        subparser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES))
+        subparser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.command == "export":
+        result = export_corpus(
+            args.directory, args.tables, args.format, args.since,
+            vector_db=rag_pipeline.load_vector_db(read_only=True) if "embeddings" in args.tables else None,
+            batch_size=args.batch_size
+        )
+    else:
+        result = import_corpus(
+            args.directory, args.tables,
+            vector_db=rag_pipeline.load_vector_db(read_only=False) if "embeddings" in args.tables else None,
+            lexical_index=rag_pipeline.load_lexical_index(read_only=False) if "chunks" in args.tables else None,
+            batch_size=args.batch_size
+        )
+    print(json.dumps(result))
@@ -1,14 +1,32 @@
 """News ingestion pipeline"""
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from collections import defaultdict
+import argparse
+import json
 import uuid
 import asyncio
 from app.core.config import settings
 from app.core.logging import logger
 from app.core.exceptions import IngestionException
-from app.nlp.processors import SentimentAnalyzer, NamedEntityRecognizer, TopicExtractor, TextCleaner
-from app.rag.pipeline import embedding_model, vector_db, TextChunker
+from app.core.metrics import ingestion_stage_seconds
+from app.core.response_cache import bump_generation
+from app.db.database import SessionLocal, init_db
+from app.db.models import Article, Chunk
+from app.db.counts import ALL_CATEGORIES, category_counts, increment_category_counts
+from app.db.entities import cooccurrence_cache, sync_article_entities
+from app.db.aggregates import (
+    add_contribution, increment_topic_stats, new_topic_deltas, topic_contribution
+)
+from app.nlp import stories, trends
+from app.nlp.processors import TopicExtractor, TextCleaner, get_entity_recognizer, get_sentiment_analyzer
+from app.rag import llm as rag_llm
+from app.rag import pipeline as rag_pipeline
+from app.rag import summaries
+from app.rag.pipeline import TextChunker
+from app.rag.summaries import compute_content_hash
 
 
 class NewsDataLoader:
@@ -83,28 +101,34 @@ class NewsDataProcessor:
     def __init__(self):
         """Initialize processor"""
         self.cleaner = TextCleaner()
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.ner = NamedEntityRecognizer()
+        # Shared across pipelines so models load once per process
+        self.sentiment_analyzer = get_sentiment_analyzer()
+        self.ner = get_entity_recognizer()
         self.topic_extractor = TopicExtractor()
     
     def process_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
         """Process single article"""
         try:
             # Clean content
-            content = article.get("content", "")
-            cleaned_content = self.cleaner.clean_text(content)
+            with ingestion_stage_seconds.time("clean"):
+                content = article.get("content", "")
+                cleaned_content = self.cleaner.clean_text(content)
             
             # Generate summary
-            summary = self.cleaner.extract_summary_sentences(cleaned_content, n_sentences=3)
+            with ingestion_stage_seconds.time("summarize"):
+                summary = self.cleaner.extract_summary_sentences(cleaned_content, n_sentences=3)
             
             # Sentiment analysis
-            sentiment = self.sentiment_analyzer.analyze(cleaned_content)
+            with ingestion_stage_seconds.time("sentiment"):
+                sentiment = self.sentiment_analyzer.analyze(cleaned_content)
             
             # NER
-            entities = self.ner.extract_entities(cleaned_content)
+            with ingestion_stage_seconds.time("ner"):
+                entities = self.ner.extract_entities(cleaned_content)
             
             # Topic extraction
-            topics = self.topic_extractor.extract_topics_simple(cleaned_content, n_topics=3)
+            with ingestion_stage_seconds.time("topics"):
+                topics = self.topic_extractor.extract_topics_simple(cleaned_content, n_topics=3)
             main_topic = topics[0] if topics else "General"
             
             # Add processed data
@@ -130,25 +154,187 @@ class NewsDataProcessor:
         return processed
 
 
+def parse_published_at(value: Any) -> Optional[datetime]:
+    """Parse ISO 8601 (NewsAPI) or RFC 822 (RSS) timestamps to naive UTC"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(str(value))
+            except (TypeError, ValueError):
+                logger.warning(f"Unparseable publish date: {value}")
+                return None
+    
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class NewsStore:
+    """Persist processed articles to the database"""
+    
+    def __init__(self, session_factory=SessionLocal):
+        """Initialize store"""
+        self.session_factory = session_factory
+    
+    def save_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """
+        Upsert articles by URL
+        
+        Assigns the stored article ID back onto each dict so the vector index
+        and database share IDs, and sets content_changed so repeats of an
+        unchanged article are not re-indexed. The ingest-time extractive
+        summary only replaces the stored summary when the content changed.
+        
+        Returns:
+            Number of articles saved
+        """
+        articles = [a for a in articles if a.get("url") and a.get("title")]
+        if not articles:
+            return 0
+        
+        db = self.session_factory()
+        try:
+            urls = [a["url"] for a in articles]
+            existing = {
+                row.url: row
+                for row in db.query(Article).filter(Article.url.in_(urls)).all()
+            }
+            
+            count_deltas = defaultdict(int)
+            topic_deltas = new_topic_deltas()
+            new_articles = []
+            saved_rows = []
+            now = datetime.utcnow()
+            
+            for data in articles:
+                row = existing.get(data["url"])
+                is_new = row is None
+                category = data.get("category")
+                if row is not None:
+                    # Retract the stored version before re-adding the update
+                    add_contribution(topic_deltas, topic_contribution(
+                        row.published_at, row.main_topic, row.sentiment_score
+                    ), sign=-1)
+                if row is None:
+                    row = Article(id=data.get("id") or str(uuid.uuid4()), url=data["url"])
+                    db.add(row)
+                    existing[data["url"]] = row
+                    count_deltas[ALL_CATEGORIES] += 1
+                    if category:
+                        count_deltas[category] += 1
+                elif row.category != category:
+                    if row.category:
+                        count_deltas[row.category] -= 1
+                    if category:
+                        count_deltas[category] += 1
+                data["id"] = row.id
+                
+                content_hash = compute_content_hash(data.get("content"))
+                data["content_changed"] = is_new or row.content_hash != content_hash
+                if row.content_hash != content_hash or not row.summary:
+                    row.summary = data.get("summary")
+                    row.summary_content_hash = None
+                row.content_hash = content_hash
+                
+                row.title = data["title"]
+                row.content = data.get("content")
+                row.source = data.get("source") or "Unknown"
+                row.category = category
+                # Undated articles fall back to ingest time so keyset pagination reaches them
+                row.published_at = parse_published_at(data.get("published_at")) or row.published_at or now
+                row.sentiment_score = data.get("sentiment_score")
+                row.sentiment_label = data.get("sentiment_label")
+                row.main_topic = data.get("main_topic")
+                row.entities = json.dumps(data.get("entities") or {})
+                saved_rows.append((row.id, row.published_at, data.get("entities")))
+                if is_new:
+                    new_articles.append({**data, "published_at": row.published_at})
+                add_contribution(topic_deltas, topic_contribution(
+                    row.published_at, row.main_topic, row.sentiment_score
+                ))
+            
+            increment_category_counts(db, count_deltas)
+            increment_topic_stats(db, topic_deltas)
+            sync_article_entities(db, saved_rows)
+            db.commit()
+            category_counts.invalidate()
+            cooccurrence_cache.invalidate()
+            bump_generation()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to save articles: {e}")
+            raise IngestionException(f"Saving articles failed: {e}")
+        finally:
+            db.close()
+        
+        # Only first sightings feed burst detection; re-ingests are not new mentions.
+        # The articles are committed, so a bad entities payload only skips them here.
+        burst_detector = trends.burst_detector
+        if burst_detector:
+            for article in new_articles:
+                try:
+                    burst_detector.observe_article(article)
+                except Exception as e:
+                    logger.warning(f"Burst detection skipped article {article.get('id')}: {e}")
+        logger.info(f"Saved {len(articles)} articles")
+        return len(articles)
+
+
 class NewsIndexer:
     """Index articles into vector DB"""
     
-    def __init__(self):
+    def __init__(self, session_factory=SessionLocal):
         """Initialize indexer"""
+        self.session_factory = session_factory
         self.chunker = TextChunker(
             chunk_size=settings.CHUNK_SIZE,
             overlap=settings.CHUNK_OVERLAP
         )
     
     async def index_articles(self, articles: List[Dict[str, Any]]) -> None:
-        """Index articles into vector DB"""
+        """
+        Index articles into vector DB
+        
+        Chunk IDs derive from the article ID, so a re-ingested article
+        would add a second copy of its chunks. Articles whose content is
+        unchanged (content_changed from NewsStore) and whose stored chunks
+        are all in the vector index are skipped; the others have their
+        previous chunks removed from both indexes before the new ones are
+        added (a rebuilt index is refilled by re-ingesting).
+        """
         try:
-            if not embedding_model or not vector_db:
+            embedding_model = rag_pipeline.embedding_model
+            vector_db = rag_pipeline.vector_db
+            if embedding_model is None or vector_db is None:
                 logger.warning("RAG components not initialized, skipping indexing")
                 return
             
+            indexed = self.indexed_chunk_ids([a["id"] for a in articles if a.get("id")])
+            up_to_date = {
+                article_id for article_id, chunk_ids in indexed.items()
+                if all(chunk_id in vector_db for chunk_id in chunk_ids)
+            }
+            articles = [
+                a for a in articles
+                if a.get("content_changed", True) or a.get("id") not in up_to_date
+            ]
+            if not articles:
+                logger.info("No new or changed articles to index")
+                return
+            stale_chunk_ids = [
+                chunk_id for a in articles for chunk_id in indexed.get(a.get("id"), ())
+            ]
+            
             chunk_texts = []
             chunk_ids = []
+            chunk_sources = []
+            chunk_times = []
             article_ids = []
             
             for article in articles:
@@ -161,10 +347,13 @@ class NewsIndexer:
                 
                 # Chunk the content
                 chunks = self.chunker.chunk_text(content, chunk_id_prefix=article_id)
+                published_at = parse_published_at(article.get("published_at"))
                 
                 for chunk_id, chunk_text in chunks:
                     chunk_texts.append(chunk_text)
                     chunk_ids.append(chunk_id)
+                    chunk_sources.append(article.get("source") or "Unknown")
+                    chunk_times.append(published_at)
                     article_ids.append(article_id)
             
             if not chunk_texts:
@@ -172,15 +361,75 @@ class NewsIndexer:
                 return
             
             # Generate embeddings
-            embeddings = embedding_model.encode(chunk_texts)
+            with ingestion_stage_seconds.time("embed"):
+                embeddings = embedding_model.encode(chunk_texts)
             
-            # Add to vector DB
-            vector_db.add(embeddings, chunk_ids)
+            with ingestion_stage_seconds.time("index"):
+                lexical_index = rag_pipeline.lexical_index
+                if stale_chunk_ids:
+                    # Previous version of re-indexed articles
+                    vector_db.remove(stale_chunk_ids)
+                    if lexical_index is not None:
+                        lexical_index.remove(stale_chunk_ids)
+                
+                # Add to vector DB
+                if settings.VECTOR_DB_SHARDING == "time":
+                    # Chunks go to the shard of their article's publish window
+                    positions = vector_db.add(embeddings, chunk_ids, sources=chunk_sources, timestamps=chunk_times)
+                else:
+                    positions = vector_db.add(embeddings, chunk_ids, sources=chunk_sources)
+                
+                # Chunk texts back the cross-encoder re-ranker
+                self.save_chunks(chunk_ids, article_ids, chunk_texts, positions)
+                
+                # Keep the BM25 index in step with the vector index
+                if lexical_index is not None:
+                    lexical_index.add_and_save(settings.LEXICAL_INDEX_PATH, chunk_ids, chunk_texts)
             
             logger.info(f"Indexed {len(chunk_texts)} chunks from {len(articles)} articles")
         except Exception as e:
             logger.error(f"Failed to index articles: {e}")
             raise IngestionException(f"Indexing failed: {e}")
+    
+    def indexed_chunk_ids(self, article_ids: List[str]) -> Dict[str, List[str]]:
+        """Stored chunk IDs of each already-indexed article"""
+        if not article_ids:
+            return {}
+        chunk_ids: Dict[str, List[str]] = defaultdict(list)
+        with self.session_factory() as db:
+            for chunk_id, article_id in db.query(Chunk.id, Chunk.article_id).filter(
+                Chunk.article_id.in_(article_ids)
+            ):
+                chunk_ids[article_id].append(chunk_id)
+        return chunk_ids
+    
+    def save_chunks(
+        self,
+        chunk_ids: List[str],
+        article_ids: List[str],
+        chunk_texts: List[str],
+        positions: List[Any]
+    ) -> None:
+        """Replace the stored chunks of re-indexed articles"""
+        db = self.session_factory()
+        try:
+            db.query(Chunk).filter(Chunk.article_id.in_(set(article_ids))).delete(synchronize_session=False)
+            db.bulk_insert_mappings(Chunk, [
+                {
+                    "id": chunk_id,
+                    "article_id": article_id,
+                    "chunk_index": int(chunk_id.rsplit("_chunk_", 1)[1]),
+                    "text": text,
+                    "embedding_id": str(position) if position is not None else None,
+                }
+                for chunk_id, article_id, text, position in zip(chunk_ids, article_ids, chunk_texts, positions)
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
 
 
 class IngestionPipeline:
@@ -190,7 +439,10 @@ class IngestionPipeline:
         """Initialize pipeline"""
         self.loader = NewsDataLoader()
         self.processor = NewsDataProcessor()
+        self.store = NewsStore()
         self.indexer = NewsIndexer()
+        self.summary_task: Optional[asyncio.Task] = None
+        self.summary_categories: set = set()  # waiting for the running precompute
     
     async def ingest(self, source: str = "newsapi") -> List[Dict[str, Any]]:
         """
@@ -203,13 +455,14 @@ class IngestionPipeline:
             logger.info(f"Starting ingestion from {source}")
             
             # Load articles
-            if source == "newsapi" and settings.NEWSAPI_KEY:
-                articles = await self.loader.load_from_newsapi(
-                    settings.NEWSAPI_KEY,
-                    limit=settings.INGESTION_BATCH_SIZE
-                )
-            else:
-                articles = []
+            with ingestion_stage_seconds.time("fetch"):
+                if source == "newsapi" and settings.NEWSAPI_KEY:
+                    articles = await self.loader.load_from_newsapi(
+                        settings.NEWSAPI_KEY,
+                        limit=settings.INGESTION_BATCH_SIZE
+                    )
+                else:
+                    articles = []
             
             if not articles:
                 logger.warning(f"No articles loaded from {source}")
@@ -218,11 +471,112 @@ class IngestionPipeline:
             # Process articles
             processed_articles = await self.processor.process_batch(articles)
             
+            # Persist articles
+            with ingestion_stage_seconds.time("store"):
+                self.store.save_articles(processed_articles)
+            
             # Index articles
             await self.indexer.index_articles(processed_articles)
             
+            # Group near-duplicate coverage into stories
+            with ingestion_stage_seconds.time("cluster"):
+                self.cluster_stories(processed_articles)
+            
+            # Precompute LLM summaries for the freshest articles, off the ingest path
+            self.schedule_summaries(processed_articles)
+            
             logger.info(f"Ingestion complete: {len(processed_articles)} articles processed")
             return processed_articles
         except Exception as e:
             logger.error(f"Ingestion pipeline failed: {e}")
             raise IngestionException(f"Ingestion failed: {e}")
+    
+    async def run(self, source: str = "newsapi") -> List[Dict[str, Any]]:
+        """Ingest once and wait for the background summaries (for one-shot scripts)"""
+        articles = await self.ingest(source)
+        await self.wait_for_summaries()
+        return articles
+    
+    def cluster_stories(self, articles: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Assign saved articles to story clusters"""
+        clusterer = stories.story_clusterer
+        if not clusterer:
+            return {}
+        
+        try:
+            return clusterer.assign_articles(articles)
+        except Exception as e:
+            # Stories are derived data; a failed batch must not fail ingestion
+            logger.error(f"Story clustering failed: {e}")
+            clusterer.load()
+            return {}
+    
+    def schedule_summaries(self, articles: List[Dict[str, Any]]) -> Optional[asyncio.Task]:
+        """
+        Precompute summaries in a background task
+
+        Ingestion does not wait for the rate-limited LLM calls. While a
+        precompute runs, further runs queue their categories and the task
+        picks them up when it finishes, so at most one runs at a time.
+        """
+        if not settings.SUMMARY_PRECOMPUTE_ENABLED or not summaries.summary_precomputer:
+            return None
+
+        self.summary_categories.update(a.get("category") for a in articles if a.get("category"))
+        if self.summary_task is None or self.summary_task.done():
+            self.summary_task = asyncio.create_task(self._precompute_queued())
+        return self.summary_task
+
+    async def _precompute_queued(self) -> int:
+        generated = 0
+        while self.summary_categories:
+            categories, self.summary_categories = self.summary_categories, set()
+            try:
+                generated += await self.precompute_summaries(categories)
+            except Exception as e:
+                logger.error(f"Background summary precomputation failed: {e}")
+        return generated
+
+    async def wait_for_summaries(self) -> int:
+        """Wait for background summary precomputation (before the event loop exits)"""
+        if self.summary_task is None:
+            return 0
+        return await self.summary_task
+
+    async def precompute_summaries(self, categories: Iterable[str]) -> int:
+        """Summarize the top articles of each category"""
+        precomputer = summaries.summary_precomputer
+        if not settings.SUMMARY_PRECOMPUTE_ENABLED or not precomputer:
+            return 0
+        
+        return await precomputer.precompute(categories)
+
+
+def init_ingestion_components() -> None:
+    """
+    Load what ingestion writes to and feeds, for a standalone ingestion process
+
+    API workers of a preload deployment open the indexes read-only, so
+    ingestion runs elsewhere (python -m app.ingestion.pipeline). This
+    process loads the indexes writable, plus the story clusterer, burst
+    detector and summary precomputer that ingest() hands articles to.
+    """
+    init_db()
+    rag_pipeline.init_rag_components(read_only=False)
+    rag_llm.init_rag_engine()
+    summaries.init_summary_precomputer(rag_llm.rag_engine)
+    stories.init_story_clusterer(rag_pipeline.embedding_model, rag_pipeline.embedding_model.dimension)
+    with SessionLocal() as db:
+        trends.init_burst_detector(db)
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Ingest news once, then wait for its background summaries")
+    parser.add_argument("--source", default="newsapi", help="news source to load (default: newsapi)")
+    args = parser.parse_args()
+
+    setup_logging()
+    init_ingestion_components()
+    print(f"Ingested {len(asyncio.run(IngestionPipeline().run(args.source)))} articles")
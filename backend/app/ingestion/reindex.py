@@ -0,0 +1,381 @@
+"""
+Re-chunk and re-embed the whole corpus into a new index generation
+
+Run after changing EMBEDDING_MODEL, CHUNK_SIZE/CHUNK_OVERLAP or the index
+type. An interrupted run resumes from its last checkpoint.
+
+    python -m app.ingestion.reindex                  # build, then swap in
+    python -m app.ingestion.reindex --workers 8 --batch-size 500
+    python -m app.ingestion.reindex --no-swap        # build only
+    python -m app.ingestion.reindex --swap-only      # swap a finished build in
+    python -m app.ingestion.reindex --restart        # discard a previous build
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.exceptions import IngestionException
+from app.core.logging import logger
+from app.db.database import SessionLocal
+from app.db.models import Article
+from app.ingestion.pipeline import NewsIndexer
+from app.rag.lexical import BM25Index
+from app.rag.pipeline import EmbeddingModel, TextChunker, VectorDatabase, article_id_from_chunk_id
+
+# (chunker, embedding model) of a pool process, set by _init_worker
+_worker_state: Optional[Tuple[TextChunker, Any]] = None
+
+
+def _init_worker(model_factory: Callable[[str], Any], model_name: str, chunk_size: int, overlap: int) -> None:
+    global _worker_state
+    _worker_state = (TextChunker(chunk_size=chunk_size, overlap=overlap), model_factory(model_name))
+
+
+def embed_articles(rows: List[Tuple[str, Optional[str], str]]) -> Dict[str, Any]:
+    """Chunk and embed (article_id, content, source) rows in a pool process"""
+    chunker, model = _worker_state
+    chunked: Dict[str, Any] = {"chunk_ids": [], "texts": [], "sources": []}
+    for article_id, content, source in rows:
+        for chunk_id, text in chunker.chunk_text(content or "", chunk_id_prefix=article_id):
+            chunked["chunk_ids"].append(chunk_id)
+            chunked["texts"].append(text)
+            chunked["sources"].append(source or "Unknown")
+    chunked["embeddings"] = np.asarray(model.encode(chunked["texts"]), dtype=np.float32) if chunked["texts"] else None
+    return chunked
+
+
+class Reindexer:
+    """
+    Builds a complete vector and BM25 index beside the live one
+
+    Articles stream from the database on a server-side cursor in ID order;
+    chunking and embedding run on a process pool while the parent adds the
+    results, in order, to a staged index under <index dir>/.reindex/. Every
+    checkpoint_seconds the staged indexes are saved and the last article ID
+    recorded, so a restarted build truncates the staged indexes to the
+    checkpoint and continues after it. Ingestion can keep running during
+    the build: before the swap, articles changed or deleted since the build
+    started are re-done.
+
+    The swap rewrites the chunk rows, then publishes the staged index as
+    the next generation of the live one (read-only replicas switch at their
+    next refresh) and moves the BM25 file into place. Pause ingestion and
+    retention for the swap: a writer still holding the old index refuses
+    to save over the new generation, and should be restarted with the API
+    workers, which load the BM25 index at startup.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        index_path: Optional[str] = None,
+        lexical_path: Optional[str] = None,
+        workers: int = settings.REINDEX_WORKERS,
+        batch_size: int = settings.REINDEX_BATCH_SIZE,
+        checkpoint_seconds: float = settings.REINDEX_CHECKPOINT_SECONDS,
+        model_name: str = settings.EMBEDDING_MODEL,
+        model_factory: Callable[[str], Any] = EmbeddingModel,
+        chunk_size: int = settings.CHUNK_SIZE,
+        overlap: int = settings.CHUNK_OVERLAP,
+        progress_seconds: float = 10.0
+    ):
+        """Initialize reindexer (workers=0 chunks and embeds in this process)"""
+        if settings.VECTOR_DB_SHARDING != "none":
+            raise IngestionException("Reindexing a sharded vector index is not supported")
+        self.session_factory = session_factory
+        self.index_path = index_path or settings.VECTOR_DB_PATH
+        self.lexical_path = lexical_path or settings.LEXICAL_INDEX_PATH
+        self.workers = workers
+        self.batch_size = batch_size
+        self.checkpoint_seconds = checkpoint_seconds
+        self.model_name = model_name
+        self.model_factory = model_factory
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.progress_seconds = progress_seconds
+        self.staging_dir = os.path.join(os.path.dirname(os.path.abspath(self.index_path)), ".reindex")
+        self.checkpoint_path = os.path.join(self.staging_dir, "checkpoint.json")
+        self.vector_db: Optional[VectorDatabase] = None
+        self.lexical_index = BM25Index() if settings.RETRIEVAL_MODE == "hybrid" else None
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Settings a staged build was made with; a resumed build must match"""
+        return {"embedding_model": self.model_name, "chunk_size": self.chunk_size, "overlap": self.overlap}
+
+    def _staged_vector_db(self, dimension: int) -> VectorDatabase:
+        return VectorDatabase(embedding_dim=dimension, index_path=os.path.join(self.staging_dir, "faiss_index"))
+
+    @property
+    def _staged_lexical_path(self) -> str:
+        return os.path.join(self.staging_dir, "bm25_index.pkl")
+
+    def _read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def open_staging(self, restart: bool = False) -> Dict[str, Any]:
+        """Start a staged build, or reopen the last one at its checkpoint"""
+        if restart:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+        checkpoint = self._read_checkpoint()
+        if checkpoint is not None and checkpoint["config"] != self.config:
+            raise IngestionException(
+                f"A reindex with {checkpoint['config']} is staged in {self.staging_dir}; "
+                f"finish it or pass --restart"
+            )
+        if checkpoint is None:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)  # files of a build that never checkpointed
+            os.makedirs(self.staging_dir)
+            checkpoint = {
+                "config": self.config,
+                "started_at": datetime.utcnow().isoformat(),
+                "last_article_id": None,
+                "built": False,
+                "articles": 0,
+                "chunks": 0,
+                "vectors": 0,
+                "lexical_chunks": 0,
+                "dimension": None,
+            }
+            self._write_checkpoint(checkpoint)
+            return checkpoint
+
+        # Drop whatever was added after the checkpoint; those articles are redone
+        if checkpoint["dimension"] is not None:
+            self.vector_db = self._staged_vector_db(checkpoint["dimension"])
+            extra = [doc_id for pos, doc_id in self.vector_db.doc_id_map.items() if pos >= checkpoint["vectors"]]
+            if extra:
+                self.vector_db.remove(extra)
+        if self.lexical_index is not None:
+            self.lexical_index = BM25Index.load(self._staged_lexical_path)
+            self.lexical_index.remove(self.lexical_index.doc_ids[checkpoint["lexical_chunks"]:])
+        logger.info(
+            f"Resuming reindex after {checkpoint['articles']} articles "
+            f"(last article {checkpoint['last_article_id']})"
+        )
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """Save the staged indexes, then record how far they got"""
+        if self.vector_db is not None:
+            self.vector_db.save()
+            checkpoint["vectors"] = len(self.vector_db)
+        if self.lexical_index is not None:
+            self.lexical_index.save(self._staged_lexical_path)
+            checkpoint["lexical_chunks"] = len(self.lexical_index)
+        self._write_checkpoint(checkpoint)
+
+    def _map(self, batches: Iterable[List[Tuple]]) -> Iterator[Tuple[List[Tuple], Dict[str, Any]]]:
+        """Chunk and embed batches on the pool, yielding results in input order"""
+        initargs = (self.model_factory, self.model_name, self.chunk_size, self.overlap)
+        if self.workers <= 0:
+            _init_worker(*initargs)
+            for rows in batches:
+                yield rows, embed_articles(rows)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+            pending = deque()
+            for rows in batches:
+                pending.append((rows, pool.submit(embed_articles, rows)))
+                if len(pending) >= 2 * self.workers:  # bounded read-ahead
+                    rows, future = pending.popleft()
+                    yield rows, future.result()
+            while pending:
+                rows, future = pending.popleft()
+                yield rows, future.result()
+
+    def _add(self, checkpoint: Dict[str, Any], chunked: Dict[str, Any]) -> None:
+        if not chunked["chunk_ids"]:
+            return
+        if self.vector_db is None:
+            checkpoint["dimension"] = int(chunked["embeddings"].shape[1])
+            self.vector_db = self._staged_vector_db(checkpoint["dimension"])
+        self.vector_db.add(chunked["embeddings"], chunked["chunk_ids"], sources=chunked["sources"], save=False)
+        if self.lexical_index is not None:
+            self.lexical_index.add(chunked["chunk_ids"], chunked["texts"])
+
+    def build(self, checkpoint: Dict[str, Any]) -> None:
+        """Index every article after the checkpoint into the staged indexes"""
+        with self.session_factory() as db:
+            total = db.execute(select(func.count()).select_from(Article)).scalar_one()
+            stmt = select(Article.id, Article.content, Article.source).order_by(Article.id)
+            if checkpoint["last_article_id"] is not None:
+                stmt = stmt.where(Article.id > checkpoint["last_article_id"])
+            # Server-side cursor on Postgres: one query, batch_size rows in memory at a time
+            result = db.execute(stmt.execution_options(yield_per=self.batch_size))
+            batches = ([tuple(row) for row in partition] for partition in result.partitions())
+
+            start = time.monotonic()
+            resumed_from = (checkpoint["articles"], checkpoint["chunks"])
+            next_checkpoint = start + self.checkpoint_seconds
+            next_progress = start + self.progress_seconds
+            for rows, chunked in self._map(batches):
+                self._add(checkpoint, chunked)
+                checkpoint["last_article_id"] = rows[-1][0]
+                checkpoint["articles"] += len(rows)
+                checkpoint["chunks"] += len(chunked["chunk_ids"])
+
+                now = time.monotonic()
+                if now >= next_checkpoint:
+                    self.save_checkpoint(checkpoint)
+                    next_checkpoint = now + self.checkpoint_seconds
+                if now >= next_progress:
+                    self.log_progress(checkpoint, total, resumed_from, now - start)
+                    next_progress = now + self.progress_seconds
+
+        checkpoint["built"] = True
+        self.save_checkpoint(checkpoint)
+        logger.info(f"Reindex built: {checkpoint['articles']} articles, {checkpoint['chunks']} chunks")
+
+    @staticmethod
+    def log_progress(checkpoint: Dict[str, Any], total: int, resumed_from: Tuple[int, int], seconds: float) -> None:
+        """Throughput of this run and time left at that rate"""
+        article_rate = (checkpoint["articles"] - resumed_from[0]) / seconds
+        chunk_rate = (checkpoint["chunks"] - resumed_from[1]) / seconds
+        remaining = max(0, total - checkpoint["articles"])
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining / article_rate)) if article_rate else "unknown"
+        logger.info(
+            f"Reindexed {checkpoint['articles']}/{total} articles ({checkpoint['chunks']} chunks): "
+            f"{article_rate:.1f} articles/s, {chunk_rate:.1f} chunks/s, ETA {eta}"
+        )
+
+    def reconcile(self, checkpoint: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Redo articles updated since the build (or last reconcile) started and
+        drop articles deleted meanwhile
+
+        Returns:
+            Counts of re-indexed and dropped articles
+        """
+        since = datetime.fromisoformat(checkpoint["started_at"])
+        started_at = datetime.utcnow()
+        with self.session_factory() as db:
+            current, changed = set(), []
+            for article_id, updated_at in db.execute(
+                select(Article.id, Article.updated_at).execution_options(yield_per=10000)
+            ):
+                current.add(article_id)
+                if updated_at is not None and updated_at >= since:
+                    changed.append(article_id)
+
+            staged = self.vector_db.positions if self.vector_db is not None else {}
+            deleted = {article_id_from_chunk_id(doc_id) for doc_id in staged} - current
+            stale = deleted | set(changed)
+            stale_chunks = [doc_id for doc_id in staged if article_id_from_chunk_id(doc_id) in stale]
+            if stale_chunks:
+                self.vector_db.remove(stale_chunks)
+                if self.lexical_index is not None:
+                    self.lexical_index.remove(stale_chunks)
+
+            def batches():
+                for start in range(0, len(changed), self.batch_size):
+                    ids = changed[start:start + self.batch_size]
+                    yield [tuple(row) for row in db.execute(
+                        select(Article.id, Article.content, Article.source).where(Article.id.in_(ids))
+                    )]
+
+            for _, chunked in self._map(batches()):
+                self._add(checkpoint, chunked)
+
+        checkpoint["started_at"] = started_at.isoformat()
+        self.save_checkpoint(checkpoint)
+        report = {"reindexed": len(changed), "dropped": len(deleted)}
+        logger.info(f"Reconciled reindex: {report['reindexed']} changed articles, {report['dropped']} deleted")
+        return report
+
+    def rewrite_chunks(self) -> int:
+        """Replace the chunk rows with the new chunking and index positions"""
+        chunker = TextChunker(chunk_size=self.chunk_size, overlap=self.overlap)
+        positions = self.vector_db.positions if self.vector_db is not None else {}
+        indexer = NewsIndexer(self.session_factory)
+        n_chunks, last_id = 0, None
+        while True:
+            with self.session_factory() as db:
+                stmt = select(Article.id, Article.content).order_by(Article.id).limit(self.batch_size)
+                if last_id is not None:
+                    stmt = stmt.where(Article.id > last_id)
+                rows = db.execute(stmt).all()
+            if not rows:
+                return n_chunks
+            last_id = rows[-1].id
+            chunk_ids, article_ids, texts = [], [], []
+            for article_id, content in rows:
+                for chunk_id, text in chunker.chunk_text(content or "", chunk_id_prefix=article_id):
+                    chunk_ids.append(chunk_id)
+                    article_ids.append(article_id)
+                    texts.append(text)
+            if chunk_ids:
+                indexer.save_chunks(chunk_ids, article_ids, texts, [positions.get(c) for c in chunk_ids])
+                n_chunks += len(chunk_ids)
+
+    def swap(self, checkpoint: Dict[str, Any]) -> int:
+        """
+        Catch up on changes, then make the staged build the live index
+
+        Returns:
+            Live vector index generation
+        """
+        if not checkpoint["built"]:
+            raise IngestionException("The staged reindex is not finished; run it without --swap-only first")
+        self.reconcile(checkpoint)
+        if self.vector_db is None:
+            raise IngestionException("The staged reindex has no vectors; nothing to swap in")
+        # Chunk rows first: rerunning after a crash in here is harmless
+        n_chunks = self.rewrite_chunks()
+        generation = self.vector_db.publish(self.index_path)
+        if self.lexical_index is not None:
+            os.replace(self._staged_lexical_path, self.lexical_path)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        logger.info(f"Swapped in reindexed corpus: vector generation {generation}, {n_chunks} chunk rows")
+        return generation
+
+    def run(self, swap: bool = True, swap_only: bool = False, restart: bool = False) -> Dict[str, Any]:
+        """Build (resuming if possible) and optionally swap in; returns a summary"""
+        start = time.monotonic()
+        checkpoint = self.open_staging(restart=restart)
+        if not swap_only and not checkpoint["built"]:
+            self.build(checkpoint)
+        report = {
+            "articles": checkpoint["articles"],
+            "chunks": checkpoint["chunks"],
+            "seconds": round(time.monotonic() - start, 1),
+            "generation": self.swap(checkpoint) if swap or swap_only else None,
+        }
+        return report
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.REINDEX_WORKERS, help="0 runs in this process")
+    parser.add_argument("--batch-size", type=int, default=settings.REINDEX_BATCH_SIZE)
+    parser.add_argument("--checkpoint-seconds", type=float, default=settings.REINDEX_CHECKPOINT_SECONDS)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--no-swap", action="store_true", help="stop after building the staged index")
+    group.add_argument("--swap-only", action="store_true", help="swap in a finished staged index")
+    parser.add_argument("--restart", action="store_true", help="discard a staged build and start over")
+    args = parser.parse_args()
+
+    setup_logging()
+    reindexer = Reindexer(workers=args.workers, batch_size=args.batch_size, checkpoint_seconds=args.checkpoint_seconds)
+    print(json.dumps(reindexer.run(swap=not args.no_swap, swap_only=args.swap_only, restart=args.restart)))
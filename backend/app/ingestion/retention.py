@@ -0,0 +1,295 @@
+"""
+Age-based retention: delete expired articles, their chunks and index entries
+
+    python -m app.ingestion.retention            # one pass
+    python -m app.ingestion.retention --dry-run  # count what would go
+"""
+
+import argparse
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import registry
+from app.core.response_cache import bump_generation
+from app.db.aggregates import add_contribution, increment_topic_stats, new_topic_deltas, topic_contribution
+from app.db.counts import ALL_CATEGORIES, category_counts, increment_category_counts
+from app.db.database import SessionLocal
+from app.db.entities import cooccurrence_cache, sync_article_entities
+from app.db.models import Article, Chunk, StoryArticle, StoryCluster
+from app.rag import pipeline as rag_pipeline
+from app.rag.lexical import LOG_SUFFIX
+
+retention_deleted = registry.counter(
+    "retention_deleted_total",
+    "Rows and index entries deleted by retention",
+    ["kind"]
+)
+retention_reclaimed_bytes = registry.counter(
+    "retention_reclaimed_bytes_total",
+    "Index memory and disk freed by retention compaction",
+    ["kind"]
+)
+
+
+class RetentionManager:
+    """
+    Deletes news older than its category's retention window
+
+    The expired articles' chunks are first compacted out of the vector
+    and BM25 indexes in one rebuild, beside the live indexes so searches
+    are not blocked. The articles are then deleted in batches of
+    batch_size, each in its own transaction with the derived rows (chunks,
+    entity links, story membership, category and topic aggregates). A
+    pass that fails part-way leaves nothing indexed without its article,
+    and the next pass picks up where it stopped.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_age_days: int = settings.RETENTION_MAX_AGE_DAYS,
+        category_max_age_days: Optional[Dict[str, int]] = None,
+        batch_size: int = settings.RETENTION_BATCH_SIZE
+    ):
+        """Initialize manager (category_max_age_days defaults to RETENTION_CATEGORY_MAX_AGE_DAYS)"""
+        self.session_factory = session_factory
+        self.max_age_days = max_age_days
+        self.category_max_age_days = dict(
+            settings.RETENTION_CATEGORY_MAX_AGE_DAYS if category_max_age_days is None else category_max_age_days
+        )
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+
+    def expired_condition(self, now: datetime):
+        """Articles published before their category's cutoff (0 days keeps a category forever)"""
+        clauses = [
+            and_(Article.category == category, Article.published_at < now - timedelta(days=days))
+            for category, days in self.category_max_age_days.items()
+            if days > 0
+        ]
+        if self.max_age_days > 0:
+            clauses.append(and_(
+                or_(Article.category.is_(None), Article.category.notin_(list(self.category_max_age_days))),
+                Article.published_at < now - timedelta(days=self.max_age_days)
+            ))
+        return or_(*clauses) if clauses else None
+
+    def count_expired(self, now: Optional[datetime] = None) -> int:
+        condition = self.expired_condition(now or datetime.utcnow())
+        if condition is None:
+            return 0
+        with self.session_factory() as db:
+            return db.execute(select(func.count()).select_from(Article).where(condition)).scalar_one()
+
+    def expired_chunk_ids(self, condition) -> List[str]:
+        with self.session_factory() as db:
+            return list(db.execute(
+                select(Chunk.id).join(Article, Article.id == Chunk.article_id).where(condition)
+            ).scalars())
+
+    def delete_batch(self, db: Session, condition) -> int:
+        """
+        Delete one batch of expired articles and their derived rows
+
+        Returns:
+            Number of articles deleted
+        """
+        rows = db.execute(
+            select(
+                Article.id, Article.category, Article.published_at,
+                Article.main_topic, Article.sentiment_score
+            ).where(condition).limit(self.batch_size)
+        ).all()
+        if not rows:
+            return 0
+        article_ids = [row.id for row in rows]
+
+        count_deltas: Dict[str, int] = defaultdict(int)
+        topic_deltas = new_topic_deltas()
+        for row in rows:
+            count_deltas[ALL_CATEGORIES] -= 1
+            if row.category:
+                count_deltas[row.category] -= 1
+            add_contribution(topic_deltas, topic_contribution(
+                row.published_at, row.main_topic, row.sentiment_score
+            ), sign=-1)
+        increment_category_counts(db, count_deltas)
+        increment_topic_stats(db, topic_deltas)
+        # No entities left: unlinks the articles and decrements entity counts
+        sync_article_entities(db, [(row.id, row.published_at, None) for row in rows])
+
+        story_counts = db.execute(
+            select(StoryArticle.story_id, func.count())
+            .where(StoryArticle.article_id.in_(article_ids))
+            .group_by(StoryArticle.story_id)
+        ).all()
+        for story_id, count in story_counts:
+            db.query(StoryCluster).filter(StoryCluster.id == story_id).update(
+                {StoryCluster.article_count: StoryCluster.article_count - count}, synchronize_session=False
+            )
+        db.query(StoryArticle).filter(StoryArticle.article_id.in_(article_ids)).delete(synchronize_session=False)
+        if story_counts:
+            db.query(StoryCluster).filter(
+                StoryCluster.id.in_([story_id for story_id, _ in story_counts]),
+                StoryCluster.article_count <= 0
+            ).delete(synchronize_session=False)
+
+        db.query(Chunk).filter(Chunk.article_id.in_(article_ids)).delete(synchronize_session=False)
+        db.query(Article).filter(Article.id.in_(article_ids)).delete(synchronize_session=False)
+        return len(rows)
+
+    def compact_indexes(self, chunk_ids: List[str], now: datetime) -> Dict[str, int]:
+        """Remove deleted chunks from the vector and BM25 indexes"""
+        removed = {"vectors": 0, "lexical_chunks": 0, "dropped_shards": 0}
+        vector_db = rag_pipeline.vector_db
+        if vector_db is not None:
+            ages = [self.max_age_days, *self.category_max_age_days.values()]
+            if getattr(vector_db, "scheme", None) == "time" and min(ages) > 0:
+                # Whole windows past every category's retention go without a rebuild
+                removed["dropped_shards"] = len(vector_db.drop_shards_before(now - timedelta(days=max(ages))))
+            if chunk_ids:
+                removed["vectors"] = vector_db.remove(chunk_ids)
+        elif chunk_ids:
+            logger.warning("No vector index loaded; expired chunks are only deleted from the database")
+
+        lexical_index = rag_pipeline.lexical_index
+        if lexical_index is not None and chunk_ids:
+            removed["lexical_chunks"] = lexical_index.remove(chunk_ids)
+            if removed["lexical_chunks"]:
+                lexical_index.save(settings.LEXICAL_INDEX_PATH)
+        return removed
+
+    @staticmethod
+    def footprint() -> Dict[str, int]:
+        """Index memory and disk, in bytes"""
+        vector_db = rag_pipeline.vector_db
+        lexical_index = rag_pipeline.lexical_index
+        memory = disk = 0
+        if vector_db is not None:
+            memory += vector_db.nbytes
+            disk += vector_db.disk_bytes()
+        if lexical_index is not None:
+            memory += lexical_index.nbytes
+            for path in (settings.LEXICAL_INDEX_PATH, settings.LEXICAL_INDEX_PATH + LOG_SUFFIX):
+                if os.path.exists(path):
+                    disk += os.path.getsize(path)
+        return {"memory": memory, "disk": disk}
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        One retention pass
+
+        Returns:
+            Counts of deleted rows and index entries, and reclaimed bytes
+        """
+        now = now or datetime.utcnow()
+        condition = self.expired_condition(now)
+        vector_db = rag_pipeline.vector_db
+        if vector_db is not None and vector_db.read_only:
+            # Deleting rows here would orphan their vectors in the writer's index
+            logger.warning("Retention skipped: the vector index is read-only in this process")
+            return {}
+        with self._run_lock:
+            before = self.footprint()
+            chunk_ids = self.expired_chunk_ids(condition) if condition is not None else []
+            removed = self.compact_indexes(chunk_ids, now)
+            after = self.footprint()
+
+            articles = 0
+            while condition is not None and not self._stop.is_set():
+                db = self.session_factory()
+                try:
+                    n_articles = self.delete_batch(db, condition)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+                finally:
+                    db.close()
+                articles += n_articles
+                if n_articles < self.batch_size:
+                    break
+            if articles:
+                category_counts.invalidate()
+                cooccurrence_cache.invalidate()
+                bump_generation()
+
+        report = {
+            "articles": articles,
+            "chunks": len(chunk_ids),
+            **removed,
+            "reclaimed_memory_bytes": max(0, before["memory"] - after["memory"]),
+            "reclaimed_disk_bytes": max(0, before["disk"] - after["disk"]),
+        }
+        for kind in ("articles", "chunks", "vectors"):
+            retention_deleted.inc(kind, amount=report[kind])
+        retention_reclaimed_bytes.inc("memory", amount=report["reclaimed_memory_bytes"])
+        retention_reclaimed_bytes.inc("disk", amount=report["reclaimed_disk_bytes"])
+        logger.info(
+            f"Retention removed {articles} articles, {len(chunk_ids)} chunks, {removed['vectors']} vectors "
+            f"and {removed['dropped_shards']} shards; reclaimed {report['reclaimed_memory_bytes'] / 2**20:.1f} MB "
+            f"memory, {report['reclaimed_disk_bytes'] / 2**20:.1f} MB disk"
+        )
+        return report
+
+    def start(self, interval_seconds: float = settings.RETENTION_INTERVAL_SECONDS) -> None:
+        """Run a pass now and then every interval_seconds on a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval_seconds,), name="retention", daemon=True
+        )
+        self._thread.start()
+
+    def _loop(self, interval_seconds: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+            self._stop.wait(interval_seconds)
+
+    def stop(self) -> None:
+        """Stop the background thread after the current batch"""
+        self._stop.set()
+        self._thread = None
+
+
+# Global instance (started in the app when RETENTION_ENABLED and the index is writable)
+retention_manager: Optional[RetentionManager] = None
+
+
+def init_retention_manager() -> Optional[RetentionManager]:
+    """Start background retention"""
+    global retention_manager
+    if not settings.RETENTION_ENABLED:
+        return None
+    retention_manager = RetentionManager()
+    retention_manager.start()
+    logger.info("Retention manager started")
+    return retention_manager
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Delete news older than its retention window")
+    parser.add_argument("--dry-run", action="store_true", help="only count expired articles")
+    args = parser.parse_args()
+
+    setup_logging()
+    manager = RetentionManager()
+    if args.dry_run:
+        print(f"{manager.count_expired()} articles past retention")
+    else:
+        rag_pipeline.init_rag_components(read_only=False)  # this process compacts and saves the indexes
+        print(manager.run())
@@ -1,43 +1,110 @@
 """Main FastAPI application"""
 
+import gc
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.core.logging import logger, setup_logging
-from app.db.database import init_db
+from app.core import metrics
+from app.core.components import components
+from app.db.database import SessionLocal, engine, init_db
 from app.api.routes import router as api_router
-from app.rag.pipeline import init_rag_components
+from app.rag import llm as rag_llm
 from app.rag.llm import init_rag_engine
-from app.core.middleware import RateLimitMiddleware, RequestLoggingMiddleware
+from app.rag.summaries import init_summary_precomputer
+from app.nlp.trends import init_burst_detector
+from app.ingestion import retention
+from app.ingestion.retention import init_retention_manager
+from app.nlp.stories import init_story_clusterer
+from app.rag import pipeline as rag_pipeline
+from app.core.middleware import (
+    ProfilingMiddleware, RateLimitMiddleware, RequestLoggingMiddleware, ResponseCacheMiddleware
+)
 
 
 # Setup logging
 setup_logging()
 
 
+def load_burst_detector() -> None:
+    with SessionLocal() as db:
+        init_burst_detector(db)
+
+
+def register_components() -> None:
+    """Declare startup components; independent ones load in parallel"""
+    components.register("database", init_db)
+    components.register("burst_detector", load_burst_detector, depends_on=["database"])
+    if settings.RETRIEVAL_BACKEND == "sidecar":
+        # The index and models live in the retrieval sidecar (python -m app.rag.sidecar)
+        components.register("embedding_model", rag_pipeline.connect_sidecar_embedding_model)
+        components.register("retriever", rag_pipeline.connect_sidecar_retriever, depends_on=["embedding_model"])
+    else:
+        components.register("embedding_model", rag_pipeline.load_embedding_model)
+        components.register("vector_db", rag_pipeline.load_vector_db)
+        components.register("lexical_index", rag_pipeline.load_lexical_index)
+        components.register("reranker", rag_pipeline.load_reranker)
+        components.register(
+            "retriever",
+            lambda: rag_pipeline.build_retriever(components.get("reranker")),
+            depends_on=["embedding_model", "vector_db", "lexical_index", "reranker"]
+        )
+        if settings.RETENTION_ENABLED and not settings.VECTOR_DB_READ_ONLY:
+            # Deletes and compacts only where the index is written
+            components.register(
+                "retention",
+                init_retention_manager,
+                depends_on=["database", "vector_db", "lexical_index"]
+            )
+    components.register(
+        "story_clusterer",
+        lambda: init_story_clusterer(rag_pipeline.embedding_model, rag_pipeline.embedding_model.dimension),
+        depends_on=["database", "embedding_model"]
+    )
+    components.register("rag_engine", init_rag_engine)
+    components.register(
+        "summary_precomputer",
+        lambda: init_summary_precomputer(rag_llm.rag_engine),
+        depends_on=["database", "rag_engine"]
+    )
+
+
+register_components()
+
+
+def preload_components() -> None:
+    """
+    Load every component before workers fork (gunicorn preload_app)
+    
+    Workers share the loaded models and memory-mapped index pages
+    copy-on-write. Connections opened while loading are closed so no socket
+    is shared between processes, and gc.freeze() keeps collections in the
+    workers from writing to (and so copying) the preloaded objects' pages.
+    """
+    components.start()
+    components.wait_all()
+    components.shutdown(wait=True)
+    engine.dispose()
+    gc.freeze()
+    logger.info(f"Preloaded components: {components.status()}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown"""
-    # Startup
+    # Startup: serve right away; routes wait for the components they use
     logger.info("Starting AI News Intelligence Application")
-    try:
-        init_db()
-        logger.info("Database initialized")
-        
-        init_rag_components()
-        logger.info("RAG components initialized")
-        
-        init_rag_engine()
-        logger.info("RAG engine initialized")
-    except Exception as e:
-        logger.error(f"Startup failed: {e}")
-        raise
+    components.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    if retention.retention_manager:
+        retention.retention_manager.stop()
+    components.shutdown()
 
 
 # Create FastAPI application
@@ -50,12 +117,15 @@ app = FastAPI(
 
 
 # Add middleware
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS
 )
+if settings.ADMIN_TOKEN or settings.PROFILE_SAMPLE_RATE > 0 or settings.DEBUG:
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(RateLimitMiddleware, redis_url=settings.REDIS_URL)
 
@@ -77,6 +147,12 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,6 +1,7 @@
 """NLP processing utilities"""
 
 from typing import List, Dict, Any, Tuple
+from functools import lru_cache
 import json
 from app.core.logging import logger
 
@@ -13,11 +14,15 @@ class SentimentAnalyzer:
         try:
             from textblob import TextBlob
             import nltk
-            nltk.download('vader_lexicon', quiet=True)
             from nltk.sentiment import SentimentIntensityAnalyzer
             
             self.textblob = TextBlob
-            self.vader = SentimentIntensityAnalyzer()
+            try:
+                self.vader = SentimentIntensityAnalyzer()
+            except LookupError:
+                # Download only when missing; the check alone is a network round trip
+                nltk.download('vader_lexicon', quiet=True)
+                self.vader = SentimentIntensityAnalyzer()
             logger.info("Sentiment analyzer initialized")
         except Exception as e:
             logger.error(f"Failed to initialize sentiment analyzer: {e}")
@@ -104,6 +109,18 @@ class NamedEntityRecognizer:
             return {}
 
 
+@lru_cache(maxsize=None)
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    """Process-wide sentiment analyzer, loaded on first use"""
+    return SentimentAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def get_entity_recognizer(model: str = "en_core_web_sm") -> NamedEntityRecognizer:
+    """Process-wide spaCy NER, loaded on first use"""
+    return NamedEntityRecognizer(model)
+
+
 class TopicExtractor:
     """Topic extraction"""
     
@@ -0,0 +1,326 @@
+"""Online story clustering of articles into events"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import registry
+from app.db.database import SessionLocal
+from app.db.models import Article, StoryArticle, StoryCluster
+from app.db.pagination import decode_token, encode_token
+
+
+@dataclass
+class ActiveStory:
+    """In-memory state of a story that can still accept articles"""
+    vector_sum: np.ndarray  # sum of member unit vectors; centroid is its direction
+    article_count: int
+    last_seen_at: datetime
+
+    @property
+    def centroid(self) -> np.ndarray:
+        return self.vector_sum / max(float(np.linalg.norm(self.vector_sum)), 1e-12)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class StoryClusterer:
+    """
+    Single-pass clustering of incoming articles into stories
+
+    Centroids of stories seen within STORY_WINDOW_HOURS live in a FAISS
+    inner-product index keyed by story ID, so each article costs one
+    nearest-centroid query. Similarity is decayed by the gap between the
+    article and the story's latest article; below the threshold the article
+    founds a new story. Stories idle past the window are evicted from the
+    index but stay in the database.
+    """
+
+    def __init__(
+        self,
+        embedding_model,
+        session_factory=SessionLocal,
+        embedding_dim: int = 384,
+        threshold: float = settings.STORY_SIMILARITY_THRESHOLD,
+        window_hours: int = settings.STORY_WINDOW_HOURS,
+        half_life_hours: float = settings.STORY_DECAY_HALF_LIFE_HOURS,
+        candidates: int = settings.STORY_CANDIDATES
+    ):
+        """Initialize clusterer with an empty centroid index"""
+        import faiss
+        self.faiss = faiss
+        self.embedding_model = embedding_model
+        self.session_factory = session_factory
+        self.embedding_dim = embedding_dim
+        self.threshold = threshold
+        self.window = timedelta(hours=window_hours)
+        self.half_life_hours = half_life_hours
+        self.candidates = candidates
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.index = self.faiss.IndexIDMap2(self.faiss.IndexFlatIP(self.embedding_dim))
+        self.stories: Dict[int, ActiveStory] = {}
+
+    def _put(self, story_id: int, story: ActiveStory) -> None:
+        """Insert or replace a story centroid in the index"""
+        ids = np.array([story_id], dtype=np.int64)
+        if story_id in self.stories:
+            self.index.remove_ids(ids)
+        self.stories[story_id] = story
+        self.index.add_with_ids(story.centroid.reshape(1, -1).astype(np.float32), ids)
+
+    def load(self) -> int:
+        """
+        Load stories active within the window from the database
+
+        Returns:
+            Number of active stories
+        """
+        cutoff = datetime.utcnow() - self.window
+        with self._lock, self.session_factory() as db:
+            self._reset()
+            rows = db.query(StoryCluster).filter(StoryCluster.last_seen_at >= cutoff).all()
+            for row in rows:
+                centroid = np.frombuffer(row.centroid, dtype=np.float32)
+                self._put(row.id, ActiveStory(centroid * row.article_count, row.article_count, row.last_seen_at))
+        return len(self.stories)
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Evict stories idle past the window from the index"""
+        cutoff = (now or datetime.utcnow()) - self.window
+        expired = [story_id for story_id, story in self.stories.items() if story.last_seen_at < cutoff]
+        if expired:
+            self.index.remove_ids(np.array(expired, dtype=np.int64))
+            for story_id in expired:
+                del self.stories[story_id]
+        return len(expired)
+
+    def _best_match(self, embedding: np.ndarray, published_at: datetime) -> Tuple[Optional[int], float]:
+        """Nearest active story by time-decayed cosine similarity"""
+        k = min(self.candidates, self.index.ntotal)
+        if not k:
+            return None, 0.0
+
+        similarities, story_ids = self.index.search(embedding.reshape(1, -1), k)
+        best_id, best_score = None, 0.0
+        for story_id, similarity in zip(story_ids[0], similarities[0]):
+            story = self.stories.get(int(story_id))
+            if story is None:
+                continue
+            gap_hours = abs((published_at - story.last_seen_at).total_seconds()) / 3600
+            score = float(similarity) * 0.5 ** (gap_hours / self.half_life_hours)
+            if score > best_score:
+                best_id, best_score = int(story_id), score
+        return best_id, best_score
+
+    def assign_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Assign saved articles to stories
+
+        Articles already in a story are skipped, so re-ingesting is a no-op.
+
+        Returns:
+            Dict of article_id -> story_id for newly assigned articles
+        """
+        articles = [a for a in articles if a.get("id") and a.get("title")]
+        if not articles:
+            return {}
+
+        with self._lock:
+            db = self.session_factory()
+            try:
+                ids = [a["id"] for a in articles]
+                assigned = {
+                    article_id for (article_id,) in
+                    db.query(StoryArticle.article_id).filter(StoryArticle.article_id.in_(ids))
+                }
+                published = dict(db.query(Article.id, Article.published_at).filter(Article.id.in_(ids)))
+                now = datetime.utcnow()
+                articles = [a for a in articles if a["id"] not in assigned and a["id"] in published]
+                if not articles:
+                    return {}
+
+                # Oldest first so decay compares each article with what preceded it
+                articles.sort(key=lambda a: published[a["id"]] or now)
+                embeddings = normalize_rows(self.embedding_model.encode([
+                    f"{a['title']}. {(a.get('content') or '')[:300]}" for a in articles
+                ]))
+
+                self.expire(now)
+                memberships: Dict[str, int] = {}
+                touched = set()
+
+                for article, embedding in zip(articles, embeddings):
+                    published_at = published[article["id"]] or now
+                    story_id, score = self._best_match(embedding, published_at)
+
+                    if story_id is not None and score >= self.threshold:
+                        story = self.stories[story_id]
+                        self._put(story_id, ActiveStory(
+                            story.vector_sum + embedding,
+                            story.article_count + 1,
+                            max(story.last_seen_at, published_at)
+                        ))
+                        touched.add(story_id)
+                        similarity = score
+                    else:
+                        row = StoryCluster(
+                            title=article["title"][:1024],
+                            centroid=embedding.astype(np.float32).tobytes(),
+                            article_count=1,
+                            first_seen_at=published_at,
+                            last_seen_at=published_at
+                        )
+                        db.add(row)
+                        db.flush()
+                        story_id = row.id
+                        self._put(story_id, ActiveStory(embedding.copy(), 1, published_at))
+                        similarity = None
+
+                    memberships[article["id"]] = story_id
+                    db.add(StoryArticle(
+                        article_id=article["id"],
+                        story_id=story_id,
+                        published_at=published_at,
+                        similarity=similarity
+                    ))
+
+                for story_id in touched:
+                    story = self.stories[story_id]
+                    db.query(StoryCluster).filter(StoryCluster.id == story_id).update({
+                        StoryCluster.centroid: story.centroid.astype(np.float32).tobytes(),
+                        StoryCluster.article_count: story.article_count,
+                        StoryCluster.last_seen_at: story.last_seen_at,
+                    }, synchronize_session=False)
+
+                db.commit()
+                logger.info(
+                    f"Clustered {len(memberships)} articles into {len(set(memberships.values()))} stories "
+                    f"({len(self.stories)} active)"
+                )
+                return memberships
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+
+async def recent_stories(
+    db: AsyncSession,
+    hours: int = 24,
+    min_articles: int = 1,
+    limit: int = 20,
+    articles_per_story: int = 5,
+    cursor: Optional[str] = None,
+    columns: Optional[Sequence[Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Stories active in the last `hours`, most recently updated first
+
+    Each story carries its newest articles (Article objects, or tuples of
+    columns if given) and the distinct sources covering it. Pages are keyed
+    on (last_seen_at, id).
+
+    Raises:
+        ValueError: If the cursor is malformed
+
+    Returns:
+        Tuple of (stories, next_cursor)
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    stmt = select(StoryCluster).where(
+        StoryCluster.last_seen_at >= cutoff,
+        StoryCluster.article_count >= min_articles
+    ).order_by(desc(StoryCluster.last_seen_at), desc(StoryCluster.id))
+
+    if cursor:
+        try:
+            last_seen_at, story_id = decode_token(cursor)
+            last_seen_at, story_id = datetime.fromisoformat(last_seen_at), int(story_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        stmt = stmt.where(
+            tuple_(StoryCluster.last_seen_at, StoryCluster.id) < tuple_(last_seen_at, story_id)
+        )
+
+    clusters = list((await db.execute(stmt.limit(limit + 1))).scalars())
+    has_more = len(clusters) > limit
+    clusters = clusters[:limit]
+    if not clusters:
+        return [], None
+
+    story_ids = [c.id for c in clusters]
+    rank = func.row_number().over(
+        partition_by=StoryArticle.story_id,
+        order_by=(desc(StoryArticle.published_at), desc(StoryArticle.article_id))
+    ).label("rank")
+    members = select(StoryArticle.story_id, StoryArticle.article_id, rank).where(
+        StoryArticle.story_id.in_(story_ids)
+    ).subquery()
+
+    articles: Dict[int, List[Any]] = {story_id: [] for story_id in story_ids}
+    for story_id, *article in (await db.execute(
+        select(members.c.story_id, *(columns or [Article]))
+        .join(Article, Article.id == members.c.article_id)
+        .where(members.c.rank <= articles_per_story)
+        .order_by(members.c.story_id, members.c.rank)
+    )).all():
+        articles[story_id].append(tuple(article) if columns else article[0])
+
+    sources: Dict[int, List[str]] = {story_id: [] for story_id in story_ids}
+    for story_id, source in (await db.execute(
+        select(StoryArticle.story_id, Article.source)
+        .join(Article, Article.id == StoryArticle.article_id)
+        .where(StoryArticle.story_id.in_(story_ids))
+        .distinct()
+        .order_by(StoryArticle.story_id, Article.source)
+    )).all():
+        sources[story_id].append(source)
+
+    stories = [
+        {
+            "id": c.id,
+            "title": c.title,
+            "article_count": c.article_count,
+            "first_seen_at": c.first_seen_at,
+            "last_seen_at": c.last_seen_at,
+            "sources": sources[c.id],
+            "articles": articles[c.id],
+        }
+        for c in clusters
+    ]
+    next_cursor = encode_token([clusters[-1].last_seen_at.isoformat(), clusters[-1].id]) if has_more else None
+    return stories, next_cursor
+
+
+# Global instance
+story_clusterer: Optional[StoryClusterer] = None
+
+registry.gauge(
+    "story_index_size",
+    "Active story centroids in the clustering index",
+    lambda: story_clusterer.index.ntotal if story_clusterer else None
+)
+
+
+def init_story_clusterer(embedding_model, embedding_dim: int = 384) -> None:
+    """Initialize story clusterer and load active story centroids"""
+    global story_clusterer
+    if not settings.STORY_CLUSTERING_ENABLED or embedding_model is None:
+        logger.info("Story clustering disabled")
+        return
+    clusterer = StoryClusterer(embedding_model, embedding_dim=embedding_dim)
+    n_active = clusterer.load()
+    story_clusterer = clusterer
+    logger.info(f"Story clusterer initialized with {n_active} active stories")
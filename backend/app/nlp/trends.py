@@ -0,0 +1,384 @@
+"""Trending topics from hourly aggregates"""
+
+import asyncio
+import hashlib
+import json
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.aggregates import DEFAULT_TOPIC, hour_bucket
+from app.db.models import ArticleEntity, Entity, TopicHourlyStat
+
+# Re-read rows updated this long before the last watermark to absorb clock
+# skew between ingestion hosts; re-reading a row is idempotent.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class TrendRollup:
+    """
+    In-memory copy of the last `max_hours` hourly topic buckets
+    
+    Refreshes incrementally: only aggregate rows updated since the last
+    refresh are read, and buckets that fall out of the window are evicted.
+    A trending request then sums at most `max_hours` small dicts instead of
+    scanning articles.
+    """
+    
+    def __init__(
+        self,
+        max_hours: int = settings.TREND_MAX_WINDOW_HOURS,
+        refresh_seconds: float = settings.TREND_REFRESH_SECONDS
+    ):
+        """Initialize empty rollup"""
+        self.max_hours = max_hours
+        self.refresh_seconds = refresh_seconds
+        self.buckets: Dict[datetime, Dict[str, Tuple[int, float]]] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+    
+    def _is_fresh(self) -> bool:
+        return (
+            self._refreshed_at is not None
+            and time.monotonic() - self._refreshed_at < self.refresh_seconds
+        )
+    
+    def window_start(self, hours: int, now: Optional[datetime] = None) -> datetime:
+        """Start of the oldest bucket in a window of `hours` buckets ending now"""
+        return hour_bucket(now or datetime.utcnow()) - timedelta(hours=hours - 1)
+    
+    async def refresh(self, db: AsyncSession, force: bool = False) -> None:
+        """Pull aggregate rows changed since the last refresh"""
+        if not force and self._is_fresh():
+            return
+        
+        async with self._lock:
+            if not force and self._is_fresh():
+                return
+            
+            oldest = self.window_start(self.max_hours)
+            stmt = select(
+                TopicHourlyStat.bucket_start,
+                TopicHourlyStat.topic,
+                TopicHourlyStat.article_count,
+                TopicHourlyStat.sentiment_sum,
+                TopicHourlyStat.updated_at
+            ).where(TopicHourlyStat.bucket_start >= oldest)
+            if self._watermark is not None:
+                stmt = stmt.where(TopicHourlyStat.updated_at >= self._watermark - WATERMARK_OVERLAP)
+            
+            for bucket_start, topic, count, sentiment_sum, updated_at in (await db.execute(stmt)).all():
+                bucket = self.buckets.setdefault(bucket_start, {})
+                if count > 0:
+                    bucket[topic] = (count, sentiment_sum)
+                else:
+                    bucket.pop(topic, None)
+                if updated_at and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+            
+            for bucket_start in [b for b in self.buckets if b < oldest]:
+                del self.buckets[bucket_start]
+            self._refreshed_at = time.monotonic()
+    
+    def top_topics(self, hours: int = 24, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Rank topics over the last `hours` hourly buckets (current hour included)
+        
+        Returns:
+            List of trending topics with frequency and sentiment
+        """
+        start = self.window_start(min(hours, self.max_hours))
+        totals: Dict[str, List[float]] = {}
+        for bucket_start, topics in self.buckets.items():
+            if bucket_start < start:
+                continue
+            for topic, (count, sentiment_sum) in topics.items():
+                total = totals.setdefault(topic, [0, 0.0])
+                total[0] += count
+                total[1] += sentiment_sum
+        
+        ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [
+            {
+                "topic": topic,
+                "frequency": count,
+                "sentiment_avg": sentiment_sum / count if count > 0 else 0,
+                "articles_count": count,
+                "period": f"{hours}h"
+            }
+            for topic, (count, sentiment_sum) in ranked
+        ]
+
+
+def to_hours(timestamp: datetime) -> float:
+    """Naive UTC datetime as hours since the epoch"""
+    return (timestamp - datetime(1970, 1, 1)).total_seconds() / 3600.0
+
+
+class DecayedCountMinSketch:
+    """
+    Count-min sketch of exponentially decayed counts
+    
+    Uses forward decay: an event at time t adds exp((t - t0) / tau) to its
+    counters and estimates are scaled by exp(-(now - t0) / tau), so updates
+    stay O(depth) with no per-key timestamps. The landmark t0 is moved
+    forward before the weights overflow.
+    """
+    
+    # Renormalize once weights reach exp(RENORMALIZE_AT)
+    RENORMALIZE_AT = 50.0
+    
+    def __init__(self, width: int, depth: int, half_life_hours: float):
+        """Initialize empty sketch"""
+        self.width = width
+        self.depth = depth
+        self.tau = half_life_hours / math.log(2)
+        self.counters = np.zeros((depth, width), dtype=np.float64)
+        self.rows = np.arange(depth)
+        self.landmark: Optional[float] = None
+    
+    def _renormalize(self, t: float) -> None:
+        if self.landmark is None:
+            self.landmark = t
+        elif (t - self.landmark) / self.tau > self.RENORMALIZE_AT:
+            self.counters *= math.exp(-(t - self.landmark) / self.tau)
+            self.landmark = t
+    
+    def add(self, columns: np.ndarray, t: float, weight: float = 1.0) -> None:
+        """Add a weighted event at time t (hours) for one key's columns"""
+        self._renormalize(t)
+        self.counters[self.rows, columns] += weight * math.exp((t - self.landmark) / self.tau)
+    
+    def estimate(self, columns: np.ndarray, now: float) -> np.ndarray:
+        """
+        Decayed counts at `now` for a (n_keys, depth) column matrix
+        
+        Returns:
+            Array of n_keys upper-bound estimates
+        """
+        if self.landmark is None:
+            return np.zeros(len(columns))
+        raw = self.counters[self.rows, columns].min(axis=1)
+        return raw * math.exp(-(now - self.landmark) / self.tau)
+
+
+class BurstDetector:
+    """
+    Streaming burst detection over topic and entity keys
+    
+    Each key has a short half-life decayed count (its current rate) and a
+    long half-life count (its baseline), both held in count-min sketches so
+    memory is fixed regardless of how many distinct keys are seen. A burst
+    is scored as the Poisson z-score of the current count against what the
+    baseline rate predicts for the short window. A bounded candidate set of
+    heavy hitters is kept so /trending/emerging never enumerates keys.
+    """
+    
+    def __init__(
+        self,
+        short_half_life_hours: float = settings.TREND_SHORT_HALF_LIFE_HOURS,
+        baseline_half_life_hours: float = settings.TREND_BASELINE_HALF_LIFE_HOURS,
+        width: int = settings.TREND_SKETCH_WIDTH,
+        depth: int = settings.TREND_SKETCH_DEPTH,
+        capacity: int = settings.TREND_HEAVY_HITTERS
+    ):
+        """Initialize detector"""
+        self.short = DecayedCountMinSketch(width, depth, short_half_life_hours)
+        self.baseline = DecayedCountMinSketch(width, depth, baseline_half_life_hours)
+        self.capacity = capacity
+        self.candidates: Dict[Tuple[str, str], np.ndarray] = {}
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def columns(self, key: Tuple[str, str]) -> np.ndarray:
+        """Sketch column for each row; stable across processes"""
+        digest = hashlib.blake2b(
+            "\x1f".join(key).encode("utf-8"), digest_size=4 * self.short.depth
+        ).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.short.width
+    
+    def observe(self, key: Tuple[str, str], timestamp: Optional[datetime] = None, weight: float = 1.0) -> None:
+        """Record `weight` occurrences of a (kind, name) key"""
+        now = datetime.utcnow()
+        t = to_hours(min(timestamp or now, now))
+        columns = self.columns(key)
+        with self._lock:
+            self.short.add(columns, t, weight)
+            self.baseline.add(columns, t, weight)
+            if key not in self.candidates:
+                self.candidates[key] = columns
+                if len(self.candidates) > 2 * self.capacity:
+                    self._prune(to_hours(now))
+    
+    def observe_article(self, article: Dict[str, Any]) -> None:
+        """Record an article's topic and named entities"""
+        published_at = article.get("published_at")
+        if not isinstance(published_at, datetime):
+            published_at = None
+        
+        for key in article_keys(article):
+            self.observe(key, published_at)
+    
+    def _scores(self, columns: np.ndarray, now: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (z_scores, current_counts, baseline_counts) for a column matrix"""
+        current = self.short.estimate(columns, now)
+        baseline = self.baseline.estimate(columns, now)
+        # Count the short window would hold if the key kept its baseline rate
+        expected = baseline * (self.short.tau / self.baseline.tau)
+        z_scores = (current - expected) / np.sqrt(expected + 1.0)
+        return z_scores, current, baseline
+    
+    def _prune(self, now: float) -> None:
+        """Keep the `capacity` candidates with the largest current counts"""
+        keys = list(self.candidates)
+        current = self.short.estimate(np.stack([self.candidates[k] for k in keys]), now)
+        keep = np.argpartition(-current, self.capacity - 1)[:self.capacity]
+        self.candidates = {keys[i]: self.candidates[keys[i]] for i in keep}
+    
+    def emerging(self, limit: int = 20, min_count: float = 3.0) -> List[Dict[str, Any]]:
+        """
+        Rank candidate keys by burst score
+        
+        Args:
+            limit: Maximum results
+            min_count: Minimum decayed current count, filters one-off mentions
+        
+        Returns:
+            List of bursting keys with score and hourly rates
+        """
+        now = to_hours(datetime.utcnow())
+        with self._lock:
+            if not self.candidates:
+                return []
+            keys = list(self.candidates)
+            columns = np.stack([self.candidates[k] for k in keys])
+            z_scores, current, baseline = self._scores(columns, now)
+        
+        eligible = np.flatnonzero((current >= min_count) & (z_scores > 0))
+        ranked = eligible[np.argsort(-z_scores[eligible])][:limit]
+        return [
+            {
+                "kind": keys[i][0],
+                "name": keys[i][1],
+                "score": float(z_scores[i]),
+                "count": float(current[i]),
+                "current_rate": float(current[i] / self.short.tau),
+                "baseline_rate": float(baseline[i] / self.baseline.tau),
+            }
+            for i in ranked
+        ]
+    
+    def replay(self, topic_rows: Iterable[Tuple[datetime, str, int]], entity_rows: Iterable[Tuple[datetime, str, str]]) -> int:
+        """
+        Observe hourly topic buckets and timestamped entity mentions
+        
+        Returns:
+            Number of rows replayed
+        """
+        n_rows = 0
+        for bucket_start, topic, count in topic_rows:
+            self.observe(("topic", topic), bucket_start + timedelta(minutes=30), weight=count)
+            n_rows += 1
+        for published_at, entity_type, name in entity_rows:
+            self.observe((entity_type, name), published_at)
+            n_rows += 1
+        return n_rows
+    
+    def warm_from_aggregates(self, db: Session, hours: int = settings.TREND_MAX_WINDOW_HOURS) -> int:
+        """
+        Seed topic and entity counts from the database after a restart
+        
+        Returns:
+            Number of topic buckets and entity mentions replayed
+        """
+        topic_stmt, entity_stmt = replay_statements(hours)
+        return self.replay(db.execute(topic_stmt).all(), db.execute(entity_stmt).all())
+
+
+def replay_statements(hours: int):
+    """Topic aggregate and entity mention queries covering the last `hours` hours"""
+    cutoff = hour_bucket(datetime.utcnow() - timedelta(hours=hours))
+    topic_stmt = select(
+        TopicHourlyStat.bucket_start, TopicHourlyStat.topic, TopicHourlyStat.article_count
+    ).where(
+        TopicHourlyStat.bucket_start >= cutoff,
+        TopicHourlyStat.article_count > 0
+    ).order_by(TopicHourlyStat.bucket_start)
+    entity_stmt = select(
+        ArticleEntity.published_at, Entity.entity_type, Entity.name
+    ).join(Entity, Entity.id == ArticleEntity.entity_id).where(
+        ArticleEntity.published_at >= cutoff
+    ).order_by(ArticleEntity.published_at)
+    return topic_stmt, entity_stmt
+
+
+def article_keys(article: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    """(kind, name) keys for an article's topic and entities"""
+    yield "topic", article.get("main_topic") or DEFAULT_TOPIC
+    
+    entities = article.get("entities") or {}
+    if isinstance(entities, str):
+        entities = json.loads(entities)
+    for entity_type, names in entities.items():
+        for name in set(names):
+            if name and name.strip():
+                yield entity_type, name.strip()
+
+
+# Global instances
+trend_rollup = TrendRollup()
+burst_detector: Optional[BurstDetector] = None
+_burst_refresh_lock = asyncio.Lock()
+
+
+def init_burst_detector(db: Session) -> None:
+    """Initialize burst detector and warm it from topic and entity aggregates"""
+    global burst_detector
+    detector = BurstDetector()
+    n_rows = detector.warm_from_aggregates(db)
+    burst_detector = detector
+    logger.info(f"Burst detector initialized from {n_rows} topic buckets and entity mentions")
+
+
+async def refresh_burst_detector(
+    db: AsyncSession,
+    max_age_seconds: float = settings.TREND_BURST_REFRESH_SECONDS
+) -> Optional[BurstDetector]:
+    """
+    Rebuild the burst detector from the database once it is max_age_seconds old
+    
+    Only the process saving articles (usually the ingestion script) feeds
+    the detector as it goes. API workers see new articles through the shared
+    topic aggregates and entity links instead, at most max_age_seconds late.
+    Rebuilding from scratch replaces what this process observed itself, so
+    nothing is counted twice.
+    """
+    global burst_detector
+    detector = burst_detector
+    if detector is None or time.monotonic() - detector.built_at < max_age_seconds:
+        return detector
+    
+    async with _burst_refresh_lock:
+        detector = burst_detector
+        if time.monotonic() - detector.built_at < max_age_seconds:
+            return detector
+        
+        rebuilt = BurstDetector(
+            short_half_life_hours=detector.short.tau * math.log(2),
+            baseline_half_life_hours=detector.baseline.tau * math.log(2),
+            width=detector.short.width,
+            depth=detector.short.depth,
+            capacity=detector.capacity
+        )
+        topic_stmt, entity_stmt = replay_statements(settings.TREND_MAX_WINDOW_HOURS)
+        rebuilt.replay((await db.execute(topic_stmt)).all(), (await db.execute(entity_stmt)).all())
+        burst_detector = rebuilt
+        return rebuilt
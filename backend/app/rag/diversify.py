@@ -0,0 +1,69 @@
+"""Maximal marginal relevance re-ranking of retrieved chunks"""
+
+from typing import List, Optional, Sequence
+import numpy as np
+
+
+def mmr_select(
+    vectors: np.ndarray,
+    relevance: Sequence[float],
+    k: int,
+    lambda_: float = 0.7,
+    groups: Optional[Sequence[Optional[str]]] = None,
+    max_per_group: int = 0
+) -> List[int]:
+    """
+    Pick k candidates balancing relevance against redundancy
+
+    Each step takes argmax(lambda * relevance - (1 - lambda) * max cosine
+    similarity to the already selected candidates). Relevance is min-max
+    scaled so fused rank scores and similarities behave alike. The pairwise
+    similarity matrix is computed once and the running maximum is updated
+    with one vector operation per pick, so k=10 of 50 candidates costs well
+    under a millisecond.
+
+    Args:
+        vectors: (n, dim) candidate embeddings
+        relevance: n relevance scores, higher is better
+        k: Number of candidates to select
+        lambda_: 1.0 is pure relevance order, 0.0 pure diversity
+        groups: Optional group label (e.g. source) per candidate
+        max_per_group: Cap per group label, 0 for no cap
+
+    Returns:
+        Indices of selected candidates in selection order
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(n, dtype=np.float32)
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = unit @ unit.T
+
+    max_similarity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    labels = np.array(groups, dtype=object) if groups is not None and max_per_group else None
+    group_counts = {}
+    selected: List[int] = []
+
+    while len(selected) < k and available.any():
+        scores = lambda_ * relevance - (1 - lambda_) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+
+        if labels is not None and labels[best] is not None:
+            group = labels[best]
+            group_counts[group] = group_counts.get(group, 0) + 1
+            if group_counts[group] >= max_per_group:
+                available &= labels != group
+
+    return selected
@@ -0,0 +1,104 @@
+"""Hybrid lexical + vector retrieval with reciprocal rank fusion"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+from app.core.config import settings
+from app.core.exceptions import VectorDBException
+from app.core.logging import logger
+from app.core.metrics import rag_stage_seconds
+from app.rag.lexical import BM25Index
+from app.rag.pipeline import EmbeddingModel, Retriever, VectorDatabase, dedupe_hits
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[List[str]],
+    weights: Sequence[float],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked lists: score(d) = sum(weight / (k + rank(d)))
+
+    Rank-based fusion ignores the raw score scales, so BM25 scores and
+    vector similarities can be combined without calibration.
+
+    Returns:
+        List of (doc_id, fused_score) sorted by descending score
+    """
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever(Retriever):
+    """Retriever fusing BM25 and FAISS results"""
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        vector_db: VectorDatabase,
+        lexical_index: BM25Index,
+        vector_weight: float = settings.HYBRID_VECTOR_WEIGHT,
+        lexical_weight: float = settings.HYBRID_LEXICAL_WEIGHT,
+        rrf_k: int = settings.HYBRID_RRF_K,
+        candidates: int = settings.HYBRID_CANDIDATES,
+        lexical_min_score: float = settings.HYBRID_LEXICAL_MIN_SCORE,
+        **kwargs
+    ):
+        """Initialize hybrid retriever; kwargs are Retriever's MMR options"""
+        super().__init__(embedding_model, vector_db, **kwargs)
+        self.lexical_index = lexical_index
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+        self.lexical_min_score = lexical_min_score
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-retrieval")
+
+    def fetch_candidates(
+        self,
+        query: str,
+        n_candidates: int,
+        similarity_threshold: float
+    ) -> List[Tuple[str, float]]:
+        """
+        Candidates from fusing lexical and vector rankings
+
+        The BM25 lookup and the query embedding + FAISS search run
+        concurrently. The similarity threshold applies to vector hits and
+        lexical_min_score to BM25 hits, so a query whose only matches are very
+        common terms fuses nothing and raises NoRelevantDocumentsFound. Rare
+        exact terms clear the floor, so entity and ticker queries still land.
+
+        Returns:
+            List of (doc_id, fused_score) tuples
+        """
+        try:
+            n_candidates = max(self.candidates, n_candidates)
+            # Copied contexts carry the request's profile into the pool threads
+            vector_future = self._executor.submit(
+                contextvars.copy_context().run, self.vector_search, query, n_candidates, similarity_threshold
+            )
+            lexical_future = self._executor.submit(
+                contextvars.copy_context().run, self.lexical_search, query, n_candidates
+            )
+            vector_results = vector_future.result()
+            lexical_results = lexical_future.result()
+
+            fused = reciprocal_rank_fusion(
+                [[doc_id for doc_id, _ in vector_results], [doc_id for doc_id, _ in lexical_results]],
+                [self.vector_weight, self.lexical_weight],
+                k=self.rrf_k
+            )
+            return fused[:n_candidates]
+        except Exception as e:
+            logger.error(f"Hybrid retrieval failed: {e}")
+            raise VectorDBException(f"Retrieval failed: {e}")
+
+    def lexical_search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """BM25 (doc_id, score) pairs scoring at least lexical_min_score, best first"""
+        with rag_stage_seconds.time("lexical_search"):
+            results = self.lexical_index.search(query, top_k)
+        return dedupe_hits((doc_id, score) for doc_id, score in results if score >= self.lexical_min_score)
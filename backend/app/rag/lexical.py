@@ -0,0 +1,331 @@
+"""In-process BM25 inverted index over article chunks"""
+
+import os
+import pickle
+import re
+import threading
+import time
+import uuid
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.logging import logger
+
+TOKEN_PATTERN = re.compile(r"\w+")
+LOG_SUFFIX = ".log"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps tickers and numbers intact"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunks with compact postings
+
+    Each term maps to two parallel typed arrays: document numbers (uint32,
+    ascending because documents are only appended) and term frequencies
+    (uint16). Adding chunks appends to the arrays, so the index is updated
+    incrementally at ingest without rebuilding.
+
+    On disk an index is a pickled snapshot plus a log of the documents added
+    since (add_and_save), so persisting an ingest batch costs the batch, not
+    the corpus. Log records name the snapshot they extend and are ignored
+    after the next full save. A read-only index (load(read_only=True))
+    follows a writer in another process the same way.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize empty index"""
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths = array("I")
+        self.total_length = 0
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # held by add and remove; searches only take _lock
+        # Last snapshot written or loaded: (path, token, document count)
+        self.snapshot: Optional[Tuple[str, str, int]] = None
+        self.read_only = False
+        self._path: Optional[str] = None  # followed by a read-only index
+        self._file_id: Optional[Tuple[int, int, int]] = None  # of the loaded snapshot file
+        self._log_offset = 0  # log bytes replayed
+        self._refresh_lock = threading.Lock()
+        self._next_refresh = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_ids: Iterable[str], texts: Iterable[str]) -> None:
+        """Append documents to the index"""
+        if self.read_only:
+            raise ValueError("BM25 index is a read-only replica; index from the ingestion process")
+        self._add(doc_ids, texts)
+
+    def _add(self, doc_ids: Iterable[str], texts: Iterable[str]) -> None:
+        with self._write_lock, self._lock:
+            for doc_id, text in zip(doc_ids, texts):
+                doc_number = len(self.doc_ids)
+                tokens = tokenize(text)
+
+                term_counts: Dict[str, int] = {}
+                for token in tokens:
+                    term_counts[token] = term_counts.get(token, 0) + 1
+
+                for term, count in term_counts.items():
+                    postings = self.postings.get(term)
+                    if postings is None:
+                        postings = self.postings[term] = (array("I"), array("H"))
+                    postings[0].append(doc_number)
+                    postings[1].append(min(count, 65535))
+
+                self.doc_ids.append(doc_id)
+                self.doc_lengths.append(len(tokens))
+                self.total_length += len(tokens)
+
+    def remove(self, doc_ids: Iterable[str]) -> int:
+        """
+        Drop documents and renumber the rest
+
+        The compacted postings are built while searches keep reading the
+        current ones (adds wait), then swapped in. An index loaded from disk
+        first catches up with what other processes saved there, so the next
+        save does not drop their documents.
+
+        Returns:
+            Number of documents removed
+        """
+        if self.read_only:
+            raise ValueError("BM25 index is a read-only replica; index from the ingestion process")
+        removed_ids = set(doc_ids)
+        if self._path is not None:
+            self.refresh()
+        with self._write_lock:
+            keep = np.array([doc_id not in removed_ids for doc_id in self.doc_ids], dtype=bool)
+            n_removed = int(len(keep) - keep.sum())
+            if not n_removed:
+                return 0
+
+            # Old document number -> new number; postings stay ascending
+            renumber = (np.cumsum(keep) - 1).astype(np.uint32)
+            postings: Dict[str, Tuple[array, array]] = {}
+            for term, (docs, tfs) in self.postings.items():
+                docs = np.array(docs, dtype=np.uint32)
+                mask = keep[docs]
+                if mask.any():
+                    postings[term] = (
+                        array("I", renumber[docs[mask]].tobytes()),
+                        array("H", np.array(tfs, dtype=np.uint16)[mask].tobytes())
+                    )
+            doc_lengths = array("I", np.array(self.doc_lengths, dtype=np.uint32)[keep].tobytes())
+            doc_ids = [doc_id for doc_id, kept in zip(self.doc_ids, keep) if kept]
+
+            with self._lock:
+                self.doc_ids = doc_ids
+                self.doc_lengths = doc_lengths
+                self.total_length = int(np.array(doc_lengths, dtype=np.uint64).sum())
+                self.postings = postings
+                self.snapshot = None  # renumbered: the next save must be a full one
+        logger.info(f"Removed {n_removed} chunks from BM25 index, {len(doc_ids)} remain")
+        return n_removed
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the postings and document lengths"""
+        return self.doc_lengths.itemsize * len(self.doc_lengths) + sum(
+            docs.itemsize * len(docs) + tfs.itemsize * len(tfs) for docs, tfs in self.postings.values()
+        )
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Score documents containing any query term
+
+        Returns:
+            List of (doc_id, bm25_score) sorted by descending score
+        """
+        terms = set(tokenize(query))
+        self._maybe_refresh()
+
+        with self._lock:
+            n_docs = len(self.doc_ids)
+            if not n_docs or not terms:
+                return []
+
+            avg_length = self.total_length / n_docs
+            doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32)
+
+            matched_docs = []
+            contributions = []
+            for term in terms:
+                postings = self.postings.get(term)
+                if postings is None:
+                    continue
+
+                docs = np.frombuffer(postings[0], dtype=np.uint32)
+                tf = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+                idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * doc_lengths[docs] / avg_length)
+
+                matched_docs.append(docs.copy())
+                contributions.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+            if not matched_docs:
+                return []
+
+            # Sum per-term contributions for each matched document
+            docs, inverse = np.unique(np.concatenate(matched_docs), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(contributions))
+
+            top_k = min(top_k, len(docs))
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.doc_ids[docs[i]], float(scores[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        """Persist a full snapshot to disk (and drop the log it supersedes)"""
+        with self._lock:
+            token = uuid.uuid4().hex
+            state = (self.k1, self.b, self.doc_ids, self.doc_lengths, self.total_length, self.postings, token)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self.snapshot = (path, token, len(self.doc_ids))
+            if path == self._path:
+                self._file_id, self._log_offset = _file_id(os.stat(path)), 0
+        if os.path.exists(path + LOG_SUFFIX):
+            os.remove(path + LOG_SUFFIX)
+
+    def add_and_save(
+        self,
+        path: str,
+        doc_ids: Iterable[str],
+        texts: Iterable[str],
+        compact_ratio: float = settings.LEXICAL_LOG_COMPACT_RATIO
+    ) -> None:
+        """
+        Add documents and persist them by appending them to the log
+
+        Writes a full snapshot instead when path has none from this index yet,
+        or once the log holds more than compact_ratio of the snapshot's
+        documents, which keeps loading fast.
+        """
+        doc_ids, texts = list(doc_ids), list(texts)
+        start = len(self.doc_ids)
+        self.add(doc_ids, texts)
+
+        snapshot = self.snapshot
+        if (
+            snapshot is None
+            or snapshot[0] != path
+            or not os.path.exists(path)
+            or len(self.doc_ids) - snapshot[2] > compact_ratio * max(snapshot[2], 1)
+        ):
+            self.save(path)
+            return
+
+        with open(path + LOG_SUFFIX, "ab") as f:
+            pickle.dump((snapshot[1], start, doc_ids, texts), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _replay_log(self, log_path: str, token: str, offset: int = 0) -> Tuple[int, int]:
+        """
+        Add the logged documents that extend snapshot token, from byte offset
+
+        Returns:
+            (documents replayed, offset after the last complete record)
+        """
+        replayed = 0
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            while True:
+                try:
+                    record_token, start, doc_ids, texts = pickle.load(f)
+                except Exception:
+                    break  # end of the log, or a record being written (or cut short by a crash)
+                if record_token == token and start > len(self.doc_ids):
+                    logger.warning(f"BM25 log {log_path} has a gap at document {len(self.doc_ids)}")
+                    break
+                offset = f.tell()
+                if record_token != token or start < len(self.doc_ids):
+                    continue  # from an older snapshot, or already in this one
+                self._add(doc_ids, texts)
+                replayed += len(doc_ids)
+        return replayed, offset
+
+    @classmethod
+    def load(cls, path: str, read_only: bool = False) -> "BM25Index":
+        """
+        Load index (snapshot and log) from disk, or start empty if none exists
+
+        A read_only index follows the writer: searches replay what was
+        appended to the log, or reload a replaced snapshot, at most every
+        VECTOR_DB_REFRESH_SECONDS.
+        """
+        index = cls()
+        index.read_only = read_only
+        index._path = path
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                index._file_id = _file_id(os.fstat(f.fileno()))
+                state = pickle.load(f)
+            (index.k1, index.b, index.doc_ids, index.doc_lengths,
+             index.total_length, index.postings) = state[:6]
+            token = state[6] if len(state) > 6 else None  # snapshots from before the log had no token
+            replayed = 0
+            log_path = path + LOG_SUFFIX
+            if token is not None:
+                index.snapshot = (path, token, len(index.doc_ids))
+                if os.path.exists(log_path):
+                    replayed, index._log_offset = index._replay_log(log_path, token)
+                    if not read_only and index._log_offset < os.path.getsize(log_path):
+                        logger.warning(f"Ignoring incomplete BM25 log record at the end of {log_path}")
+            logger.info(f"Loaded BM25 index with {len(index)} chunks ({replayed} from its log) from {path}")
+        return index
+
+    def refresh(self) -> bool:
+        """
+        Catch up with what other processes saved to this index's files
+
+        Returns:
+            True if documents were added or a new snapshot was loaded
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False  # another thread is already refreshing
+        try:
+            try:
+                file_id = _file_id(os.stat(self._path))
+            except FileNotFoundError:
+                return False
+            if file_id != self._file_id:
+                loaded = BM25Index.load(self._path)
+                with self._write_lock, self._lock:
+                    self.k1, self.b = loaded.k1, loaded.b
+                    self.doc_ids, self.doc_lengths = loaded.doc_ids, loaded.doc_lengths
+                    self.total_length, self.postings = loaded.total_length, loaded.postings
+                    self.snapshot, self._file_id, self._log_offset = loaded.snapshot, loaded._file_id, loaded._log_offset
+                return True
+
+            log_path = self._path + LOG_SUFFIX
+            if self.snapshot is None or not os.path.exists(log_path) or os.path.getsize(log_path) <= self._log_offset:
+                return False
+            replayed, self._log_offset = self._replay_log(log_path, self.snapshot[1], self._log_offset)
+            return replayed > 0
+        except Exception as e:
+            logger.error(f"BM25 index refresh failed, keeping {len(self.doc_ids)} chunks: {e}")
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def _maybe_refresh(self) -> None:
+        """Read-only replicas poll the files every VECTOR_DB_REFRESH_SECONDS"""
+        if self.read_only and time.monotonic() >= self._next_refresh:
+            self._next_refresh = time.monotonic() + settings.VECTOR_DB_REFRESH_SECONDS
+            self.refresh()
+
+
+def _file_id(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Changes when a snapshot is replaced (os.replace gives a new inode)"""
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
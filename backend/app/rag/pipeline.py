@@ -1,14 +1,19 @@
 """RAG pipeline components"""
 
+import json
 import os
 import pickle
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import numpy as np
 from app.core.config import settings
 from app.core.exceptions import (
     EmbeddingException, VectorDBException, NoRelevantDocumentsFound
 )
 from app.core.logging import logger
+from app.core.metrics import rag_stage_seconds, registry
+from app.rag.diversify import mmr_select
 
 
 class EmbeddingModel:
@@ -20,6 +25,7 @@ class EmbeddingModel:
             from sentence_transformers import SentenceTransformer
             self.model = SentenceTransformer(model_name)
             self.model_name = model_name
+            self.dimension = self.model.get_sentence_embedding_dimension()
             logger.info(f"Loaded embedding model: {model_name}")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
@@ -40,59 +46,272 @@ class EmbeddingModel:
             raise EmbeddingException(f"Embedding failed: {e}")
 
 
+class IndexGeneration:
+    """One immutable-by-readers snapshot of the index and its ID maps"""
+    
+    __slots__ = ("index", "doc_id_map", "doc_sources", "positions", "generation")
+    
+    def __init__(self, index, doc_id_map: Dict[int, str], doc_sources: Dict[str, str], generation: int = 0):
+        self.index = index
+        self.doc_id_map = doc_id_map  # Map from index position to doc ID
+        self.doc_sources = doc_sources  # Map from doc ID to article source, for per-source caps
+        self.positions = {doc_id: idx for idx, doc_id in doc_id_map.items()}
+        self.generation = generation
+
+
+def _generation_property(name: str) -> property:
+    return property(
+        lambda self: getattr(self._state, name),
+        lambda self, value: setattr(self._state, name, value)
+    )
+
+
 class VectorDatabase:
-    """FAISS vector database wrapper"""
+    """
+    FAISS vector database wrapper
+    
+    Every save() writes a new generation (<index_path>.<n> plus its .ids)
+    and then atomically replaces the <index_path>.manifest pointing at it.
+    A read-only instance memory-maps its generation, so forked workers and
+    processes on one node share a single page-cached copy, and refresh()
+    swaps in the newest generation without disturbing in-flight searches.
+    """
+    
+    index = _generation_property("index")
+    doc_id_map = _generation_property("doc_id_map")
+    doc_sources = _generation_property("doc_sources")
+    positions = _generation_property("positions")
     
-    def __init__(self, embedding_dim: int = 384, index_path: str = None):
-        """Initialize vector database"""
+    def __init__(
+        self,
+        embedding_dim: int = 384,
+        index_path: str = None,
+        read_only: bool = False,
+        mmap: bool = settings.VECTOR_DB_MMAP
+    ):
+        """Initialize vector database (mmap applies to read-only instances)"""
         try:
             import faiss
             self.faiss = faiss
             self.index_path = index_path or settings.VECTOR_DB_PATH
+            self.ids_path = f"{self.index_path}.ids"
+            self.manifest_path = f"{self.index_path}.manifest"
             self.embedding_dim = embedding_dim
-            self.doc_id_map = {}  # Map from index position to doc ID
+            self.read_only = read_only
+            self.mmap = mmap and read_only
+            self._refresh_lock = threading.Lock()
+            self._write_lock = threading.RLock()  # add/remove/save; searches never take it
+            self._next_refresh = 0.0
+            self._unsaved = False  # add(save=False) since the last save
             
             os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
             
-            if os.path.exists(self.index_path):
-                self.index = faiss.read_index(self.index_path)
-                logger.info(f"Loaded vector index from {self.index_path}")
-            else:
-                self.index = faiss.IndexFlatL2(embedding_dim)
+            self._state = self._load_generation(self._read_manifest())
+            if self._state is None:
+                self._state = IndexGeneration(faiss.IndexFlatL2(embedding_dim), {}, {})
                 logger.info("Created new FAISS index")
         except Exception as e:
             logger.error(f"Vector DB initialization failed: {e}")
             raise VectorDBException(f"Vector DB initialization failed: {e}")
     
-    def add(self, embeddings: np.ndarray, doc_ids: List[str]) -> List[int]:
-        """Add embeddings to index"""
+    @property
+    def generation(self) -> int:
+        return self._state.generation
+    
+    def __len__(self) -> int:
+        return self._state.index.ntotal
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._state.positions
+    
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
         try:
-            embeddings = np.array(embeddings, dtype=np.float32)
-            start_idx = self.index.ntotal
-            self.index.add(embeddings)
-            
-            for i, doc_id in enumerate(doc_ids):
-                self.doc_id_map[start_idx + i] = doc_id
-            
-            self.save()
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _load_generation(self, manifest: Optional[Dict[str, Any]]) -> Optional[IndexGeneration]:
+        """Read the manifest's generation, or the pre-generation files if there is none"""
+        if manifest is not None:
+            directory = os.path.dirname(self.index_path)
+            index_file = os.path.join(directory, manifest["index"])
+            ids_file = os.path.join(directory, manifest["ids"])
+            generation = manifest["generation"]
+        elif os.path.exists(self.index_path):
+            index_file, ids_file, generation = self.index_path, self.ids_path, 0
+        else:
+            return None
+        
+        mmap_flag = getattr(self.faiss, "IO_FLAG_MMAP_IFC", None)
+        if self.mmap and mmap_flag is not None:
+            index = self.faiss.read_index(index_file, mmap_flag | self.faiss.IO_FLAG_READ_ONLY)
+        else:
+            if self.mmap:
+                logger.warning("This faiss build cannot memory-map flat indexes; reading into memory")
+            index = self.faiss.read_index(index_file)
+        
+        doc_id_map, doc_sources = {}, {}
+        if os.path.exists(ids_file):
+            with open(ids_file, "rb") as f:
+                metadata = pickle.load(f)
+            # Older indexes stored only the position -> doc ID map
+            if isinstance(metadata, tuple):
+                doc_id_map, doc_sources = metadata
+            else:
+                doc_id_map = metadata
+        logger.info(f"Loaded vector index generation {generation} from {index_file}")
+        return IndexGeneration(index, doc_id_map, doc_sources, generation)
+    
+    def refresh(self) -> bool:
+        """
+        Swap in the newest saved generation, if there is a newer one
+        
+        Searches already running keep the generation they started with;
+        its memory map is released when the last of them finishes.
+        
+        Returns:
+            True if a new generation was loaded
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False  # another thread is already loading it
+        try:
+            manifest = self._read_manifest()
+            if manifest is None or manifest["generation"] <= self._state.generation:
+                return False
+            self._state = self._load_generation(manifest)
+            return True
+        except Exception as e:
+            logger.error(f"Vector index refresh failed, keeping generation {self._state.generation}: {e}")
+            return False
+        finally:
+            self._refresh_lock.release()
+    
+    def _maybe_refresh(self) -> None:
+        """Read-only replicas poll the manifest every VECTOR_DB_REFRESH_SECONDS"""
+        if self.read_only and time.monotonic() >= self._next_refresh:
+            self._next_refresh = time.monotonic() + settings.VECTOR_DB_REFRESH_SECONDS
+            self.refresh()
+    
+    def add(
+        self,
+        embeddings: np.ndarray,
+        doc_ids: List[str],
+        sources: Optional[List[str]] = None,
+        save: bool = True
+    ) -> List[int]:
+        """Add embeddings to index, optionally with each doc's source (save=False defers the save)"""
+        if self.read_only:
+            raise VectorDBException("Vector DB is a read-only replica; index from the ingestion process")
+        try:
+            with self._write_lock:
+                # No copy for float32 C-contiguous input (e.g. Arrow columns)
+                embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+                start_idx = self.index.ntotal
+                self.index.add(embeddings)
+                
+                for i, doc_id in enumerate(doc_ids):
+                    self.doc_id_map[start_idx + i] = doc_id
+                    self.positions[doc_id] = start_idx + i
+                if sources is not None:
+                    self.doc_sources.update(zip(doc_ids, sources))
+                
+                if save:
+                    self.save()
+                else:
+                    self._unsaved = True
             logger.info(f"Added {len(doc_ids)} embeddings to vector DB")
             return list(range(start_idx, start_idx + len(doc_ids)))
         except Exception as e:
             logger.error(f"Failed to add embeddings: {e}")
             raise VectorDBException(f"Failed to add embeddings: {e}")
     
+    def remove(self, doc_ids: Iterable[str], batch_size: int = 100000) -> int:
+        """
+        Remove documents by rebuilding the index from the surviving vectors
+        
+        The compacted index is built beside the current one and saved as a
+        new generation before it is swapped in, so searches keep running on
+        the old generation meanwhile (only add() waits) and a failed save
+        leaves this instance as it was. A newer generation saved by another
+        process is loaded first, so its documents are kept. Positions of the
+        surviving documents change.
+        
+        Returns:
+            Number of vectors removed
+        """
+        if self.read_only:
+            raise VectorDBException("Vector DB is a read-only replica; index from the ingestion process")
+        removed_ids = set(doc_ids)
+        try:
+            with self._write_lock:
+                state = self._state
+                manifest = self._read_manifest()
+                if manifest is not None and manifest["generation"] > state.generation:
+                    if self._unsaved:
+                        raise VectorDBException(
+                            f"Index at {self.index_path} is at generation {manifest['generation']}, ahead of "
+                            f"this process ({state.generation}), which has unsaved additions"
+                        )
+                    state = self._state = self._load_generation(manifest)
+                # Re-indexed documents can own several positions; drop them all
+                keep = np.array(
+                    [pos for pos in range(state.index.ntotal) if state.doc_id_map.get(pos) not in removed_ids],
+                    dtype=np.int64
+                )
+                n_removed = state.index.ntotal - len(keep)
+                if not n_removed:
+                    return 0
+                
+                index = self.faiss.IndexFlatL2(self.embedding_dim)
+                for start in range(0, len(keep), batch_size):
+                    index.add(state.index.reconstruct_batch(keep[start:start + batch_size]))
+                doc_id_map = {
+                    new_pos: state.doc_id_map[old_pos]
+                    for new_pos, old_pos in enumerate(keep.tolist())
+                    if old_pos in state.doc_id_map
+                }
+                doc_sources = {
+                    doc_id: source for doc_id, source in state.doc_sources.items() if doc_id not in removed_ids
+                }
+                compacted = IndexGeneration(index, doc_id_map, doc_sources, state.generation)
+                self._write_generation(compacted)
+                self._state = compacted
+            logger.info(f"Removed {n_removed} vectors from vector DB, {len(keep)} remain")
+            return n_removed
+        except Exception as e:
+            logger.error(f"Failed to remove embeddings: {e}")
+            raise VectorDBException(f"Failed to remove embeddings: {e}")
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored vectors (flat index)"""
+        return len(self) * self.embedding_dim * 4
+    
+    def disk_bytes(self) -> int:
+        """Size of the current generation's files"""
+        manifest = self._read_manifest()
+        if manifest is not None:
+            directory = os.path.dirname(self.index_path)
+            paths = [os.path.join(directory, manifest["index"]), os.path.join(directory, manifest["ids"])]
+        else:
+            paths = [self.index_path, self.ids_path]
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+    
     def search(self, query_embedding: np.ndarray, top_k: int = 5) -> Tuple[List[str], List[float]]:
         """Search for similar embeddings"""
+        self._maybe_refresh()
+        state = self._state  # one generation for the whole lookup
         try:
             query_embedding = np.array([query_embedding], dtype=np.float32)
-            distances, indices = self.index.search(query_embedding, top_k)
+            distances, indices = state.index.search(query_embedding, top_k)
             
             doc_ids = []
             scores = []
             
             for idx, distance in zip(indices[0], distances[0]):
-                if idx in self.doc_id_map:
-                    doc_ids.append(self.doc_id_map[idx])
+                if idx in state.doc_id_map:
+                    doc_ids.append(state.doc_id_map[idx])
                     # Convert L2 distance to similarity score (0-1)
                     similarity = 1 / (1 + distance)
                     scores.append(float(similarity))
@@ -102,14 +321,154 @@ class VectorDatabase:
             logger.error(f"Search failed: {e}")
             raise VectorDBException(f"Search failed: {e}")
     
+    def get_vectors(self, doc_ids: List[str]) -> np.ndarray:
+        """
+        Stored embeddings for doc IDs
+        
+        Returns:
+            (len(doc_ids), dim) float32 array; unknown IDs get zero rows
+        """
+        state = self._state
+        vectors = np.zeros((len(doc_ids), self.embedding_dim), dtype=np.float32)
+        rows = [i for i, doc_id in enumerate(doc_ids) if doc_id in state.positions]
+        if rows:
+            keys = np.array([state.positions[doc_ids[i]] for i in rows], dtype=np.int64)
+            vectors[rows] = state.index.reconstruct_batch(keys)
+        return vectors
+    
+    def get_sources(self, doc_ids: List[str]) -> List[Optional[str]]:
+        """Stored source of each doc ID (None if unknown)"""
+        doc_sources = self._state.doc_sources
+        return [doc_sources.get(doc_id) for doc_id in doc_ids]
+    
+    def iter_vectors(self, batch_size: int = 10000) -> Iterator[Tuple[List[Optional[str]], List[Optional[str]], np.ndarray]]:
+        """
+        Stored vectors in position order, with their doc IDs and sources
+        
+        Batches are views of the flat index's storage (no copy) when the
+        index exposes it; they are only valid while this generation is live.
+        
+        Yields:
+            (doc_ids, sources, (n, dim) float32 array) per batch
+        """
+        state = self._state
+        n = state.index.ntotal
+        if not n:
+            return
+        try:
+            storage = self.faiss.rev_swig_ptr(state.index.get_xb(), n * self.embedding_dim).reshape(n, self.embedding_dim)
+        except (AttributeError, RuntimeError, TypeError):
+            storage = None
+        for start in range(0, n, batch_size):
+            stop = min(start + batch_size, n)
+            vectors = storage[start:stop] if storage is not None else state.index.reconstruct_n(start, stop - start)
+            doc_ids = [state.doc_id_map.get(pos) for pos in range(start, stop)]
+            yield doc_ids, [state.doc_sources.get(doc_id) for doc_id in doc_ids], vectors
+    
     def save(self):
-        """Save index to disk"""
+        """Write the index as a new generation and point the manifest at it"""
+        with self._write_lock:
+            self._write_generation(self._state)
+            self._unsaved = False
+    
+    def _write_generation(self, state: IndexGeneration) -> None:
+        """Save state as the next generation (state.generation is only advanced on success)"""
         try:
-            self.faiss.write_index(self.index, self.index_path)
-            logger.info(f"Saved vector index to {self.index_path}")
+            with self._write_lock:
+                manifest = self._read_manifest()
+                if manifest is not None and manifest["generation"] > state.generation:
+                    # Another process (e.g. a reindex swap) replaced the index; do not overwrite it
+                    raise VectorDBException(
+                        f"Index at {self.index_path} is at generation {manifest['generation']}, "
+                        f"ahead of this process ({state.generation}); restart to load it"
+                    )
+                generation = state.generation + 1
+                index_file = f"{self.index_path}.{generation}"
+                self.faiss.write_index(state.index, index_file)
+                with open(f"{index_file}.ids", "wb") as f:
+                    pickle.dump((state.doc_id_map, state.doc_sources), f, protocol=pickle.HIGHEST_PROTOCOL)
+                
+                self._write_manifest(self.manifest_path, generation, os.path.basename(index_file))
+                state.generation = generation
+                self._prune_generations(self.index_path, generation)
+            logger.info(f"Saved vector index generation {generation} to {index_file}")
+        except VectorDBException:
+            raise
         except Exception as e:
             logger.error(f"Failed to save index: {e}")
             raise VectorDBException(f"Failed to save index: {e}")
+    
+    @staticmethod
+    def _write_manifest(manifest_path: str, generation: int, index_name: str) -> None:
+        # Readers switch over only once both files are complete
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"generation": generation, "index": index_name, "ids": f"{index_name}.ids"}, f)
+        os.replace(tmp_path, manifest_path)
+    
+    def publish(self, index_path: str) -> int:
+        """
+        Install this index's saved generation as the next generation of the
+        index at index_path (on the same filesystem)
+        
+        The files are moved, not copied, and the target manifest is replaced
+        atomically, so read-only replicas of index_path switch over at their
+        next refresh. This instance is unusable afterwards.
+        
+        Returns:
+            Generation number at index_path
+        """
+        with self._write_lock:
+            manifest = self._read_manifest()
+            if manifest is None:
+                raise VectorDBException(f"Nothing saved at {self.index_path} to publish")
+            source_dir = os.path.dirname(self.index_path)
+            target_manifest_path = f"{index_path}.manifest"
+            try:
+                with open(target_manifest_path) as f:
+                    current = json.load(f)["generation"]
+            except FileNotFoundError:
+                current = 0
+            generation = current + 1
+            index_file = f"{index_path}.{generation}"
+            os.replace(os.path.join(source_dir, manifest["ids"]), f"{index_file}.ids")
+            os.replace(os.path.join(source_dir, manifest["index"]), index_file)
+            self._write_manifest(target_manifest_path, generation, os.path.basename(index_file))
+            self._prune_generations(index_path, generation)
+        logger.info(f"Published vector index as generation {generation} of {index_path}")
+        return generation
+    
+    @staticmethod
+    def _prune_generations(index_path: str, current: int) -> None:
+        """Delete old generations; open memory maps keep their pages until unmapped"""
+        keep_from = current - settings.VECTOR_DB_KEEP_GENERATIONS + 1
+        directory = os.path.dirname(index_path) or "."
+        prefix = os.path.basename(index_path) + "."
+        for name in os.listdir(directory):
+            if not name.startswith(prefix):
+                continue
+            suffix = name[len(prefix):].split(".", 1)[0]
+            if suffix.isdigit() and int(suffix) < keep_from:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+def dedupe_hits(hits: Iterable[Tuple[str, float]]) -> List[Tuple[str, float]]:
+    """Keep the best-ranked hit of each doc ID (an index can hold stale copies)"""
+    seen = set()
+    unique = []
+    for doc_id, score in hits:
+        if doc_id not in seen:
+            seen.add(doc_id)
+            unique.append((doc_id, score))
+    return unique
+
+
+def article_id_from_chunk_id(chunk_id: str) -> str:
+    """Recover the article ID from a chunk ID produced by TextChunker"""
+    return chunk_id.rsplit("_chunk_", 1)[0]
 
 
 class TextChunker:
@@ -149,47 +508,119 @@ class TextChunker:
 class Retriever:
     """RAG retriever component"""
     
-    def __init__(self, embedding_model: EmbeddingModel, vector_db: VectorDatabase):
-        """Initialize retriever"""
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        vector_db: VectorDatabase,
+        mmr_lambda: Optional[float] = settings.MMR_LAMBDA if settings.MMR_ENABLED else None,
+        mmr_candidates: int = settings.MMR_CANDIDATES,
+        max_per_source: int = settings.MMR_MAX_PER_SOURCE,
+        reranker=None
+    ):
+        """Initialize retriever (mmr_lambda=None disables diversification)"""
         self.embedding_model = embedding_model
         self.vector_db = vector_db
+        self.reranker = reranker  # optional CrossEncoderReranker
+        self.mmr_lambda = mmr_lambda
+        self.mmr_candidates = mmr_candidates
+        self.max_per_source = max_per_source
+    
+    @property
+    def reranks(self) -> bool:
+        """Whether results are cross-encoder ranked (precise enough for fewer LLM chunks)"""
+        return self.reranker is not None
     
     def retrieve(
         self,
         query: str,
         top_k: int = 5,
-        similarity_threshold: float = settings.VECTOR_SIMILARITY_THRESHOLD
-    ) -> Tuple[List[str], List[float]]:
+        similarity_threshold: float = settings.VECTOR_SIMILARITY_THRESHOLD,
+        rerank_budget_ms: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
         """
         Retrieve relevant documents for query
         
+        Over-fetches candidates, optionally re-scores the top ones with the
+        cross-encoder within rerank_budget_ms, then re-ranks with MMR so
+        near-duplicate rewrites of one story do not fill every slot.
+        
         Returns:
-            List of (doc_id, similarity_score) tuples
+            List of (doc_id, score) tuples
         """
         try:
-            # Encode query
-            query_embedding = self.embedding_model.encode([query])[0]
-            
-            # Search vector DB
-            doc_ids, scores = self.vector_db.search(query_embedding, top_k=top_k * 2)
-            
-            # Filter by threshold
-            results = [
-                (doc_id, score)
-                for doc_id, score in zip(doc_ids, scores)
-                if score >= similarity_threshold
-            ]
+            n_candidates = top_k * 2
+            if self.mmr_lambda is not None or self.reranker is not None:
+                n_candidates = max(self.mmr_candidates, top_k)
+            results = self.fetch_candidates(query, n_candidates, similarity_threshold)
             
             if not results:
                 raise NoRelevantDocumentsFound()
             
-            # Return top-k
-            return results[:top_k]
-        except NoRelevantDocumentsFound:
+            with rag_stage_seconds.time("rerank"):
+                return self.rerank(query, results, top_k, rerank_budget_ms)
+        except (NoRelevantDocumentsFound, VectorDBException):
             raise
         except Exception as e:
             logger.error(f"Retrieval failed: {e}")
             raise VectorDBException(f"Retrieval failed: {e}")
+    
+    def fetch_candidates(
+        self,
+        query: str,
+        n_candidates: int,
+        similarity_threshold: float
+    ) -> List[Tuple[str, float]]:
+        """Candidate (doc_id, score) pairs, best first"""
+        return self.vector_search(query, n_candidates, similarity_threshold)
+    
+    def rerank(
+        self,
+        query: str,
+        results: List[Tuple[str, float]],
+        top_k: int,
+        rerank_budget_ms: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """Cross-encode (when enabled and affordable), then diversify with MMR"""
+        if self.reranker is not None:
+            reranked = self.reranker.rerank(query, results, rerank_budget_ms)
+            if reranked:
+                results = reranked
+        
+        if self.mmr_lambda is None or len(results) <= 1:
+            return results[:top_k]
+        
+        doc_ids = [doc_id for doc_id, _ in results]
+        selected = mmr_select(
+            self.vector_db.get_vectors(doc_ids),
+            [score for _, score in results],
+            top_k,
+            lambda_=self.mmr_lambda,
+            groups=self.vector_db.get_sources(doc_ids),
+            max_per_group=self.max_per_source
+        )
+        return [results[i] for i in selected]
+
+    def vector_search(
+        self,
+        query: str,
+        top_k: int,
+        similarity_threshold: float = settings.VECTOR_SIMILARITY_THRESHOLD
+    ) -> List[Tuple[str, float]]:
+        """Embed the query and return (doc_id, similarity) pairs above threshold"""
+        # Encode query
+        with rag_stage_seconds.time("embed"):
+            query_embedding = self.embedding_model.encode([query])[0]
+        
+        # Search vector DB
+        with rag_stage_seconds.time("vector_search"):
+            doc_ids, scores = self.vector_db.search(query_embedding, top_k=top_k)
+        
+        # Filter by threshold
+        return dedupe_hits(
+            (doc_id, score)
+            for doc_id, score in zip(doc_ids, scores)
+            if score >= similarity_threshold
+        )
 
 
 class PromptTemplate:
@@ -248,17 +679,105 @@ ANALYSIS:"""
 # Global instances (will be initialized on startup)
 embedding_model: Optional[EmbeddingModel] = None
 vector_db: Optional[VectorDatabase] = None
+lexical_index = None  # BM25Index when RETRIEVAL_MODE is "hybrid"
 retriever: Optional[Retriever] = None
 
+registry.gauge(
+    "vector_index_size",
+    "Vectors in the FAISS index",
+    lambda: len(vector_db) if vector_db is not None else None
+)
+registry.gauge(
+    "lexical_index_size",
+    "Chunks in the BM25 index",
+    lambda: len(lexical_index) if lexical_index is not None else None
+)
+registry.gauge(
+    "rerank_queue_pairs",
+    "Query-chunk pairs queued for or being scored by the cross-encoder",
+    lambda: retriever.reranker.pending_pairs if retriever and retriever.reranker else None
+)
 
-def init_rag_components():
-    """Initialize RAG components"""
-    global embedding_model, vector_db, retriever
+
+def load_embedding_model() -> EmbeddingModel:
+    """Load the sentence embedding model"""
+    global embedding_model
+    embedding_model = EmbeddingModel(settings.EMBEDDING_MODEL)
+    return embedding_model
+
+
+def load_vector_db(read_only: bool = settings.VECTOR_DB_READ_ONLY) -> VectorDatabase:
+    """Open (or create) the FAISS index"""
+    global vector_db
+    if settings.VECTOR_DB_SHARDING != "none":
+        from app.rag.shards import ShardedVectorDatabase
+        
+        vector_db = ShardedVectorDatabase(embedding_dim=384, read_only=read_only)
+    else:
+        vector_db = VectorDatabase(embedding_dim=384, read_only=read_only)
+    return vector_db
+
+
+def load_lexical_index(read_only: bool = settings.VECTOR_DB_READ_ONLY):
+    """Load the BM25 index when retrieval is hybrid (read-only replicas follow the writer's files)"""
+    global lexical_index
+    if settings.RETRIEVAL_MODE == "hybrid":
+        from app.rag.lexical import BM25Index
+        
+        lexical_index = BM25Index.load(settings.LEXICAL_INDEX_PATH, read_only=read_only)
+    return lexical_index
+
+
+def load_reranker():
+    """Load the cross-encoder when re-ranking is enabled; None otherwise"""
+    if not settings.RERANK_ENABLED:
+        return None
+    from app.rag.rerank import CrossEncoderReranker
+    
+    try:
+        return CrossEncoderReranker()
+    except EmbeddingException:
+        logger.warning("Cross-encoder unavailable, using bi-encoder ranking")
+        return None
+
+
+def build_retriever(reranker=None) -> Retriever:
+    """Assemble the retriever from the loaded models and indexes"""
+    global retriever
+    if settings.RETRIEVAL_MODE == "hybrid":
+        from app.rag.hybrid import HybridRetriever
+        
+        retriever = HybridRetriever(embedding_model, vector_db, lexical_index, reranker=reranker)
+    else:
+        retriever = Retriever(embedding_model, vector_db, reranker=reranker)
+    return retriever
+
+
+def connect_sidecar_embedding_model():
+    """Embedding model served by the retrieval sidecar (RETRIEVAL_BACKEND="sidecar")"""
+    global embedding_model
+    from app.rag.sidecar import RemoteEmbeddingModel, get_client
     
+    embedding_model = RemoteEmbeddingModel(get_client())
+    return embedding_model
+
+
+def connect_sidecar_retriever():
+    """Retriever served by the retrieval sidecar; this worker holds no index"""
+    global retriever
+    from app.rag.sidecar import RemoteRetriever, get_client
+    
+    retriever = RemoteRetriever(get_client())
+    return retriever
+
+
+def init_rag_components(read_only: bool = settings.VECTOR_DB_READ_ONLY):
+    """Initialize RAG components one after another (scripts; the app loads them in parallel)"""
     try:
-        embedding_model = EmbeddingModel(settings.EMBEDDING_MODEL)
-        vector_db = VectorDatabase(embedding_dim=384)
-        retriever = Retriever(embedding_model, vector_db)
+        load_embedding_model()
+        load_vector_db(read_only=read_only)
+        load_lexical_index(read_only=read_only)
+        build_retriever(load_reranker())
         logger.info("RAG components initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize RAG components: {e}")
@@ -0,0 +1,163 @@
+"""Cross-encoder re-ranking of retrieved chunks under a latency budget"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.core.exceptions import EmbeddingException
+from app.core.logging import logger
+from app.core.metrics import record_cache_lookup
+from app.db.database import SessionLocal
+from app.db.models import Chunk
+
+
+def load_chunk_texts(doc_ids: Sequence[str]) -> Dict[str, str]:
+    """Chunk texts by ID from the chunks table"""
+    with SessionLocal() as db:
+        return dict(db.query(Chunk.id, Chunk.text).filter(Chunk.id.in_(list(doc_ids))).all())
+
+
+class CrossEncoderReranker:
+    """
+    Re-score (query, chunk) pairs with a small CPU cross-encoder
+
+    Uncached pairs of the top-N candidates are scored in one batch. The cost
+    per pair is tracked as a moving average, so a request only scores as
+    many pairs as fit its budget and keeps bi-encoder order when too few
+    fit. Scoring runs on a dedicated thread: if it still overruns, the
+    request falls back and the finished scores land in the cache for the
+    next identical query.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        model_name: str = settings.RERANK_MODEL,
+        text_lookup: Callable[[Sequence[str]], Dict[str, str]] = load_chunk_texts,
+        top_n: int = settings.RERANK_TOP_N,
+        budget_ms: float = settings.RERANK_BUDGET_MS,
+        cache_size: int = settings.RERANK_CACHE_SIZE,
+        min_pairs: int = 2
+    ):
+        """Initialize reranker, loading the cross-encoder unless one is given"""
+        if model is None:
+            try:
+                from sentence_transformers import CrossEncoder
+                model = CrossEncoder(model_name, device="cpu")
+                logger.info(f"Loaded cross-encoder: {model_name}")
+            except Exception as e:
+                logger.error(f"Failed to load cross-encoder: {e}")
+                raise EmbeddingException(f"Failed to load cross-encoder: {e}")
+
+        self.model = model
+        self.text_lookup = text_lookup
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self.min_pairs = min_pairs
+        self.ms_per_pair = 5.0  # refined after the first batch
+        self.pending_pairs = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cross-encoder")
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _score(self, query_key: str, query: str, doc_ids: List[str], texts: List[str]) -> Dict[str, float]:
+        """Score one batch, update the cost estimate and cache the results"""
+        start = time.perf_counter()
+        try:
+            scores = self.model.predict([(query, text) for text in texts])
+        finally:
+            # Released even if the model fails, or the budget shrinks for good
+            with self._lock:
+                self.pending_pairs -= len(texts)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.ms_per_pair = 0.8 * self.ms_per_pair + 0.2 * elapsed_ms / len(texts)
+            for doc_id, score in zip(doc_ids, scores):
+                self._cache[(query_key, doc_id)] = float(score)
+                self._cache.move_to_end((query_key, doc_id))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {doc_id: float(score) for doc_id, score in zip(doc_ids, scores)}
+
+    def rerank(
+        self,
+        query: str,
+        results: List[Tuple[str, float]],
+        budget_ms: Optional[float] = None
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Re-order the top-N candidates by cross-encoder score
+
+        Candidates left unscored (past the affordable pairs, without chunk
+        text, or past top_n) follow the re-scored ones in bi-encoder order,
+        with scores below the lowest cross-encoder score, so a busy reranker
+        never returns fewer candidates than it was given.
+
+        Returns:
+            Re-scored (doc_id, score) list, or None when the budget does not
+            allow re-ranking or the cross-encoder failed
+        """
+        deadline = time.perf_counter() + (budget_ms if budget_ms is not None else self.budget_ms) / 1000
+        query_key = " ".join(query.lower().split())
+        candidates = [doc_id for doc_id, _ in results[:self.top_n]]
+
+        scores = {}
+        missing = []
+        for doc_id in candidates:
+            score = self._cached((query_key, doc_id))
+            record_cache_lookup("rerank", score is not None)
+            if score is None:
+                missing.append(doc_id)
+            else:
+                scores[doc_id] = score
+
+        if missing:
+            texts = self.text_lookup(missing)
+            missing = [doc_id for doc_id in missing if doc_id in texts]
+
+            with self._lock:
+                remaining_ms = (deadline - time.perf_counter()) * 1000
+                queued_ms = self.pending_pairs * self.ms_per_pair
+                affordable = int((remaining_ms - queued_ms) / self.ms_per_pair)
+                if affordable < min(self.min_pairs, len(missing)):
+                    logger.debug("Cross-encoder budget exhausted, keeping bi-encoder order")
+                    return None
+                missing = missing[:affordable]
+                self.pending_pairs += len(missing)
+
+            future = self._executor.submit(
+                self._score, query_key, query, missing, [texts[doc_id] for doc_id in missing]
+            )
+            try:
+                scores.update(future.result(timeout=max(deadline - time.perf_counter(), 0)))
+            except FutureTimeout:
+                logger.debug("Cross-encoder overran its budget, keeping bi-encoder order")
+                return None
+            except Exception as e:
+                logger.warning(f"Cross-encoder failed, keeping bi-encoder order: {e}")
+                return None
+
+        if not scores:
+            return None
+        reranked = sorted(
+            ((doc_id, scores[doc_id]) for doc_id in candidates if doc_id in scores),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        # The two score scales are not comparable, so unscored candidates rank
+        # below every scored one, keeping their bi-encoder order
+        floor = reranked[-1][1]
+        unscored = [doc_id for doc_id, _ in results if doc_id not in scores]
+        reranked.extend((doc_id, floor - (i + 1) * 1e-6) for i, doc_id in enumerate(unscored))
+        return reranked
@@ -0,0 +1,277 @@
+"""Vector index partitioned into time or hash shards, searched concurrently"""
+
+import heapq
+import os
+import shutil
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.exceptions import VectorDBException
+from app.core.logging import logger
+from app.rag.pipeline import VectorDatabase, article_id_from_chunk_id
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class ShardedVectorDatabase:
+    """
+    VectorDatabase interface over several shard indexes
+
+    Each shard is a VectorDatabase with its own files under
+    <base_path>.shards/<key>/, so shards keep generations, memory mapping
+    and read-only refresh. Time shards hold the chunks of articles
+    published in one shard_days window, so retention drops a whole shard
+    instead of rewriting an index; hash shards spread articles evenly by
+    article ID. Searches fan out to every shard on a thread pool (FAISS
+    releases the GIL) and merge the per-shard top-k, which for flat
+    indexes is exactly the single-index result.
+    """
+
+    def __init__(
+        self,
+        embedding_dim: int = 384,
+        base_path: str = None,
+        scheme: str = settings.VECTOR_DB_SHARDING,
+        n_shards: int = settings.VECTOR_DB_HASH_SHARDS,
+        shard_days: int = settings.VECTOR_DB_SHARD_DAYS,
+        read_only: bool = False,
+        mmap: bool = settings.VECTOR_DB_MMAP,
+        search_threads: int = settings.VECTOR_DB_SEARCH_THREADS
+    ):
+        """Initialize sharded database, opening the shards already on disk"""
+        if scheme not in ("time", "hash"):
+            raise VectorDBException(f"Unknown sharding scheme: {scheme}")
+        self.embedding_dim = embedding_dim
+        self.shards_dir = f"{base_path or settings.VECTOR_DB_PATH}.shards"
+        self.scheme = scheme
+        self.n_shards = n_shards
+        self.shard_days = shard_days
+        self.read_only = read_only
+        self.mmap = mmap
+        self._lock = threading.Lock()
+        self._next_discover = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=search_threads, thread_name_prefix="shard-search")
+        # Replaced, never mutated, so searches iterate a stable snapshot
+        self._shards: Dict[str, VectorDatabase] = {}
+
+        os.makedirs(self.shards_dir, exist_ok=True)
+        self._discover()
+        logger.info(f"Opened {len(self._shards)} {scheme} shards in {self.shards_dir}")
+
+    def _open_shard(self, key: str) -> VectorDatabase:
+        return VectorDatabase(
+            embedding_dim=self.embedding_dim,
+            index_path=os.path.join(self.shards_dir, key, "faiss_index"),
+            read_only=self.read_only,
+            mmap=self.mmap
+        )
+
+    def _discover(self) -> None:
+        """Open shards created (and forget shards dropped) by another process"""
+        with self._lock:
+            on_disk = {
+                entry.name for entry in os.scandir(self.shards_dir)
+                if entry.is_dir() and not entry.name.startswith(".")
+            }
+            shards = {key: shard for key, shard in self._shards.items() if key in on_disk}
+            for key in sorted(on_disk - set(shards)):
+                shards[key] = self._open_shard(key)
+            self._shards = shards
+
+    def _maybe_discover(self) -> None:
+        if self.read_only and time.monotonic() >= self._next_discover:
+            self._next_discover = time.monotonic() + settings.VECTOR_DB_REFRESH_SECONDS
+            self._discover()
+
+    def shard_key(self, doc_id: str, timestamp: Optional[datetime] = None) -> str:
+        """
+        Shard of a chunk: its article's hash bucket, or the start of the
+        shard_days window containing timestamp (now if unknown)
+        """
+        if self.scheme == "hash":
+            article_id = article_id_from_chunk_id(doc_id)
+            return f"h{zlib.crc32(article_id.encode()) % self.n_shards:04d}"
+        days = ((timestamp or datetime.utcnow()) - EPOCH).days
+        start = EPOCH + timedelta(days=days - days % self.shard_days)
+        return f"t{start:%Y%m%d}"
+
+    @staticmethod
+    def shard_start(key: str) -> Optional[datetime]:
+        """Window start of a time shard key (None for hash shards)"""
+        return datetime.strptime(key[1:], "%Y%m%d") if key.startswith("t") else None
+
+    @property
+    def shard_keys(self) -> List[str]:
+        return sorted(self._shards)
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever any shard saves a new generation"""
+        return sum(shard.generation for shard in self._shards.values())
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards.values())
+
+    def __contains__(self, doc_id: str) -> bool:
+        return any(doc_id in shard for shard in self._shards.values())
+
+    def add(
+        self,
+        embeddings: np.ndarray,
+        doc_ids: List[str],
+        sources: Optional[List[str]] = None,
+        timestamps: Optional[Sequence[Optional[datetime]]] = None,
+        save: bool = True
+    ) -> List[str]:
+        """
+        Add embeddings to their shards
+
+        timestamps (e.g. article publish times) place chunks in time shards;
+        save=False defers saving the shards.
+
+        Returns:
+            "<shard>:<position>" of each embedding, in input order
+        """
+        if self.read_only:
+            raise VectorDBException("Vector DB is a read-only replica; index from the ingestion process")
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        groups: Dict[str, List[int]] = {}
+        for i, doc_id in enumerate(doc_ids):
+            key = self.shard_key(doc_id, timestamps[i] if timestamps is not None else None)
+            groups.setdefault(key, []).append(i)
+
+        positions: List[Optional[str]] = [None] * len(doc_ids)
+        for key, rows in groups.items():
+            shard = self._shards.get(key)
+            if shard is None:
+                with self._lock:
+                    shard = self._shards.get(key) or self._open_shard(key)
+                    self._shards = {**self._shards, key: shard}
+            shard_positions = shard.add(
+                embeddings[rows],
+                [doc_ids[i] for i in rows],
+                sources=[sources[i] for i in rows] if sources is not None else None,
+                save=save
+            )
+            for i, position in zip(rows, shard_positions):
+                positions[i] = f"{key}:{position}"
+        return positions
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> Tuple[List[str], List[float]]:
+        """Search every shard concurrently and merge the best top_k"""
+        self._maybe_discover()
+        shards = list(self._shards.values())
+        if not shards:
+            return [], []
+        if len(shards) == 1:
+            return shards[0].search(query_embedding, top_k)
+
+        futures = [self._executor.submit(shard.search, query_embedding, top_k) for shard in shards]
+        hits = []
+        for future in futures:
+            doc_ids, scores = future.result()
+            hits.extend(zip(scores, doc_ids))
+        best = heapq.nlargest(top_k, hits)
+        return [doc_id for _, doc_id in best], [score for score, _ in best]
+
+    def _group_by_shard(self, doc_ids: List[str]) -> Dict[VectorDatabase, List[int]]:
+        groups: Dict[VectorDatabase, List[int]] = {}
+        shards = self._shards
+        for i, doc_id in enumerate(doc_ids):
+            if self.scheme == "hash":
+                shard = shards.get(self.shard_key(doc_id))
+            else:
+                # Publish times are not in the doc ID; shard counts stay small
+                shard = next((s for s in shards.values() if doc_id in s.positions), None)
+            if shard is not None:
+                groups.setdefault(shard, []).append(i)
+        return groups
+
+    def get_vectors(self, doc_ids: List[str]) -> np.ndarray:
+        """
+        Stored embeddings for doc IDs
+
+        Returns:
+            (len(doc_ids), dim) float32 array; unknown IDs get zero rows
+        """
+        vectors = np.zeros((len(doc_ids), self.embedding_dim), dtype=np.float32)
+        for shard, rows in self._group_by_shard(doc_ids).items():
+            vectors[rows] = shard.get_vectors([doc_ids[i] for i in rows])
+        return vectors
+
+    def get_sources(self, doc_ids: List[str]) -> List[Optional[str]]:
+        """Stored source of each doc ID (None if unknown)"""
+        sources: List[Optional[str]] = [None] * len(doc_ids)
+        for shard, rows in self._group_by_shard(doc_ids).items():
+            for i, source in zip(rows, shard.get_sources([doc_ids[i] for i in rows])):
+                sources[i] = source
+        return sources
+
+    def iter_vectors(self, batch_size: int = 10000) -> Iterator[Tuple[List[Optional[str]], List[Optional[str]], np.ndarray]]:
+        """Stored vectors of every shard in turn (see VectorDatabase.iter_vectors)"""
+        for key in self.shard_keys:
+            yield from self._shards[key].iter_vectors(batch_size)
+
+    def remove(self, doc_ids: Iterable[str]) -> int:
+        """
+        Remove documents from the shards holding them (see VectorDatabase.remove)
+
+        Returns:
+            Number of vectors removed
+        """
+        doc_ids = list(doc_ids)
+        return sum(
+            shard.remove([doc_ids[i] for i in rows])
+            for shard, rows in self._group_by_shard(doc_ids).items()
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(shard.nbytes for shard in self._shards.values())
+
+    def disk_bytes(self) -> int:
+        return sum(shard.disk_bytes() for shard in self._shards.values())
+
+    def save(self) -> None:
+        for shard in self._shards.values():
+            shard.save()
+
+    def drop_shards_before(self, cutoff: datetime) -> List[str]:
+        """
+        Delete time shards whose whole window ends at or before cutoff
+
+        Dropping is a directory removal per shard, independent of how many
+        vectors it holds. Searches already running finish on the old shard
+        (open memory maps outlive the files); read-only replicas forget it
+        at their next discovery.
+
+        Returns:
+            Keys of the dropped shards
+        """
+        if self.scheme != "time":
+            raise VectorDBException("Only time shards can be dropped by age")
+        window = timedelta(days=self.shard_days)
+        with self._lock:
+            dropped = [
+                key for key in self._shards
+                if self.shard_start(key) is not None and self.shard_start(key) + window <= cutoff
+            ]
+            self._shards = {key: shard for key, shard in self._shards.items() if key not in dropped}
+        for key in dropped:
+            # Rename first so a crash mid-delete cannot leave a half-removed shard to be reopened
+            path = os.path.join(self.shards_dir, key)
+            trash = os.path.join(self.shards_dir, f".dropped-{key}")
+            shutil.rmtree(trash, ignore_errors=True)
+            os.replace(path, trash)
+            shutil.rmtree(trash, ignore_errors=True)
+        if dropped:
+            logger.info(f"Dropped vector shards older than {cutoff:%Y-%m-%d}: {', '.join(dropped)}")
+        return dropped
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,397 @@
+"""
+Retrieval sidecar: one process owns the index and embedding model
+
+API workers talk to it over a Unix socket instead of each loading their
+own copy, so API workers and retrieval scale separately on one node.
+
+    python -m app.rag.sidecar
+    RETRIEVAL_BACKEND=sidecar gunicorn -c gunicorn.conf.py app.main:app
+
+Each frame is an 8-byte length prefix, a JSON header and a raw binary
+payload; vectors and scores travel as little-endian float32 arrays.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.exceptions import EmbeddingException, NoRelevantDocumentsFound, VectorDBException
+from app.core.logging import logger
+from app.core.metrics import rag_stage_seconds
+
+_FRAME = struct.Struct("!II")  # header length, payload length
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+FLOAT32 = np.dtype("<f4")
+
+# Errors re-raised in the API worker with their original type
+_REMOTE_EXCEPTIONS = {
+    "NoRelevantDocumentsFound": NoRelevantDocumentsFound,
+    "EmbeddingException": EmbeddingException,
+    "VectorDBException": VectorDBException,
+}
+
+
+def encode_frame(header: Dict[str, Any], payload: bytes = b"") -> bytes:
+    body = json.dumps(header).encode()
+    return _FRAME.pack(len(body), len(payload)) + body + payload
+
+
+def _check_lengths(header_len: int, payload_len: int) -> None:
+    if header_len + payload_len > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {header_len + payload_len} bytes exceeds {MAX_FRAME_BYTES}")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[Dict[str, Any], bytes]:
+    header_len, payload_len = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    _check_lengths(header_len, payload_len)
+    header = json.loads(await reader.readexactly(header_len))
+    payload = await reader.readexactly(payload_len) if payload_len else b""
+    return header, payload
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> bytes:
+    buffer = bytearray(n)
+    view = memoryview(buffer)
+    received = 0
+    while received < n:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("Retrieval sidecar closed the connection")
+        received += count
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    header_len, payload_len = _FRAME.unpack(_recv_exactly(sock, _FRAME.size))
+    _check_lengths(header_len, payload_len)
+    header = json.loads(_recv_exactly(sock, header_len))
+    payload = _recv_exactly(sock, payload_len) if payload_len else b""
+    return header, payload
+
+
+class BatchingEncoder:
+    """
+    Coalesces concurrent encode() calls into one model call
+
+    Requests handled in parallel by the sidecar each embed one query; the
+    model is far cheaper per text in a batch, so calls arriving within
+    wait_ms of each other (up to max_batch texts) share a forward pass.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch: int = settings.RETRIEVAL_MAX_BATCH,
+        wait_ms: float = settings.RETRIEVAL_BATCH_WAIT_MS
+    ):
+        """Initialize encoder around a loaded EmbeddingModel"""
+        self.model = model
+        self.max_batch = max_batch
+        self.wait = wait_ms / 1000
+        self.batches = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            items = [item]
+            n_texts = len(item[0])
+            deadline = time.monotonic() + self.wait
+            while n_texts < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop after this batch
+                    break
+                items.append(item)
+                n_texts += len(item[0])
+
+            try:
+                vectors = self.model.encode([text for texts, _ in items for text in texts])
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for texts, future in items:
+                future.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+
+    def close(self) -> None:
+        self._queue.put(None)
+
+
+class RetrievalServer:
+    """Serves a Retriever's embed and retrieve calls on a Unix socket"""
+
+    def __init__(
+        self,
+        retriever,
+        socket_path: str = settings.RETRIEVAL_SOCKET_PATH,
+        threads: int = settings.RETRIEVAL_SERVER_THREADS
+    ):
+        """Initialize server; the retriever's embedding model should be a BatchingEncoder"""
+        self.retriever = retriever
+        self.socket_path = socket_path
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="retrieval-rpc")
+        self._handlers = {"info": self.info, "embed": self.embed, "retrieve": self.retrieve}
+
+    async def serve_forever(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # left behind by a previous run
+        server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"Retrieval sidecar listening on {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer one connection's requests in order (clients keep one in flight)"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    header, payload = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break  # client closed the connection
+                response = await loop.run_in_executor(self._executor, self.dispatch, header, payload)
+                writer.write(encode_frame(*response))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Dropped retrieval sidecar connection: {e}")
+        finally:
+            writer.close()
+
+    def dispatch(self, header: Dict[str, Any], payload: bytes) -> Tuple[Dict[str, Any], bytes]:
+        handler = self._handlers.get(header.get("op"))
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown op: {header.get('op')}")
+            return handler(header, payload)
+        except Exception as e:
+            if not isinstance(e, NoRelevantDocumentsFound):
+                logger.error(f"Retrieval sidecar {header.get('op')} failed: {e}")
+            return {"error": type(e).__name__, "detail": str(e)}, b""
+
+    def info(self, header: Dict[str, Any], payload: bytes) -> Tuple[Dict[str, Any], bytes]:
+        vector_db = self.retriever.vector_db
+        return {
+            "embedding_dim": vector_db.embedding_dim,
+            "reranks": self.retriever.reranker is not None,
+            "generation": vector_db.generation,
+            "vectors": len(vector_db),
+        }, b""
+
+    def embed(self, header: Dict[str, Any], payload: bytes) -> Tuple[Dict[str, Any], bytes]:
+        vectors = np.ascontiguousarray(self.retriever.embedding_model.encode(header["texts"]), dtype=FLOAT32)
+        return {"shape": list(vectors.shape)}, vectors.tobytes()
+
+    def retrieve(self, header: Dict[str, Any], payload: bytes) -> Tuple[Dict[str, Any], bytes]:
+        results = self.retriever.retrieve(
+            header["query"],
+            top_k=header["top_k"],
+            similarity_threshold=header["similarity_threshold"],
+            rerank_budget_ms=header.get("rerank_budget_ms")
+        )
+        scores = np.array([score for _, score in results], dtype=FLOAT32)
+        return {"doc_ids": [doc_id for doc_id, _ in results]}, scores.tobytes()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RetrievalClient:
+    """Pooled, blocking connections to the retrieval sidecar"""
+
+    def __init__(
+        self,
+        socket_path: str = settings.RETRIEVAL_SOCKET_PATH,
+        pool_size: int = settings.RETRIEVAL_POOL_SIZE,
+        timeout: float = settings.RETRIEVAL_TIMEOUT_SECONDS
+    ):
+        """Initialize client; connections open on first use"""
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.info: Dict[str, Any] = {}
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue()
+        # Connections opened in a preloading master must not be shared with workers
+        os.register_at_fork(after_in_child=self._discard_connections)
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _discard_connections(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def call(self, header: Dict[str, Any], payload: bytes = b"") -> Tuple[Dict[str, Any], bytes]:
+        """
+        Send one request and wait for its response
+
+        Raises:
+            VectorDBException: the sidecar is unreachable or failed; remote
+            NoRelevantDocumentsFound and EmbeddingException keep their type
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise VectorDBException("Retrieval sidecar connection pool exhausted")
+        try:
+            frame = encode_frame(header, payload)
+            while True:
+                try:
+                    sock, reused = self._idle.get_nowait(), True
+                except queue.Empty:
+                    sock, reused = self._connect(), False
+                try:
+                    sock.sendall(frame)
+                    response, data = recv_frame(sock)
+                except OSError:
+                    sock.close()
+                    if reused:
+                        continue  # idle connection went stale (sidecar restarted); requests are idempotent
+                    raise
+                self._idle.put(sock)
+                break
+        except (OSError, ValueError) as e:
+            raise VectorDBException(f"Retrieval sidecar unavailable: {e}")
+        finally:
+            self._slots.release()
+
+        error = response.get("error")
+        if error:
+            raise _REMOTE_EXCEPTIONS.get(error, VectorDBException)(response.get("detail") or error)
+        return response, data
+
+    def wait_until_ready(self, timeout: float = settings.RETRIEVAL_CONNECT_TIMEOUT_SECONDS) -> Dict[str, Any]:
+        """Retry the info handshake until the sidecar answers (it may start alongside the API)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.info = self.call({"op": "info"})[0]
+                return self.info
+            except VectorDBException:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.25)
+
+
+@lru_cache(maxsize=1)
+def get_client() -> RetrievalClient:
+    """Process-wide client, connected once the sidecar answers"""
+    client = RetrievalClient()
+    info = client.wait_until_ready()
+    logger.info(f"Connected to retrieval sidecar ({info['vectors']} vectors, generation {info['generation']})")
+    return client
+
+
+class RemoteEmbeddingModel:
+    """EmbeddingModel interface backed by the sidecar's model"""
+
+    def __init__(self, client: RetrievalClient):
+        """Initialize with a connected client"""
+        self.client = client
+        self.dimension = client.info["embedding_dim"]
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        header, payload = self.client.call({"op": "embed", "texts": list(texts)})
+        return np.frombuffer(payload, dtype=FLOAT32).reshape(header["shape"])
+
+
+class RemoteRetriever:
+    """Retriever interface backed by the sidecar"""
+
+    reranker = None  # re-ranking, if enabled, runs in the sidecar
+
+    def __init__(self, client: RetrievalClient):
+        """Initialize with a connected client"""
+        self.client = client
+        self.reranks = client.info["reranks"]
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        similarity_threshold: float = settings.VECTOR_SIMILARITY_THRESHOLD,
+        rerank_budget_ms: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Retrieve relevant documents for query
+
+        Returns:
+            List of (doc_id, score) tuples
+        """
+        with rag_stage_seconds.time("retrieval_rpc"):
+            header, payload = self.client.call({
+                "op": "retrieve",
+                "query": query,
+                "top_k": top_k,
+                "similarity_threshold": similarity_threshold,
+                "rerank_budget_ms": rerank_budget_ms,
+            })
+        scores = np.frombuffer(payload, dtype=FLOAT32)
+        return list(zip(header["doc_ids"], scores.tolist()))
+
+
+def build_server(socket_path: str = settings.RETRIEVAL_SOCKET_PATH) -> RetrievalServer:
+    """
+    Load the retrieval components locally and wrap them in a server
+
+    The index is opened read-only whatever VECTOR_DB_READ_ONLY says: the
+    ingestion process writes it, and read-only replicas are the ones that
+    pick up its new vector generations and BM25 log records.
+    """
+    from app.rag import pipeline as rag_pipeline
+
+    rag_pipeline.init_rag_components(read_only=True)
+    retriever = rag_pipeline.retriever
+    retriever.embedding_model = BatchingEncoder(retriever.embedding_model)
+    return RetrievalServer(retriever, socket_path=socket_path)
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Retrieval sidecar for API workers on this node")
+    parser.add_argument("--socket", default=settings.RETRIEVAL_SOCKET_PATH)
+    args = parser.parse_args()
+
+    setup_logging()
+    server = build_server(args.socket)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -0,0 +1,182 @@
+"""Batch summarization and background summary precomputation"""
+
+import asyncio
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import desc
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import registry
+from app.core.response_cache import bump_generation
+from app.db.database import SessionLocal
+from app.db.models import Article
+from app.rag.llm import RAGEngine
+
+
+def compute_content_hash(content: Optional[str]) -> Optional[str]:
+    """Hash article content so summaries can be tied to the text they came from"""
+    if not content:
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def summary_is_fresh(article: Article) -> bool:
+    """Check whether the stored summary was generated from the current content"""
+    return bool(article.summary) and article.summary_content_hash == article.content_hash
+
+
+def store_summary(article: Article, summary: str) -> None:
+    """Attach a generated summary and record the content it was generated from"""
+    if not article.content_hash:
+        article.content_hash = compute_content_hash(article.content)
+    article.summary = summary
+    article.summary_content_hash = article.content_hash
+
+
+class RateBudget:
+    """Async token bucket limiting LLM provider calls per minute"""
+
+    def __init__(self, calls_per_minute: int, burst: int = 1):
+        """Initialize rate budget"""
+        self.rate = calls_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a provider call is allowed"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SummaryPrecomputer:
+    """Generate and persist LLM summaries ahead of user requests"""
+
+    def __init__(
+        self,
+        engine: RAGEngine,
+        session_factory=SessionLocal,
+        top_n: int = settings.SUMMARY_PRECOMPUTE_TOP_N,
+        max_concurrency: int = settings.SUMMARY_MAX_CONCURRENCY,
+        calls_per_minute: int = settings.SUMMARY_RATE_LIMIT_PER_MINUTE
+    ):
+        """Initialize precomputer"""
+        self.engine = engine
+        self.session_factory = session_factory
+        self.top_n = top_n
+        self.max_concurrency = max_concurrency
+        self.budget = RateBudget(calls_per_minute, burst=max_concurrency)
+        self.pending = 0  # summaries waiting for or holding a provider slot
+
+    async def summarize_articles(
+        self,
+        articles: List[Article],
+        max_length: int = 300
+    ) -> Dict[str, str]:
+        """
+        Summarize articles whose summary is missing or stale
+
+        Provider calls run concurrently in worker threads, bounded by
+        max_concurrency and the per-minute rate budget. Summaries are set on
+        the articles; the caller commits its session.
+
+        Returns:
+            Dict mapping article ID to newly generated summary
+        """
+        pending = [a for a in articles if a.content and not summary_is_fresh(a)]
+        if not pending:
+            return {}
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def summarize(article: Article) -> str:
+            self.pending += 1
+            try:
+                async with semaphore:
+                    await self.budget.acquire()
+                    return await asyncio.to_thread(
+                        self.engine.summarize_article, article.content, max_length
+                    )
+            finally:
+                self.pending -= 1
+
+        results = await asyncio.gather(
+            *(summarize(a) for a in pending),
+            return_exceptions=True
+        )
+
+        generated = {}
+        for article, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Summarization failed for article {article.id}: {result}")
+                continue
+            store_summary(article, result)
+            generated[article.id] = result
+
+        logger.info(f"Generated {len(generated)}/{len(pending)} summaries")
+        return generated
+
+    async def precompute(self, categories: Optional[Iterable[str]] = None) -> int:
+        """
+        Summarize the top-N most recent articles in each category
+
+        Args:
+            categories: Categories to refresh (all known categories if omitted)
+
+        Returns:
+            Number of summaries generated
+        """
+        db = self.session_factory()
+        try:
+            if categories is None:
+                categories = [c for (c,) in db.query(Article.category).distinct() if c]
+
+            candidates = []
+            for category in set(categories):
+                candidates.extend(
+                    db.query(Article)
+                    .filter(Article.category == category)
+                    .order_by(desc(Article.published_at))
+                    .limit(self.top_n)
+                    .all()
+                )
+
+            generated = await self.summarize_articles(candidates)
+            db.commit()
+            if generated:
+                bump_generation()
+            return len(generated)
+        except Exception as e:
+            logger.error(f"Summary precomputation failed: {e}")
+            return 0
+        finally:
+            db.close()
+
+
+# Global instance (will be initialized on startup)
+summary_precomputer: Optional[SummaryPrecomputer] = None
+
+registry.gauge(
+    "summary_queue_depth",
+    "Summaries waiting for or holding an LLM provider slot",
+    lambda: summary_precomputer.pending if summary_precomputer else None
+)
+
+
+def init_summary_precomputer(engine: RAGEngine):
+    """Initialize summary precomputer with the RAG engine"""
+    global summary_precomputer
+
+    summary_precomputer = SummaryPrecomputer(engine)
+    logger.info("Summary precomputer initialized")
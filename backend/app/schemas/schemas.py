@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 
 
 class ArticleBase(BaseModel):
@@ -53,6 +53,26 @@ class SummarizeRequest(BaseModel):
     max_length: Optional[int] = 300
 
 
+class BatchSummarizeRequest(BaseModel):
+    """Schema for batch summarization requests"""
+    article_ids: List[str] = Field(..., min_length=1, max_length=50)
+    max_length: Optional[int] = 300
+
+
+class ArticleSummary(BaseModel):
+    """Schema for a single article summary"""
+    article_id: str
+    summary: str
+    cached: bool
+
+
+class BatchSummarizeResponse(BaseModel):
+    """Schema for batch summarization responses"""
+    summaries: List[ArticleSummary]
+    missing: List[str] = []
+    failed: List[str] = []
+
+
 class SummarizeResponse(BaseModel):
     """Schema for summarization responses"""
     article_id: str
@@ -78,12 +98,34 @@ class TrendingTopicsResponse(BaseModel):
     period: str = "24h"
 
 
+class EmergingTopicResponse(BaseModel):
+    """Schema for a bursting topic or entity"""
+    kind: str  # "topic" or an entity type such as ORG
+    name: str
+    score: float  # burst z-score of the current rate against the baseline
+    count: float  # decayed recent mentions
+    current_rate: float  # mentions per hour
+    baseline_rate: float  # mentions per hour
+
+
 class HeadlinesResponse(BaseModel):
     """Schema for headlines response"""
     articles: List[ArticleResponse]
     total_count: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+class SearchResult(ArticleResponse):
+    """Schema for a ranked search hit"""
+    score: Optional[float] = None
+    snippet: Optional[str] = None  # HTML-escaped text, matched terms wrapped in <mark></mark>
+
+
+class SearchResponse(HeadlinesResponse):
+    """Schema for search responses"""
+    articles: List[SearchResult]
 
 
 class ErrorResponse(BaseModel):
@@ -98,3 +140,50 @@ class HealthCheckResponse(BaseModel):
     status: str
     version: str
     timestamp: datetime
+
+
+class EntityResponse(BaseModel):
+    """Schema for an entity with its article count"""
+    name: str
+    entity_type: str
+    article_count: int
+
+
+class RelatedEntityResponse(BaseModel):
+    """Schema for an entity co-mentioned with another"""
+    name: str
+    entity_type: str
+    shared_articles: int
+
+
+class EntityArticlesResponse(HeadlinesResponse):
+    """Schema for articles mentioning an entity"""
+    entities: List[EntityResponse]
+
+
+class StoryResponse(BaseModel):
+    """Schema for a story cluster"""
+    id: int
+    title: str
+    article_count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+    sources: List[str]
+    articles: List[ArticleResponse]  # newest first
+
+
+class StoriesResponse(BaseModel):
+    """Schema for story listings"""
+    stories: List[StoryResponse]
+    next_cursor: Optional[str] = None
+
+
+class ProfileSummaryResponse(BaseModel):
+    """Schema for a stored request profile"""
+    profile_id: str
+    method: str
+    path: str
+    started_at: datetime
+    duration_ms: float
+    samples: int
+    spans_ms: Dict[str, float]
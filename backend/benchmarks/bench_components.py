@@ -0,0 +1,114 @@
+"""
+Microbenchmarks of the ingestion and retrieval building blocks
+
+Times TextChunker.chunk_text, TextCleaner.clean_text and
+SentimentAnalyzer.analyze per article, EmbeddingModel.encode per batch of
+chunks and VectorDatabase.search per query, over the synthetic corpus.
+Components whose model or library is not installed are reported as
+skipped. Results are written with benchmarks.results for comparison
+across commits.
+
+    python -m benchmarks.bench_components
+    python -m benchmarks.bench_components --articles 2000 --vectors 500000 --output results/components.json
+    python -m benchmarks.bench_components --baseline results/components.json --threshold 0.15
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+import numpy as np
+from app.core.config import settings
+from app.nlp.processors import SentimentAnalyzer, TextCleaner
+from app.rag.pipeline import EmbeddingModel, TextChunker, VectorDatabase
+from benchmarks.corpus import SIZES, generate_articles
+from benchmarks.results import add_baseline_arguments, check, summarize, write_results
+
+
+def time_calls(fn: Callable[[Any], Any], inputs: List[Any], repeats: int, unit: str) -> Dict[str, Any]:
+    """Per-call timings of fn over inputs (after one warm-up call), and calls per second"""
+    fn(inputs[0])
+    timings = []
+    for _ in range(repeats):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {**summarize(timings), f"{unit}_per_second": round(len(timings) / (sum(timings) / 1000), 1)}
+
+
+def bench_chunker(texts: List[str], repeats: int) -> Dict[str, Any]:
+    chunker = TextChunker(chunk_size=settings.CHUNK_SIZE, overlap=settings.CHUNK_OVERLAP)
+    return time_calls(lambda text: chunker.chunk_text(text, chunk_id_prefix="bench"), texts, repeats, "articles")
+
+
+def bench_cleaner(texts: List[str], repeats: int) -> Dict[str, Any]:
+    return time_calls(TextCleaner.clean_text, texts, repeats, "articles")
+
+
+def bench_sentiment(texts: List[str], repeats: int) -> Dict[str, Any]:
+    analyzer = SentimentAnalyzer()
+    return time_calls(analyzer.analyze, texts, repeats, "articles")
+
+
+def bench_embedding(texts: List[str], model_name: str, batch_size: int) -> Dict[str, Any]:
+    model = EmbeddingModel(model_name)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    result = time_calls(lambda batch: model.encode(batch, batch_size=batch_size), batches, 1, "batches")
+    result["texts_per_second"] = round(result.pop("batches_per_second") * len(texts) / len(batches), 1)
+    return result
+
+
+def bench_vector_search(n_vectors: int, dim: int, n_queries: int, top_k: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n_vectors, dim), dtype=np.float32)
+    queries = list(vectors[rng.integers(0, n_vectors, n_queries)] + 0.1)
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_db = VectorDatabase(embedding_dim=dim, index_path=f"{tmp}/faiss_index")
+        vector_db.add(vectors, [f"doc{i}_chunk_0" for i in range(n_vectors)])
+        return time_calls(lambda query: vector_db.search(query, top_k=top_k), queries, 1, "queries")
+
+
+def skippable(name: str, run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Run one benchmark; components that cannot load are skipped, not fatal"""
+    try:
+        return run()
+    except Exception as e:
+        print(f"{name}: skipped ({e})", file=sys.stderr)
+        return {"skipped": str(e)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=SIZES["small"] // 2)
+    parser.add_argument("--repeats", type=int, default=3, help="passes over the articles for per-article components")
+    parser.add_argument("--embedding-model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=settings.HYBRID_CANDIDATES)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    articles = generate_articles(args.articles)
+    contents = [article["content"] for article in articles]
+    cleaned = [TextCleaner.clean_text(text) for text in contents]
+    chunker = TextChunker(chunk_size=settings.CHUNK_SIZE, overlap=settings.CHUNK_OVERLAP)
+    chunks = [chunk for text in cleaned for _, chunk in chunker.chunk_text(text)]
+
+    metrics = {
+        "chunk_text": bench_chunker(cleaned, args.repeats),
+        "clean_text": bench_cleaner(contents, args.repeats),
+        "sentiment": skippable("sentiment", lambda: bench_sentiment(cleaned, args.repeats)),
+        "embedding_encode": skippable(
+            "embedding_encode", lambda: bench_embedding(chunks, args.embedding_model, args.batch_size)
+        ),
+        "vector_search": bench_vector_search(args.vectors, args.dim, args.queries, args.top_k),
+    }
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "threshold")}
+    config["chunks"] = len(chunks)
+    report = write_results(args.output, "components", config, metrics)
+    if args.baseline and not check(args.baseline, report, args.threshold):
+        sys.exit(1)
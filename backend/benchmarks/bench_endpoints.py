@@ -0,0 +1,161 @@
+"""
+Load scenarios for the news, trending and RAG endpoints
+
+Seeds a SQLite database (or --database-url) with the synthetic corpus
+through NewsStore, indexes it through NewsIndexer with a hashing embedding
+model, and answers /api/ai/query with a fake LLM that sleeps
+--llm-latency-ms, so runs need no network or model downloads. Each
+scenario sends --requests requests from --concurrency concurrent clients
+through the full app (middleware included) over httpx's in-process ASGI
+transport and reports requests/sec and latency percentiles.
+
+    python -m benchmarks.bench_endpoints
+    python -m benchmarks.bench_endpoints --articles 10000 --concurrency 32 --output results/endpoints.json
+    python -m benchmarks.bench_endpoints --baseline results/endpoints.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, Tuple
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.db.database import create_async_db_engine, get_async_db, get_db
+from app.main import app
+from app.rag import llm as rag_llm
+from app.rag import pipeline as rag_pipeline
+from app.rag.llm import LLMProvider, RAGEngine
+from benchmarks.corpus import CATEGORIES, QUERIES, SIZES, build_indexes, generate_articles, seed_database
+from benchmarks.results import add_baseline_arguments, check, summarize, write_results
+
+
+class FakeLLMProvider(LLMProvider):
+    """Answers after a fixed delay, like a remote model without the variance"""
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 500) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return f"Synthetic answer based on {prompt.count('Source:')} sources."
+
+
+def scenarios() -> Dict[str, Iterator[Tuple[str, str, Dict[str, Any]]]]:
+    """Endless (method, path, request kwargs) streams per scenario"""
+    return {
+        "headlines": (
+            ("GET", "/api/news/headlines", {"params": {"category": category, "page": page, "page_size": 20}})
+            for category, page in itertools.cycle(itertools.product(CATEGORIES + ["all"], (1, 2, 3)))
+        ),
+        "search": (
+            ("GET", "/api/news/search", {"params": {"q": q, "page_size": 20}})
+            for q in itertools.cycle(QUERIES)
+        ),
+        "trending_topics": (
+            ("GET", "/api/trending/topics", {"params": {"hours": hours}})
+            for hours in itertools.cycle((24, 72, 168))
+        ),
+        "ai_query": (
+            ("POST", "/api/ai/query", {"json": {"query": q}})
+            for q in itertools.cycle(QUERIES)
+        ),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    requests: Iterator[Tuple[str, str, Dict[str, Any]]],
+    n_requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    method, path, kwargs = next(requests)
+    await client.request(method, path, **kwargs)  # warm up caches and connections
+    timings, errors = [], 0
+    remaining = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, path, kwargs = next(requests)
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return {**summarize(timings), "requests_per_second": round(n_requests / elapsed, 1), "errors": errors}
+
+
+def override_sessions(database_url: str, session_factory: Callable) -> None:
+    """Point the app's sync and async session dependencies at the benchmark database"""
+    async_session_factory = async_sessionmaker(create_async_db_engine(database_url), expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_db] = override_get_db
+
+
+def setup(args, tmp: str) -> None:
+    """Seed the database and indexes, and install the fake LLM"""
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"
+    articles = generate_articles(args.articles)
+    session_factory = seed_database(database_url, articles)
+    build_indexes(articles, session_factory, os.path.join(tmp, "faiss_index"))
+    rag_pipeline.build_retriever()
+    rag_llm.rag_engine = RAGEngine(FakeLLMProvider(args.llm_latency_ms))
+    override_sessions(database_url, session_factory)
+    # Read when the middleware stack is built, on the first request
+    settings.RATE_LIMIT_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = not args.no_response_cache
+
+
+async def main(args) -> Dict[str, Any]:
+    metrics = {}
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 5000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name, requests in scenarios().items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            n_requests = args.rag_requests if name == "ai_query" else args.requests
+            metrics[name] = await run_scenario(client, requests, n_requests, args.concurrency)
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=SIZES["small"])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rag-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(scenarios()), help="default: all")
+    parser.add_argument("--no-response-cache", action="store_true", help="measure headlines and trends uncached")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(args, tmp)
+        results = asyncio.run(main(args))
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "threshold")}
+    report = write_results(args.output, "endpoints", config, results)
+    if args.baseline and not check(args.baseline, report, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,120 @@
+"""
+Requests/sec through the middleware stack: BaseHTTPMiddleware vs pure ASGI
+
+Both stacks wrap a trivial endpoint with request logging and the in-memory
+rate limiter. "before" reproduces the previous BaseHTTPMiddleware classes
+logging two lines per request straight to a RotatingFileHandler; "after"
+is the current ASGI middleware logging one access record through the
+QueueHandler. Requests go through httpx's in-process ASGI transport, so
+no network is involved.
+
+    python -m benchmarks.bench_middleware
+    python -m benchmarks.bench_middleware --requests 20000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import logging.handlers
+import os
+import tempfile
+import time
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core import logging as app_logging
+from app.core.middleware import RateLimitMiddleware, RequestLoggingMiddleware
+from app.core.ratelimit import RateLimit, RateLimiter
+
+UNLIMITED = RateLimit(10**9, 60)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous implementation: two synchronous log writes per request"""
+
+    def __init__(self, app, log: logging.Logger):
+        super().__init__(app)
+        self.log = log
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        self.log.info(f"{request.method} {request.url.path}")
+        response = await call_next(request)
+        self.log.info(f"Status: {response.status_code} | Time: {time.time() - start_time:.2f}s")
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware shape around the current limiter"""
+
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request: Request, call_next):
+        await self.limiter.check(request.client.host, request.url.path)
+        return await call_next(request)
+
+
+def build_app(stack: str, log_dir: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    limiter = RateLimiter(None, default_limit=UNLIMITED, route_limits={})
+    if stack == "before":
+        log = logging.getLogger("bench.legacy")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(os.path.join(log_dir, "legacy.log"), maxBytes=10485760)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        log.handlers = [handler]
+        app.add_middleware(LegacyRequestLoggingMiddleware, log=log)
+        app.add_middleware(LegacyRateLimitMiddleware, limiter=limiter)
+    else:
+        # Same file output, written by the queue listener thread
+        handler = logging.handlers.RotatingFileHandler(os.path.join(log_dir, "access.log"), maxBytes=10485760)
+        handler.setFormatter(app_logging.StructuredFormatter())
+        app_logging._listener.handlers = (handler,)
+        app.add_middleware(RequestLoggingMiddleware)
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app
+
+
+async def measure(app: FastAPI, n_requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 5000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/api/ping")  # warm up
+        remaining = iter(range(n_requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/api/ping")
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return n_requests / (time.perf_counter() - start)
+
+
+async def main(args) -> dict:
+    results = {"requests": args.requests, "concurrency": args.concurrency, "requests_per_second": {}}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for stack in ("before", "after"):
+            app = build_app(stack, log_dir)
+            rps = [await measure(app, args.requests, args.concurrency) for _ in range(args.repeats)]
+            results["requests_per_second"][stack] = round(max(rps))
+    before, after = results["requests_per_second"]["before"], results["requests_per_second"]["after"]
+    results["speedup"] = round(after / before, 2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
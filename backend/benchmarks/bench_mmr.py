@@ -0,0 +1,89 @@
+"""
+Latency added by MMR re-ranking in Retriever.rerank
+
+Times the full re-rank step (vector reconstruction from the FAISS index plus
+mmr_select) for a candidate list, against a synthetic index of
+near-duplicate clusters. Reports mean/p95 milliseconds per call.
+
+    python -m benchmarks.bench_mmr
+    python -m benchmarks.bench_mmr --candidates 100 --top-k 10 --index-size 200000
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.rag.diversify import mmr_select
+from app.rag.pipeline import Retriever, VectorDatabase
+
+
+def build_index(path: str, size: int, dim: int, n_sources: int = 20, seed: int = 7) -> VectorDatabase:
+    """Clusters of 5 near-identical rewrites from random sources"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((size // 5 + 1, dim)).astype(np.float32)
+    vectors = np.repeat(centers, 5, axis=0)[:size] + 0.05 * rng.standard_normal((size, dim)).astype(np.float32)
+    doc_ids = [f"doc{i // 5}_{i % 5}_chunk_0" for i in range(size)]
+    sources = [f"source{s}" for s in rng.integers(0, n_sources, size)]
+
+    vector_db = VectorDatabase(embedding_dim=dim, index_path=path)
+    vector_db.index.add(vectors)
+    vector_db.doc_id_map = dict(enumerate(doc_ids))
+    vector_db.positions = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+    vector_db.doc_sources = dict(zip(doc_ids, sources))
+    return vector_db
+
+
+def time_calls(fn, repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+    }
+
+
+def main(args) -> dict:
+    rng = np.random.default_rng(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_db = build_index(f"{tmp}/faiss_index", args.index_size, args.dim)
+        retriever = Retriever(None, vector_db, mmr_lambda=args.mmr_lambda, max_per_source=args.max_per_source)
+
+        # Candidate lists drawn from a few clusters, as a breaking story would return
+        start = int(rng.integers(0, args.index_size - args.candidates))
+        doc_ids = [vector_db.doc_id_map[i] for i in range(start, start + args.candidates)]
+        results = [(doc_id, 1.0 - 0.001 * rank) for rank, doc_id in enumerate(doc_ids)]
+        vectors = vector_db.get_vectors(doc_ids)
+        relevance = [score for _, score in results]
+
+        rerank = retriever.rerank("query", results, args.top_k)
+        return {
+            "index_size": args.index_size,
+            "candidates": args.candidates,
+            "top_k": args.top_k,
+            "distinct_clusters_selected": len({doc_id.split("_")[0] for doc_id, _ in rerank}),
+            "distinct_clusters_without_mmr": len({doc_id.split("_")[0] for doc_id, _ in results[:args.top_k]}),
+            "mmr_select": time_calls(
+                lambda: mmr_select(vectors, relevance, args.top_k, lambda_=args.mmr_lambda), args.repeats
+            ),
+            "rerank_with_reconstruction": time_calls(
+                lambda: retriever.rerank("query", results, args.top_k), args.repeats
+            ),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index-size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--mmr-lambda", type=float, default=0.7)
+    parser.add_argument("--max-per-source", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=1000)
+    print(json.dumps(main(parser.parse_args()), indent=2))
@@ -0,0 +1,127 @@
+"""
+Compare ILIKE scans with the full-text index for /api/news/search
+
+Builds a synthetic article table (1M rows by default) and times the search
+query plus its total count for a handful of queries, using the old ILIKE
+filter and full_text_search. The table is reused between runs.
+
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --articles 100000 --database-url sqlite:///./bench_search.sqlite
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, desc, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.db.database import create_async_db_engine
+from app.db.models import Article, Base
+from app.db.search import ensure_search_schema, full_text_search
+
+QUERIES = ["earnings", "central bank rates", "nvda", "election results", "zzzunmatched"]
+
+TOPIC_WORDS = (
+    "market stocks earnings bank central rates inflation election results vote "
+    "technology chip nvda apple cloud ai model sports league final injury health "
+    "vaccine hospital climate storm energy oil gas policy court ruling trade "
+    "tariff growth jobs report housing startup funding merger deal"
+).split()
+
+
+def build_vocabulary(size: int = 20000):
+    """Zipf-distributed vocabulary with topic words spread across the ranks"""
+    words = [f"w{i}" for i in range(size)]
+    for i, word in enumerate(TOPIC_WORDS):
+        words[20 + i * (size // len(TOPIC_WORDS) // 4)] = word
+    weights = [1.0 / (rank + 1) for rank in range(size)]
+    cumulative, total = [], 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return words, cumulative
+
+
+def seed(database_url: str, n_articles: int, batch_size: int = 10000) -> None:
+    """Create the schema and insert synthetic articles until n_articles exist"""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_schema(engine)
+    rng = random.Random(42)
+    words, cumulative = build_vocabulary()
+    now = datetime.utcnow()
+
+    with engine.begin() as connection:
+        existing = connection.execute(select(func.count()).select_from(Article)).scalar_one()
+
+    for start in range(existing, n_articles, batch_size):
+        rows = [
+            {
+                "id": f"bench-{i}",
+                "url": f"https://bench.example.com/{i}",
+                "title": " ".join(rng.choices(words, cum_weights=cumulative, k=8)),
+                "content": " ".join(rng.choices(words, cum_weights=cumulative, k=120)),
+                "source": "Benchmark",
+                "category": "general",
+                "published_at": now - timedelta(seconds=i),
+                "created_at": now,
+            }
+            for i in range(start, min(start + batch_size, n_articles))
+        ]
+        with engine.begin() as connection:
+            connection.execute(insert(Article), rows)
+        print(f"seeded {start + len(rows)}/{n_articles}", flush=True)
+
+    engine.dispose()
+
+
+async def ilike_search(db, q: str):
+    """The pre-index search route: ILIKE filter, count() and a recency page"""
+    stmt = select(Article).where(Article.title.ilike(f"%{q}%") | Article.content.ilike(f"%{q}%"))
+    await db.execute(select(func.count()).select_from(stmt.subquery()))
+    (await db.execute(stmt.order_by(desc(Article.published_at)).limit(10))).scalars().all()
+
+
+async def fts_search(db, q: str):
+    await full_text_search(db, q, page_size=10)
+
+
+async def time_queries(session_factory, search, repeats: int) -> dict:
+    timings = {}
+    for q in QUERIES:
+        samples = []
+        for _ in range(repeats):
+            async with session_factory() as db:
+                start = time.perf_counter()
+                await search(db, q)
+                samples.append((time.perf_counter() - start) * 1000)
+        timings[q] = round(statistics.median(samples), 2)
+    return timings
+
+
+async def main(args) -> dict:
+    seed(args.database_url, args.articles)
+    engine = create_async_db_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    results = {
+        "database": args.database_url.split("://")[0],
+        "articles": args.articles,
+        "median_ms": {
+            "ilike": await time_queries(session_factory, ilike_search, args.repeats),
+            "full_text": await time_queries(session_factory, fts_search, args.repeats),
+        },
+    }
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_search.sqlite")
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,172 @@
+"""
+Response serialization of the article list endpoints
+
+For headlines, category, search and entity articles, times building one
+page's response body two ways against the same synthetic database: the
+response-model path (load Article objects, ArticleResponse per row, the
+response model, then FastAPI's response validation, jsonable encoding and
+JSONResponse) and the route as it is now (load the ArticleResponse
+columns, encode dicts with orjson). Both bodies are checked to decode to
+the same JSON before timing.
+
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --page-sizes 10 100 --output results/serialization.json
+    python -m benchmarks.bench_serialization --baseline results/serialization.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.api import routes
+from app.db.counts import category_counts
+from app.db.database import create_async_db_engine
+from app.db.entities import entity_articles, find_entities
+from app.db.models import Article
+from app.db.pagination import paginate
+from app.db.search import full_text_search
+from app.schemas.schemas import (
+    ArticleResponse, EntityArticlesResponse, EntityResponse, HeadlinesResponse, SearchResponse, SearchResult
+)
+from benchmarks.corpus import SIZES, generate_articles, seed_database
+from benchmarks.results import add_baseline_arguments, check, summarize, write_results
+
+CATEGORY = "business"
+QUERY = "markets"
+ENTITY = "Org3"
+
+_response_fields = {}
+
+
+async def render_model(response_model, content: Any) -> bytes:
+    """Encode a route's return value the way FastAPI does for its response_model"""
+    field = _response_fields.get(response_model)
+    if field is None:
+        field = _response_fields[response_model] = create_response_field(
+            name=f"Response_{response_model.__name__}", type_=response_model
+        )
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def models_headlines(db, page_size: int) -> bytes:
+    articles, next_cursor = await paginate(db, select(Article).where(Article.category == CATEGORY), page_size=page_size)
+    return await render_model(HeadlinesResponse, HeadlinesResponse(
+        articles=[ArticleResponse.model_validate(a) for a in articles],
+        total_count=await category_counts.get(db, CATEGORY),
+        page=1,
+        page_size=page_size,
+        next_cursor=next_cursor
+    ))
+
+
+async def models_search(db, page_size: int) -> bytes:
+    hits, total_count, next_cursor = await full_text_search(db, QUERY, page_size=page_size)
+    return await render_model(SearchResponse, SearchResponse(
+        articles=[
+            SearchResult(**ArticleResponse.model_validate(hit.article).model_dump(), score=hit.score, snippet=hit.snippet)
+            for hit in hits
+        ],
+        total_count=total_count,
+        page=1,
+        page_size=page_size,
+        next_cursor=next_cursor
+    ))
+
+
+async def models_entity_articles(db, page_size: int) -> bytes:
+    entities = await find_entities(db, ENTITY, None)
+    articles, next_cursor = await entity_articles(db, [e.id for e in entities], page_size=page_size)
+    return await render_model(EntityArticlesResponse, EntityArticlesResponse(
+        articles=[ArticleResponse.model_validate(a) for a in articles],
+        total_count=sum(e.article_count for e in entities),
+        page=1,
+        page_size=page_size,
+        next_cursor=next_cursor,
+        entities=[
+            EntityResponse(name=e.name, entity_type=e.entity_type, article_count=e.article_count) for e in entities
+        ]
+    ))
+
+
+def endpoints() -> Dict[str, Dict[str, Callable[[Any, int], Awaitable[bytes]]]]:
+    """Per endpoint, the response-model and current ("fast") ways to build a page's body"""
+
+    async def body(response) -> bytes:
+        return (await response).body
+
+    return {
+        "headlines": {
+            "models": models_headlines,
+            "fast": lambda db, n: body(routes.get_headlines(category=CATEGORY, page=1, page_size=n, cursor=None, db=db)),
+        },
+        "category": {
+            "models": models_headlines,
+            "fast": lambda db, n: body(routes.get_news_by_category(category=CATEGORY, page=1, page_size=n, cursor=None, db=db)),
+        },
+        "search": {
+            "models": models_search,
+            "fast": lambda db, n: body(routes.search_articles(q=QUERY, page=1, page_size=n, cursor=None, db=db)),
+        },
+        "entity_articles": {
+            "models": models_entity_articles,
+            "fast": lambda db, n: body(routes.get_entity_articles(
+                name=ENTITY, entity_type=None, page=1, page_size=n, cursor=None, db=db
+            )),
+        },
+    }
+
+
+async def time_path(session_factory, build: Callable[[Any, int], Awaitable[bytes]], page_size: int, repeats: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeats):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            await build(db, page_size)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {**summarize(timings), "pages_per_second": round(len(timings) / (sum(timings) / 1000), 1)}
+
+
+async def main(args, database_url: str) -> Dict[str, Any]:
+    session_factory = async_sessionmaker(create_async_db_engine(database_url), expire_on_commit=False)
+    metrics: Dict[str, Any] = {}
+    for name, paths in endpoints().items():
+        for page_size in args.page_sizes:
+            async with session_factory() as db:
+                bodies = [await build(db, page_size) for build in paths.values()]
+            if len({json.dumps(json.loads(b), sort_keys=True) for b in bodies}) != 1:
+                raise SystemExit(f"{name}: response-model and fast bodies differ for page_size {page_size}")
+
+            result: Dict[str, Any] = {"bytes": len(bodies[-1])}
+            for path, build in paths.items():
+                result[path] = await time_path(session_factory, build, page_size, args.repeats)
+            result["speedup"] = round(result["models"]["mean_ms"] / result["fast"]["mean_ms"], 2)
+            metrics.setdefault(name, {})[f"page_{page_size}"] = result
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=SIZES["small"])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeats", type=int, default=200, help="pages built per endpoint, path and page size")
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"
+        seed_database(database_url, generate_articles(args.articles))
+        results = asyncio.run(main(args, database_url))
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "threshold")}
+    report = write_results(args.output, "serialization", config, results)
+    if args.baseline and not check(args.baseline, report, args.threshold):
+        sys.exit(1)
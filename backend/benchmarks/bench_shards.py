@@ -0,0 +1,108 @@
+"""
+Sharded vs single vector index: search latency, recall and retention cost
+
+Builds one flat index and hash-sharded copies of the same synthetic
+vectors, then reports per-query latency (mean/p95 ms) and recall@k of each
+sharded layout against the single index. A time-sharded copy measures
+retention: dropping the oldest shard vs removing the same vectors from a
+single index.
+
+    python -m benchmarks.bench_shards
+    python -m benchmarks.bench_shards --vectors 500000 --shards 2 4 8 16 --threads 8
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from app.rag.pipeline import VectorDatabase
+from app.rag.shards import ShardedVectorDatabase
+
+
+def time_searches(vector_db, queries: np.ndarray, top_k: int) -> dict:
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        doc_ids, _ = vector_db.search(query, top_k=top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(doc_ids)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "results": results,
+    }
+
+
+def recall(results, expected) -> float:
+    hits = sum(len(set(found) & set(truth)) for found, truth in zip(results, expected))
+    return round(hits / sum(len(truth) for truth in expected), 4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.vectors, args.dim), dtype=np.float32)
+    doc_ids = [f"doc{i}_chunk_0" for i in range(args.vectors)]
+    queries = vectors[rng.integers(0, args.vectors, args.queries)] + 0.1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = VectorDatabase(embedding_dim=args.dim, index_path=f"{tmp}/single/faiss_index")
+        single.add(vectors, doc_ids)
+        baseline = time_searches(single, queries, args.top_k)
+        report = {
+            "vectors": args.vectors,
+            "single": {k: v for k, v in baseline.items() if k != "results"},
+            "hash_shards": [],
+        }
+
+        for n_shards in args.shards:
+            sharded = ShardedVectorDatabase(
+                embedding_dim=args.dim, base_path=f"{tmp}/hash{n_shards}/faiss_index",
+                scheme="hash", n_shards=n_shards, search_threads=args.threads
+            )
+            sharded.add(vectors, doc_ids)
+            timed = time_searches(sharded, queries, args.top_k)
+            report["hash_shards"].append({
+                "shards": n_shards,
+                "mean_ms": timed["mean_ms"],
+                "p95_ms": timed["p95_ms"],
+                f"recall@{args.top_k}": recall(timed["results"], baseline["results"]),
+            })
+            sharded.close()
+
+        # Retention: one week of eight dropped from time shards vs a single index
+        now = datetime(2026, 1, 1)
+        timestamps = [now - timedelta(days=int(d)) for d in rng.integers(0, 56, args.vectors)]
+        by_time = ShardedVectorDatabase(
+            embedding_dim=args.dim, base_path=f"{tmp}/time/faiss_index", scheme="time", shard_days=7
+        )
+        by_time.add(vectors, doc_ids, timestamps=timestamps)
+        cutoff = min(ShardedVectorDatabase.shard_start(key) for key in by_time.shard_keys) + timedelta(days=7)
+        expired = np.array([i for i, t in enumerate(timestamps) if t < cutoff], dtype=np.int64)
+
+        start = time.perf_counter()
+        by_time.drop_shards_before(cutoff)
+        drop_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        single.index.remove_ids(expired)
+        single.save()
+        remove_ms = (time.perf_counter() - start) * 1000
+        report["retention"] = {
+            "expired_vectors": len(expired),
+            "drop_time_shard_ms": round(drop_ms, 2),
+            "single_index_remove_and_save_ms": round(remove_ms, 2),
+        }
+
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,78 @@
+"""
+Cold-start time: sequential vs parallel component loading
+
+Each run is a fresh interpreter that imports app.main, starts the
+component registry the way the lifespan does, and records when the app
+could accept traffic (live), when READY_COMPONENTS loaded (ready), and
+when every component settled. One loader thread reproduces the old
+one-after-another lifespan, which only accepted traffic once everything
+had loaded.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --workers 1 4 8 --database-url sqlite:///./bench_startup.db
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def child(workers: int) -> dict:
+    """Measure one cold start in this process"""
+    start = time.perf_counter()
+    from app.core.config import settings
+    from app.main import app  # noqa: F401 (import cost is part of cold start)
+    from app.core.components import components
+    imported = time.perf_counter() - start
+
+    components.start(max_workers=workers)
+    live = time.perf_counter() - start
+    while not components.is_ready(settings.READY_COMPONENTS):
+        if any(components.status()[name]["state"] == "failed" for name in settings.READY_COMPONENTS):
+            break
+        time.sleep(0.001)
+    ready = time.perf_counter() - start
+    components.wait_all()
+    settled = time.perf_counter() - start
+
+    return {
+        "workers": workers,
+        "import_seconds": round(imported, 3),
+        # A single loader thread stands in for the old blocking lifespan
+        "live_seconds": round(live if workers > 1 else settled, 3),
+        "ready_seconds": round(ready, 3),
+        "all_loaded_seconds": round(settled, 3),
+        "components": components.status(),
+    }
+
+
+def run(workers: int, database_url: str = None) -> dict:
+    env = dict(os.environ)
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", str(workers)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child)))
+    else:
+        results = []
+        for workers in args.workers:
+            runs = [run(workers, args.database_url) for _ in range(args.repeats)]
+            results.append(min(runs, key=lambda r: r["all_loaded_seconds"]))
+        print(json.dumps(results, indent=2))
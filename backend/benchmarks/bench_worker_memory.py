@@ -0,0 +1,132 @@
+"""
+Memory per worker: every worker loading its own copy vs preload-and-fork
+
+Builds a synthetic FAISS index, then starts N forked workers two ways:
+
+  per_worker  each worker reads the index into its own memory (and loads
+              the embedding model, when sentence-transformers is installed)
+  preload     the master loads the model and a read-only memory-mapped
+              index, freezes the GC and forks; workers share the pages
+
+Every worker runs searches so the pages it needs are resident, then the
+master reads /proc/<pid>/smaps_rollup. PSS splits shared pages between the
+processes mapping them, so summed PSS is what the node actually pays.
+
+    python -m benchmarks.bench_worker_memory
+    python -m benchmarks.bench_worker_memory --workers 8 --vectors 500000
+"""
+
+import argparse
+import gc
+import json
+import os
+import signal
+import tempfile
+import numpy as np
+from app.core.config import settings
+from app.rag.pipeline import EmbeddingModel, VectorDatabase
+
+
+def smaps_rollup(pid: int) -> dict:
+    """Rss, Pss and private (USS) memory of a process in MB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(values["Rss"], 1),
+        "pss_mb": round(values["Pss"], 1),
+        "uss_mb": round(values["Private_Clean"] + values["Private_Dirty"], 1),
+    }
+
+
+def build_index(path: str, n_vectors: int, dim: int) -> None:
+    rng = np.random.default_rng(0)
+    vector_db = VectorDatabase(embedding_dim=dim, index_path=path)
+    for start in range(0, n_vectors, 100000):
+        count = min(100000, n_vectors - start)
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        vector_db.index.add(vectors)
+        vector_db.doc_id_map.update((start + i, f"doc{start + i}_chunk_0") for i in range(count))
+    vector_db.save()
+
+
+def load_model():
+    try:
+        return EmbeddingModel(settings.EMBEDDING_MODEL)
+    except Exception:
+        return None  # sentence-transformers not installed: index only
+
+
+def serve(load, n_searches: int, ready_fd: int) -> None:
+    """Worker body: load (or reuse) components, search, report ready, wait"""
+    vector_db, model = load()
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(n_searches):
+        vector_db.search(rng.standard_normal(vector_db.embedding_dim, dtype=np.float32), top_k=10)
+    if model is not None:
+        model.encode(["warm up the model in this worker"])
+    os.write(ready_fd, b"x")
+    signal.pause()
+
+
+def run_mode(mode: str, path: str, dim: int, n_workers: int, n_searches: int) -> dict:
+    if mode == "preload":
+        shared = (VectorDatabase(embedding_dim=dim, index_path=path, read_only=True, mmap=True), load_model())
+        gc.freeze()
+        load = lambda: shared  # noqa: E731
+    else:
+        load = lambda: (VectorDatabase(embedding_dim=dim, index_path=path), load_model())  # noqa: E731
+
+    read_fd, write_fd = os.pipe()
+    pids = []
+    for _ in range(n_workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                serve(load, n_searches, write_fd)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    for _ in pids:
+        os.read(read_fd, 1)
+
+    workers = [smaps_rollup(pid) for pid in pids]
+    master = smaps_rollup(os.getpid())
+    for pid in pids:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+    os.close(read_fd)
+    os.close(write_fd)
+    gc.unfreeze()
+
+    return {
+        "master": master,
+        "per_worker_mean": {
+            key: round(sum(w[key] for w in workers) / len(workers), 1) for key in workers[0]
+        },
+        "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in workers), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--searches", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/faiss_index"
+        build_index(path, args.vectors, args.dim)
+        results = {
+            "workers": args.workers,
+            "index_mb": round(args.vectors * args.dim * 4 / 2**20, 1),
+            "embedding_model": load_model() is not None,
+        }
+        for mode in ("per_worker", "preload"):
+            results[mode] = run_mode(mode, path, args.dim, args.workers, args.searches)
+    print(json.dumps(results, indent=2))
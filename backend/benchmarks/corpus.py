@@ -0,0 +1,191 @@
+"""
+Synthetic news corpus shared by the benchmarks
+
+Articles look like processed NewsDataProcessor output: Zipf-distributed
+body text with topic words and entity names mixed in, a little HTML and a
+URL for the cleaner to strip, categories, sources, publish times spread
+over a window, sentiment and main topic. The same seed and size always
+give the same corpus, so numbers are comparable across commits.
+
+    python -m benchmarks.corpus --size small --output corpus.jsonl
+    python -m benchmarks.corpus --articles 50000 --database-url sqlite:///./bench_corpus.sqlite
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.search import ensure_search_schema
+from app.db.models import Base
+
+SIZES = {"small": 1000, "medium": 10000, "large": 100000}
+
+CATEGORIES = ["general", "business", "technology", "sports", "health", "science", "entertainment"]
+SOURCES = [f"Source {i}" for i in range(40)]
+TOPICS = [
+    "markets", "earnings", "inflation", "election", "chips", "cloud", "ai", "football",
+    "vaccine", "climate", "energy", "court", "trade", "housing", "startups", "space",
+]
+ENTITIES = {
+    "PERSON": [f"Person{i}" for i in range(200)],
+    "ORG": [f"Org{i}" for i in range(150)],
+    "GPE": [f"Place{i}" for i in range(60)],
+    "EVENT": [f"Event{i}" for i in range(30)],
+}
+# Queries for search and RAG scenarios: frequent, rare and multi-term
+QUERIES = [
+    "markets", "earnings inflation", "election results", "chips ai", "climate energy",
+    "court ruling", "vaccine", "Org3", "Person12 election", "housing startups",
+]
+
+
+def build_vocabulary(size: int = 20000):
+    """Zipf-distributed vocabulary with topic words spread across the ranks"""
+    words = [f"w{i}" for i in range(size)]
+    for i, word in enumerate(TOPICS):
+        words[10 + i * (size // len(TOPICS) // 8)] = word
+    cumulative, total = [], 0.0
+    for rank in range(size):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    return words, cumulative
+
+
+def generate_articles(
+    n_articles: int,
+    seed: int = 42,
+    words_per_article: int = 600,
+    days: int = 30,
+    now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Deterministic synthetic articles
+
+    Body lengths vary from a quarter to twice words_per_article, and publish
+    times are spread over the last `days` days with more recent news denser.
+    """
+    rng = random.Random(seed)
+    words, cumulative = build_vocabulary()
+    now = now or datetime.utcnow().replace(microsecond=0)
+    articles = []
+    for i in range(n_articles):
+        topic = rng.choice(TOPICS)
+        entities = {
+            label: rng.sample(names, rng.randint(0, 3))
+            for label, names in ENTITIES.items()
+        }
+        mentions = [name for names in entities.values() for name in names] + [topic] * 3
+        n_words = rng.randint(words_per_article // 4, words_per_article * 2)
+        body = rng.choices(words, cum_weights=cumulative, k=n_words)
+        for mention in mentions:
+            body[rng.randrange(n_words)] = mention
+        sentences = [" ".join(body[j:j + 18]).capitalize() + "." for j in range(0, n_words, 18)]
+        if i % 5 == 0:
+            sentences.insert(1, f"<p>Read more at https://news.example.com/{i}</p>")
+        sentiment = round(rng.uniform(-1, 1), 3)
+        articles.append({
+            "id": f"bench-{seed}-{i}",
+            "url": f"https://news.example.com/{seed}/{i}",
+            "title": f"{topic.capitalize()} " + " ".join(rng.choices(words, cum_weights=cumulative, k=7)),
+            "description": sentences[0],
+            "content": " ".join(sentences),
+            "source": rng.choice(SOURCES),
+            "category": rng.choice(CATEGORIES),
+            "published_at": now - timedelta(hours=days * 24 * rng.random() ** 2),
+            "sentiment_score": sentiment,
+            "sentiment_label": "positive" if sentiment >= 0.05 else "negative" if sentiment <= -0.05 else "neutral",
+            "main_topic": topic,
+            "entities": entities,
+        })
+    return articles
+
+
+class HashingEmbeddingModel:
+    """
+    EmbeddingModel stand-in: normalized hashed bag of words
+
+    Deterministic and dependency-free, so retrieval and endpoint benchmarks
+    run without sentence-transformers and measure index and API cost rather
+    than model inference (bench_components times the real model).
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, zlib.crc32(word.encode()) % self.dimension] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def seed_database(database_url: str, articles: List[Dict[str, Any]], batch_size: int = 1000):
+    """
+    Create the schema and save articles through NewsStore, so category
+    counts, topic aggregates and the entity index are populated as in
+    production
+
+    Returns:
+        Session factory bound to the database
+    """
+    from app.ingestion.pipeline import NewsStore
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_schema(engine)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    store = NewsStore(session_factory)
+    for start in range(0, len(articles), batch_size):
+        store.save_articles(articles[start:start + batch_size])
+    return session_factory
+
+
+def build_indexes(articles: List[Dict[str, Any]], session_factory, index_path: str, embedding_model=None):
+    """
+    Index articles through NewsIndexer into a fresh vector and BM25 index
+
+    Sets the app.rag.pipeline globals the routes and retriever read, and
+    keeps the BM25 file next to index_path.
+    """
+    from app.core.config import settings
+    from app.ingestion.pipeline import NewsIndexer
+    from app.rag import pipeline as rag_pipeline
+    from app.rag.lexical import BM25Index
+
+    embedding_model = embedding_model or HashingEmbeddingModel()
+    rag_pipeline.embedding_model = embedding_model
+    rag_pipeline.vector_db = rag_pipeline.VectorDatabase(
+        embedding_dim=embedding_model.dimension, index_path=index_path
+    )
+    rag_pipeline.lexical_index = BM25Index()
+    settings.LEXICAL_INDEX_PATH = os.path.join(os.path.dirname(index_path), "bm25_index.pkl")
+    asyncio.run(NewsIndexer(session_factory).index_articles(articles))
+    return rag_pipeline.vector_db, rag_pipeline.lexical_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--articles", type=int, help="overrides --size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write articles as JSON lines")
+    parser.add_argument("--database-url", help="save articles into this database")
+    args = parser.parse_args()
+
+    corpus = generate_articles(args.articles or SIZES[args.size], seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            for article in corpus:
+                f.write(json.dumps(article, default=str) + "\n")
+    if args.database_url:
+        seed_database(args.database_url, corpus)
+    print(json.dumps({"articles": len(corpus), "words": sum(len(a["content"].split()) for a in corpus)}))
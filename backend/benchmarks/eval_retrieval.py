@@ -0,0 +1,149 @@
+"""
+Offline recall and latency evaluation for vector, lexical and hybrid retrieval
+
+Uses a JSONL corpus ({"id", "text"}) and query set ({"query", "relevant": [ids]})
+when given, otherwise a synthetic corpus where each query names a rare
+entity/ticker alongside common words.
+
+    python -m benchmarks.eval_retrieval --hash-embeddings
+    python -m benchmarks.eval_retrieval --corpus chunks.jsonl --queries queries.jsonl \\
+        --lexical-weight 1.0 --vector-weight 0.5
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+import numpy as np
+from app.rag.hybrid import HybridRetriever
+from app.rag.lexical import BM25Index, tokenize
+from app.rag.pipeline import EmbeddingModel, Retriever, VectorDatabase
+
+class HashingEmbeddingModel:
+    """Dependency-free embeddings from hashed tokens (for offline runs)"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                vectors[i, int.from_bytes(digest[:4], "little") % self.dim] += 1.0
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def synthetic_dataset(n_chunks: int, n_queries: int, vocabulary_size: int = 5000, seed: int = 7):
+    """
+    Zipf-distributed chunks; each query names a unique ticker carried by
+    three chunks, plus two words taken from one of those chunks
+    """
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary_size)]
+    corpus = {
+        f"doc{i}_chunk_0": " ".join(rng.choices(words, weights=weights, k=60))
+        for i in range(n_chunks)
+    }
+    queries = []
+    chunk_ids = list(corpus)
+    for q in range(n_queries):
+        ticker = "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=4)) + str(q)
+        relevant = rng.sample(chunk_ids, 3)
+        for chunk_id in relevant:
+            corpus[chunk_id] = f"{ticker} " + corpus[chunk_id]
+        context = rng.sample(corpus[relevant[0]].split()[1:], 2)
+        queries.append({"query": f"{ticker} {' '.join(context)}", "relevant": relevant})
+    return corpus, queries
+
+
+def load_jsonl(path: str) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(search: Callable[[str, int], List[str]], queries: List[dict], k_values: List[int]) -> dict:
+    """Recall@k and latency for one retrieval function"""
+    recalls = {k: [] for k in k_values}
+    latencies = []
+    max_k = max(k_values)
+
+    for item in queries:
+        start = time.perf_counter()
+        retrieved = search(item["query"], max_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        relevant = set(item["relevant"])
+        for k in k_values:
+            recalls[k].append(len(relevant & set(retrieved[:k])) / len(relevant))
+
+    latencies.sort()
+    result = {f"recall@{k}": round(statistics.mean(values), 4) for k, values in recalls.items()}
+    result.update(
+        p50_ms=round(statistics.median(latencies), 3),
+        p95_ms=round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+    )
+    return result
+
+
+def main(args) -> Dict[str, dict]:
+    if args.corpus and args.queries:
+        corpus = {row["id"]: row["text"] for row in load_jsonl(args.corpus)}
+        queries = load_jsonl(args.queries)
+    else:
+        corpus, queries = synthetic_dataset(args.chunks, args.n_queries)
+
+    embedding_model = HashingEmbeddingModel() if args.hash_embeddings else EmbeddingModel(args.embedding_model)
+    ids, texts = list(corpus), list(corpus.values())
+    embeddings = embedding_model.encode(texts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_db = VectorDatabase(embedding_dim=embeddings.shape[1], index_path=f"{tmp}/faiss_index")
+        vector_db.add(embeddings, ids)
+        lexical_index = BM25Index()
+        lexical_index.add(ids, texts)
+
+        vector = Retriever(embedding_model, vector_db)
+        hybrid = HybridRetriever(
+            embedding_model, vector_db, lexical_index,
+            vector_weight=args.vector_weight,
+            lexical_weight=args.lexical_weight,
+            rrf_k=args.rrf_k,
+            candidates=args.candidates
+        )
+
+        k_values = [int(k) for k in args.k.split(",")]
+        return {
+            "chunks": len(corpus),
+            "queries": len(queries),
+            "vector": evaluate(
+                lambda q, k: [d for d, _ in vector.vector_search(q, k, similarity_threshold=0.0)],
+                queries, k_values
+            ),
+            "lexical": evaluate(lambda q, k: [d for d, _ in lexical_index.search(q, k)], queries, k_values),
+            "hybrid": evaluate(
+                lambda q, k: [d for d, _ in hybrid.retrieve(q, top_k=k, similarity_threshold=0.0)],
+                queries, k_values
+            ),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL with id and text per chunk")
+    parser.add_argument("--queries", help="JSONL with query and relevant chunk ids")
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--n-queries", type=int, default=200)
+    parser.add_argument("--k", default="5,10")
+    parser.add_argument("--embedding-model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--hash-embeddings", action="store_true", help="Skip sentence-transformers")
+    parser.add_argument("--vector-weight", type=float, default=1.0)
+    parser.add_argument("--lexical-weight", type=float, default=1.0)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    parser.add_argument("--candidates", type=int, default=50)
+    print(json.dumps(main(parser.parse_args()), indent=2))
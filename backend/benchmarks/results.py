@@ -0,0 +1,141 @@
+"""
+Benchmark result files and regression checks
+
+bench_components and bench_endpoints write their results with
+write_results: the metrics plus the commit and machine they ran on.
+Comparing two files flags every timing that got slower (keys ending in
+_ms) or throughput that dropped (keys ending in _per_second) by more than
+the threshold, and exits non-zero if any did.
+
+    python -m benchmarks.results compare baseline.json current.json
+    python -m benchmarks.results compare baseline.json current.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+DEFAULT_THRESHOLD = 0.10  # 10% slower or less throughput
+
+
+def summarize(timings_ms: List[float]) -> Dict[str, float]:
+    """Mean and percentiles of per-call timings in milliseconds"""
+    ordered = sorted(timings_ms)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "mean_ms": round(statistics.mean(ordered), 4),
+        "p50_ms": round(percentile(0.50), 4),
+        "p95_ms": round(percentile(0.95), 4),
+        "p99_ms": round(percentile(0.99), 4),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and machine the results were measured on"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: Optional[str], suite: str, config: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Print the results and write them to path (if given)"""
+    report = {"suite": suite, "environment": environment(), "config": config, "metrics": metrics}
+    text = json.dumps(report, indent=2)
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+def flatten(metrics: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by dotted path"""
+    flat = {}
+    for key, value in metrics.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Metrics that regressed by more than threshold (a fraction)
+
+    Timings (_ms) regress when they grow, throughput (_per_second) when it
+    shrinks; other numbers are informational. Metrics present in only one
+    file are skipped.
+    """
+    before, after = flatten(baseline["metrics"]), flatten(current["metrics"])
+    regressions = []
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        if old <= 0:
+            continue
+        if path.endswith("_ms"):
+            change = (new - old) / old
+        elif path.endswith("_per_second"):
+            change = (old - new) / old
+        else:
+            continue
+        if change > threshold:
+            regressions.append({"metric": path, "baseline": old, "current": new, "change": round(change, 4)})
+    return regressions
+
+
+def check(baseline_path: str, current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> bool:
+    """Report regressions against a baseline file; True if there are none"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, current, threshold)
+    for r in regressions:
+        print(
+            f"REGRESSION {r['metric']}: {r['baseline']:g} -> {r['current']:g} ({r['change']:.1%} worse)",
+            file=sys.stderr
+        )
+    if not regressions:
+        print(f"No regressions over {threshold:.0%} against {baseline_path}", file=sys.stderr)
+    return not regressions
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to check against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed regression (fraction)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compare_parser = subparsers.add_parser("compare", help="check current results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    with open(args.current) as f:
+        results = json.load(f)
+    sys.exit(0 if check(args.baseline, results, args.threshold) else 1)
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for preload-and-fork serving
+
+Components load once in the master (see app.main.preload_components) and
+workers share them copy-on-write. Workers keep a read-only, memory-mapped
+vector index and pick up new generations written by the ingestion process.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+
+import os
+
+# Must be set before app settings are imported by preload_app
+os.environ.setdefault("VECTOR_DB_READ_ONLY", "true")
+# Tokenizer thread pools do not survive fork
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+from app.core.config import settings  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before any worker forks"""
+    from app.main import preload_components
+    
+    preload_components()
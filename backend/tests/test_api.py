@@ -3,12 +3,14 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.db.models import Base, Article
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 @pytest.fixture
@@ -16,6 +18,7 @@ def test_db():
     """Create test database"""
     SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
     engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+    Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
@@ -26,7 +29,17 @@ def test_db():
         finally:
             db.close()
     
+    # Routes use aiosqlite on the same file; NullPool because TestClient
+    # may run each request on a fresh event loop
+    async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestingSessionLocal()
 
 
@@ -86,6 +99,84 @@ def test_search_articles(client, test_db):
     assert "articles" in data
 
 
+def test_search_full_text_ranking(client, test_db):
+    """Test search ranks title matches first and pages with a cursor"""
+    published_at = datetime.utcnow()
+    for i, (title, content) in enumerate([
+        ("Markets rally", "Chipmakers led gains while NVDA earnings loomed"),
+        ("NVDA earnings beat estimates", "Nvidia reported record data center revenue"),
+        ("Weather update", "Sunny skies across the region"),
+        ("Scraped page", "<script>alert(1)</script> NVDA earnings & more"),
+    ]):
+        test_db.add(Article(
+            id=f"search-{i}",
+            url=f"http://test.com/search/{i}",
+            title=title,
+            content=content,
+            source="Test Source",
+            published_at=published_at
+        ))
+    test_db.commit()
+    
+    response = client.get('/api/news/search?q=NVDA "earnings&page_size=1')
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_count"] == 3
+    assert data["articles"][0]["id"] == "search-1"
+    assert "<mark>" in data["articles"][0]["snippet"]
+    
+    response = client.get(f"/api/news/search?q=NVDA earnings&page_size=2&cursor={data['next_cursor']}")
+    data = response.json()
+    assert sorted(a["id"] for a in data["articles"]) == ["search-0", "search-3"]
+    assert data["next_cursor"] is None
+    
+    # Article text is escaped; only the match markers are markup
+    snippet = next(a["snippet"] for a in data["articles"] if a["id"] == "search-3")
+    assert "<script>" not in snippet and "&lt;script&gt;" in snippet and "&amp;" in snippet
+    assert "<mark>NVDA</mark>" in snippet
+
+
+def test_headlines_cursor_pagination(client, test_db):
+    """Test keyset pagination walks a category without overlap"""
+    category = f"cat-{uuid.uuid4().hex[:8]}"
+    published_at = datetime.utcnow()
+    for i in range(5):
+        test_db.add(Article(
+            id=f"{category}-{i}",
+            url=f"http://test.com/{category}/{i}",
+            title=f"Article {i}",
+            source="Test Source",
+            category=category,
+            published_at=published_at if i < 2 else published_at - timedelta(hours=i)
+        ))
+    test_db.commit()
+    
+    seen = []
+    response = client.get(f"/api/news/category/{category}?page_size=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_count"] == 5
+    seen.extend(a["id"] for a in data["articles"])
+    
+    while data["next_cursor"]:
+        response = client.get(f"/api/news/category/{category}?page_size=2&cursor={data['next_cursor']}")
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(a["id"] for a in data["articles"])
+    
+    assert seen == [f"{category}-{i}" for i in (1, 0, 2, 3, 4)]
+    
+    # Page mode still works and agrees with cursor order
+    response = client.get(f"/api/news/category/{category}?page=2&page_size=2")
+    assert [a["id"] for a in response.json()["articles"]] == seen[2:4]
+
+
+def test_headlines_invalid_cursor(client, test_db):
+    """Test malformed cursors are rejected"""
+    response = client.get("/api/news/headlines?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
 def test_rag_query_no_results(client):
     """Test RAG query with no results"""
     response = client.post("/api/ai/query", json={"query": "nonexistent topic xyz 123"})
@@ -100,6 +191,615 @@ def test_summarize_article_not_found(client):
     assert response.status_code == 404
 
 
+class FakeRAGEngine:
+    """RAG engine stub that records summarization calls"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def summarize_article(self, article_text, max_length=300):
+        self.calls.append(article_text)
+        return f"Summary of: {article_text[:20]}"
+
+
+def test_summarize_batch(client, test_db, monkeypatch):
+    """Test batch summarization only calls the LLM for stale summaries"""
+    from app.rag import summaries
+    from app.rag.summaries import SummaryPrecomputer, compute_content_hash
+    
+    engine = FakeRAGEngine()
+    monkeypatch.setattr(summaries, "summary_precomputer", SummaryPrecomputer(engine))
+    
+    fresh = Article(
+        id=str(uuid.uuid4()),
+        url=f"http://test.com/{uuid.uuid4()}",
+        title="Fresh Summary",
+        content="Already summarized content",
+        summary="Existing summary",
+        content_hash=compute_content_hash("Already summarized content"),
+        summary_content_hash=compute_content_hash("Already summarized content"),
+        source="Test Source"
+    )
+    stale = Article(
+        id=str(uuid.uuid4()),
+        url=f"http://test.com/{uuid.uuid4()}",
+        title="Stale Summary",
+        content="Content that changed since the summary",
+        summary="Outdated summary",
+        content_hash=compute_content_hash("Content that changed since the summary"),
+        summary_content_hash="outdated",
+        source="Test Source"
+    )
+    test_db.add_all([fresh, stale])
+    test_db.commit()
+    
+    response = client.post("/api/ai/summarize/batch", json={
+        "article_ids": [fresh.id, stale.id, "nonexistent"]
+    })
+    assert response.status_code == 200
+    data = response.json()
+    
+    results = {s["article_id"]: s for s in data["summaries"]}
+    assert results[fresh.id] == {"article_id": fresh.id, "summary": "Existing summary", "cached": True}
+    assert results[stale.id]["cached"] is False
+    assert results[stale.id]["summary"].startswith("Summary of:")
+    assert data["missing"] == ["nonexistent"]
+    assert engine.calls == ["Content that changed since the summary"]
+
+
+def test_ingest_precomputes_summaries_in_background(monkeypatch):
+    """Test ingestion returns before summary precompute, which coalesces queued categories"""
+    import asyncio
+    from app.core.config import settings
+    from app.ingestion.pipeline import IngestionPipeline
+    from app.rag import summaries
+    
+    class GatedPrecomputer:
+        def __init__(self):
+            self.release = asyncio.Event()
+            self.calls = []
+        
+        async def precompute(self, categories):
+            self.calls.append(set(categories))
+            await self.release.wait()
+            return len(categories)
+    
+    class Stub:
+        async def load_from_newsapi(self, *args, **kwargs):
+            return [{"url": "http://a.com/1", "category": "business"}]
+        
+        async def process_batch(self, articles):
+            return articles
+        
+        def save_articles(self, articles):
+            return len(articles)
+        
+        async def index_articles(self, articles):
+            pass
+    
+    monkeypatch.setattr(settings, "NEWSAPI_KEY", "key")
+    monkeypatch.setattr(settings, "SUMMARY_PRECOMPUTE_ENABLED", True)
+    
+    async def run():
+        precomputer = GatedPrecomputer()
+        monkeypatch.setattr(summaries, "summary_precomputer", precomputer)
+        pipeline = IngestionPipeline.__new__(IngestionPipeline)
+        pipeline.loader = pipeline.processor = pipeline.store = pipeline.indexer = Stub()
+        pipeline.summary_task, pipeline.summary_categories = None, set()
+        
+        articles = await asyncio.wait_for(pipeline.ingest("newsapi"), timeout=1)
+        await asyncio.sleep(0)
+        task = pipeline.summary_task
+        assert articles and not task.done() and precomputer.calls == [{"business"}]
+        
+        # A run while the precompute is busy queues its categories on the same task
+        assert pipeline.schedule_summaries([{"category": "sports"}, {"category": "tech"}]) is task
+        precomputer.release.set()
+        return precomputer.calls, await asyncio.wait_for(pipeline.wait_for_summaries(), timeout=1)
+    
+    calls, generated = asyncio.run(run())
+    assert calls == [{"business"}, {"sports", "tech"}]
+    assert generated == 3
+
+
+def test_ingestion_entry_point_loads_what_ingest_feeds(monkeypatch):
+    """Test the standalone ingestion process opens the indexes writable and schedules summaries"""
+    import asyncio
+    from app.core.config import settings
+    from app.ingestion import pipeline as ingestion
+    from app.nlp import stories, trends
+    from app.rag import llm as rag_llm
+    from app.rag import pipeline as rag_pipeline
+    from app.rag import summaries
+
+    loaded = {}
+    monkeypatch.setattr(settings, "SUMMARY_PRECOMPUTE_ENABLED", True)
+    monkeypatch.setattr(settings, "VECTOR_DB_READ_ONLY", True)  # as in the API workers' environment
+    monkeypatch.setattr(ingestion, "init_db", lambda: loaded.setdefault("database", True))
+    monkeypatch.setattr(rag_pipeline, "embedding_model", BagOfWordsEmbeddingModel())
+    monkeypatch.setattr(rag_pipeline, "init_rag_components", lambda read_only: loaded.setdefault("read_only", read_only))
+    monkeypatch.setattr(rag_llm, "init_rag_engine", lambda: monkeypatch.setattr(rag_llm, "rag_engine", object()))
+    monkeypatch.setattr(stories, "init_story_clusterer", lambda model, dim: loaded.setdefault("stories", dim))
+    monkeypatch.setattr(trends, "init_burst_detector", lambda db: loaded.setdefault("bursts", True))
+    monkeypatch.setattr(BagOfWordsEmbeddingModel, "dimension", 64, raising=False)
+    monkeypatch.setattr(summaries, "summary_precomputer", None)
+
+    ingestion.init_ingestion_components()
+    assert loaded == {"database": True, "read_only": False, "stories": 64, "bursts": True}
+    assert summaries.summary_precomputer.engine is rag_llm.rag_engine
+
+    async def schedule():
+        pipeline = ingestion.IngestionPipeline.__new__(ingestion.IngestionPipeline)
+        pipeline.summary_task, pipeline.summary_categories = None, set()
+        monkeypatch.setattr(pipeline, "precompute_summaries", lambda categories: asyncio.sleep(0, result=1))
+        assert pipeline.schedule_summaries([{"category": "business"}]) is not None
+        return await pipeline.wait_for_summaries()
+
+    assert asyncio.run(schedule()) == 1
+
+
+def test_trending_topics_from_aggregates(client, test_db, monkeypatch):
+    """Test trending topics are served from ingest-time hourly aggregates"""
+    from app.ingestion.pipeline import NewsStore
+    from app.nlp import trends
+    
+    store = NewsStore(session_factory=sessionmaker(autoflush=False, bind=test_db.get_bind()))
+    now = datetime.utcnow()
+    store.save_articles([
+        {"url": "http://trend.com/1", "title": "Rates", "main_topic": "Economy",
+         "sentiment_score": 0.5, "published_at": now.isoformat()},
+        {"url": "http://trend.com/2", "title": "Jobs", "main_topic": "Economy",
+         "sentiment_score": -0.1, "published_at": (now - timedelta(hours=3)).isoformat()},
+        {"url": "http://trend.com/3", "title": "Match", "main_topic": "Sports",
+         "sentiment_score": 0.2, "published_at": now.isoformat()},
+        {"url": "http://trend.com/4", "title": "Old", "main_topic": "Sports",
+         "sentiment_score": 0.2, "published_at": (now - timedelta(hours=48)).isoformat()},
+    ])
+    # Re-ingesting with a new topic moves the article between aggregates
+    store.save_articles([
+        {"url": "http://trend.com/3", "title": "Match", "main_topic": "Economy",
+         "sentiment_score": 0.2, "published_at": now.isoformat()},
+    ])
+    monkeypatch.setattr(trends, "trend_rollup", trends.TrendRollup(refresh_seconds=0))
+    
+    response = client.get("/api/trending/topics?hours=24")
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["topic"] for t in data] == ["Economy"]
+    assert data[0]["frequency"] == 3
+    assert data[0]["sentiment_avg"] == pytest.approx(0.2)
+    
+    response = client.get("/api/trending/topics?hours=168")
+    assert {t["topic"]: t["frequency"] for t in response.json()} == {"Economy": 3, "Sports": 1}
+
+
+def test_entity_endpoints(client, test_db):
+    """Test entity index is maintained at ingest and served by entity endpoints"""
+    from app.ingestion.pipeline import NewsStore
+    from app.db.entities import cooccurrence_cache
+    
+    store = NewsStore(session_factory=sessionmaker(autoflush=False, bind=test_db.get_bind()))
+    now = datetime.utcnow()
+    store.save_articles([
+        {"url": f"http://entity.com/{i}", "title": f"OpenAI story {i}",
+         "published_at": (now - timedelta(hours=i)).isoformat(),
+         "entities": {"ORG": ["OpenAI", "Microsoft"] if i % 2 else ["OpenAI"], "DATE": ["Monday"]}}
+        for i in range(5)
+    ])
+    # Re-ingest drops a mention
+    store.save_articles([
+        {"url": "http://entity.com/1", "title": "OpenAI story 1",
+         "published_at": (now - timedelta(hours=1)).isoformat(), "entities": {"ORG": ["OpenAI"]}}
+    ])
+    cooccurrence_cache.invalidate()
+    
+    response = client.get("/api/entities/openai/articles?page_size=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_count"] == 5
+    assert data["entities"][0]["name"] == "OpenAI"
+    assert [a["title"] for a in data["articles"]] == ["OpenAI story 0", "OpenAI story 1"]
+    
+    response = client.get(f"/api/entities/openai/articles?page_size=2&cursor={data['next_cursor']}")
+    assert [a["title"] for a in response.json()["articles"]] == ["OpenAI story 2", "OpenAI story 3"]
+    
+    response = client.get("/api/entities/top?type=ORG")
+    assert [(e["name"], e["article_count"]) for e in response.json()] == [("OpenAI", 5), ("Microsoft", 1)]
+    
+    response = client.get("/api/entities/OpenAI/related")
+    assert response.json() == [{"name": "Microsoft", "entity_type": "ORG", "shared_articles": 1}]
+    
+    assert client.get("/api/entities/Monday/articles").status_code == 404
+
+
+def test_list_endpoints_match_response_models(client, test_db):
+    """Test the fast serialization path emits the JSON the response models would"""
+    from app.ingestion.pipeline import NewsStore
+    from app.schemas.schemas import ArticleResponse
+
+    category = f"cat-{uuid.uuid4().hex[:8]}"
+    store = NewsStore(session_factory=sessionmaker(autoflush=False, bind=test_db.get_bind()))
+    now = datetime.utcnow().replace(microsecond=123456)
+    store.save_articles([
+        {"url": f"http://fast.com/{i}", "title": f"Fastjson story {i}", "source": "S", "category": category,
+         "content": "Body" if i else None, "published_at": now - timedelta(minutes=i),
+         "sentiment_score": 0.25 if i else None, "sentiment_label": "positive" if i else None,
+         "entities": {"ORG": ["Fastjson"]}}
+        for i in range(3)
+    ])
+    expected = [
+        ArticleResponse.model_validate(a).model_dump(mode="json")
+        for a in test_db.query(Article).filter(Article.category == category).order_by(Article.published_at.desc())
+    ]
+
+    for path in (
+        f"/api/news/headlines?category={category}",
+        f"/api/news/category/{category}",
+        "/api/entities/fastjson/articles",
+    ):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.json()["articles"] == expected
+        assert response.text.index('"articles"') < response.text.index('"total_count"')
+
+    response = client.get("/api/news/search?q=fastjson")
+    articles = sorted(response.json()["articles"], key=lambda a: a["published_at"], reverse=True)
+    assert [{k: v for k, v in a.items() if k not in ("score", "snippet")} for a in articles] == expected
+    assert list(articles[0]) == list(expected[0]) + ["score", "snippet"]
+
+
+def test_retention_deletes_expired_articles_and_compacts_indexes(test_db, tmp_path, monkeypatch):
+    """Test per-category retention deletes rows in batches and removes their chunks from the indexes"""
+    import numpy as np
+    from app.db.models import CategoryStat, Chunk, Entity
+    from app.ingestion.pipeline import NewsIndexer, NewsStore
+    from app.ingestion.retention import RetentionManager
+    from app.rag import pipeline as rag_pipeline
+    from app.rag.lexical import BM25Index
+    
+    session_factory = sessionmaker(autoflush=False, bind=test_db.get_bind())
+    now = datetime.utcnow()
+    articles = [
+        {"url": "http://old.com/tech", "title": "Chips", "category": "technology", "days": 200},
+        {"url": "http://old.com/sports", "title": "Final", "category": "sports", "days": 100},
+        {"url": "http://old.com/none", "title": "Misc", "category": None, "days": 120},
+        {"url": "http://new.com/sports", "title": "Derby", "category": "sports", "days": 1},
+    ]
+    articles = [
+        {**a, "published_at": (now - timedelta(days=a["days"])).isoformat(), "entities": {"ORG": ["FIFA"]}}
+        for a in articles
+    ]
+    NewsStore(session_factory=session_factory).save_articles(articles)
+    
+    vector_db = rag_pipeline.VectorDatabase(embedding_dim=8, index_path=str(tmp_path / "faiss_index"))
+    lexical_index = BM25Index()
+    monkeypatch.setattr(rag_pipeline, "vector_db", vector_db)
+    monkeypatch.setattr(rag_pipeline, "lexical_index", lexical_index)
+    monkeypatch.setattr("app.core.config.settings.LEXICAL_INDEX_PATH", str(tmp_path / "bm25.pkl"))
+    article_ids = [a["id"] for a in articles]
+    chunk_ids = [f"{article_id}_chunk_0" for article_id in article_ids]
+    positions = vector_db.add(np.eye(4, 8, dtype=np.float32), chunk_ids)
+    lexical_index.add(chunk_ids, [a["title"] for a in articles])
+    NewsIndexer(session_factory=session_factory).save_chunks(
+        chunk_ids, article_ids, [a["title"] for a in articles], positions
+    )
+    
+    manager = RetentionManager(
+        session_factory=session_factory, max_age_days=90, category_max_age_days={"technology": 365}, batch_size=1
+    )
+    assert manager.count_expired(now) == 2
+    report = manager.run(now)
+    assert (report["articles"], report["chunks"], report["vectors"], report["lexical_chunks"]) == (2, 2, 2, 2)
+    assert report["reclaimed_memory_bytes"] > 0
+    
+    db = session_factory()
+    assert {a.url for a in db.query(Article)} == {"http://old.com/tech", "http://new.com/sports"}
+    assert db.query(Chunk).count() == 2
+    assert db.query(Entity).filter(Entity.name == "FIFA").one().article_count == 2
+    assert {c.category: c.article_count for c in db.query(CategoryStat)}["sports"] == 1
+    db.close()
+    
+    assert len(rag_pipeline.vector_db) == 2
+    assert rag_pipeline.vector_db.search(np.eye(8, dtype=np.float32)[1], top_k=4)[0] == [chunk_ids[0], chunk_ids[3]]
+    assert [doc_id for doc_id, _ in lexical_index.search("final misc derby")] == [chunk_ids[3]]
+    assert manager.run(now)["articles"] == 0
+
+
+def test_reingesting_an_article_does_not_duplicate_its_chunks(test_db, tmp_path, monkeypatch):
+    """Test repeats of an unchanged article are skipped and changed ones replace their chunks"""
+    import asyncio
+    from app.db.models import Chunk
+    from app.ingestion.pipeline import NewsIndexer, NewsStore
+    from app.rag import pipeline as rag_pipeline
+    from app.rag.hybrid import HybridRetriever
+    from app.rag.lexical import BM25Index
+
+    session_factory = sessionmaker(autoflush=False, bind=test_db.get_bind())
+    lexical_path = str(tmp_path / "bm25.pkl")
+    vector_db = rag_pipeline.VectorDatabase(embedding_dim=64, index_path=str(tmp_path / "faiss_index"))
+    lexical_index = BM25Index.load(lexical_path)
+    monkeypatch.setattr(rag_pipeline, "embedding_model", BagOfWordsEmbeddingModel())
+    monkeypatch.setattr(rag_pipeline, "vector_db", vector_db)
+    monkeypatch.setattr(rag_pipeline, "lexical_index", lexical_index)
+    monkeypatch.setattr("app.core.config.settings.LEXICAL_INDEX_PATH", lexical_path)
+    store, indexer = NewsStore(session_factory=session_factory), NewsIndexer(session_factory=session_factory)
+    retriever = HybridRetriever(BagOfWordsEmbeddingModel(), vector_db, lexical_index, mmr_lambda=None)
+
+    def ingest(articles):
+        articles = [dict(a) for a in articles]
+        store.save_articles(articles)
+        asyncio.run(indexer.index_articles(articles))
+
+    def fused():
+        return retriever.fetch_candidates("central bank rates", 10, 0.0)
+
+    fetched = [
+        {"url": "http://test.com/rates/a", "title": "Rates", "content": "The central bank held rates."},
+        {"url": "http://test.com/rates/b", "title": "Banks", "content": "A central bank kept rates."},
+    ]
+    ingest(fetched)
+    first = fused()
+    sizes = (len(vector_db), len(lexical_index))
+    assert sizes == (2, 2)
+
+    ingest(fetched[:1])  # the next hourly fetch repeats a headline
+    assert (len(vector_db), len(lexical_index)) == sizes
+    assert fused() == first
+
+    ingest([{**fetched[0], "content": "The central bank cut rates sharply."}])
+    assert (len(vector_db), len(lexical_index)) == sizes
+    assert len({doc_id for doc_id, _ in fused()}) == len(fused()) == 2
+    assert BM25Index.load(lexical_path).doc_ids.count(f"{test_db.query(Article).first().id}_chunk_0") == 1
+    assert test_db.query(Chunk).count() == 2
+
+    # An index that already holds copies still fuses each chunk once
+    lexical_index.add([first[0][0]], ["central bank rates"])
+    assert len({doc_id for doc_id, _ in fused()}) == len(fused())
+
+    # A rebuilt (empty) vector index is refilled by re-ingesting unchanged articles
+    vector_db = rag_pipeline.VectorDatabase(embedding_dim=64, index_path=str(tmp_path / "rebuilt" / "faiss_index"))
+    monkeypatch.setattr(rag_pipeline, "vector_db", vector_db)
+    ingest(fetched[1:])
+    assert len(vector_db) == 1
+
+
+class BagOfWordsEmbeddingModel:
+    """Deterministic embeddings: hashed word counts"""
+    
+    def encode(self, texts, batch_size: int = 32):
+        import numpy as np
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().replace(".", " ").split():
+                vectors[i, sum(map(ord, word)) % 64] += 1.0
+        return vectors
+
+
+def test_emerging_topics_rebuild_from_database(client, test_db, monkeypatch):
+    """Test API workers pick up bursts ingested elsewhere, and bad entities do not fail a save"""
+    from app.ingestion.pipeline import NewsStore
+    from app.nlp import trends
+    
+    stale = trends.BurstDetector(width=1024, depth=4, capacity=16)
+    stale.built_at -= 3600
+    monkeypatch.setattr(trends, "burst_detector", None)  # the ingestion process has no API detector
+    
+    now = datetime.utcnow()
+    store = NewsStore(session_factory=sessionmaker(autoflush=False, bind=test_db.get_bind()))
+    store.save_articles([
+        {"url": f"http://test.com/burst/{i}", "title": f"Chip story {i}", "main_topic": "chips",
+         "published_at": (now - timedelta(minutes=i)).isoformat(), "entities": {"ORG": ["Nvidia"]}}
+        for i in range(6)
+    ])
+    
+    monkeypatch.setattr(trends, "burst_detector", stale)
+    response = client.get("/api/trending/emerging?min_count=3")
+    assert response.status_code == 200
+    keys = {(e["kind"], e["name"]) for e in response.json()}
+    assert {("topic", "chips"), ("ORG", "Nvidia")} <= keys
+    assert trends.burst_detector is not stale
+    
+    # Burst detection runs after the commit; a payload it cannot read skips it
+    class Failing:
+        def observe_article(self, article):
+            raise ValueError("bad entities")
+    
+    monkeypatch.setattr(trends, "burst_detector", Failing())
+    assert store.save_articles([{"url": "http://test.com/burst/late", "title": "Late chip story"}]) == 1
+    assert test_db.query(Article).filter(Article.url == "http://test.com/burst/late").count() == 1
+
+
+def test_story_clustering(client, test_db, monkeypatch):
+    """Test near-duplicate coverage is grouped into one story at ingest"""
+    from app.ingestion.pipeline import IngestionPipeline, NewsStore
+    from app.nlp import stories
+    
+    session_factory = sessionmaker(autoflush=False, bind=test_db.get_bind())
+    clusterer = stories.StoryClusterer(
+        BagOfWordsEmbeddingModel(), session_factory=session_factory, embedding_dim=64, threshold=0.7
+    )
+    monkeypatch.setattr(stories, "story_clusterer", clusterer)
+    
+    now = datetime.utcnow()
+    articles = [
+        {"url": "http://a.com/fed", "title": "Fed raises interest rates by a quarter point", "source": "A"},
+        {"url": "http://b.com/fed", "title": "Fed raises interest rates a quarter point", "source": "B"},
+        {"url": "http://c.com/storm", "title": "Storm batters coastal towns overnight", "source": "C"},
+        {"url": "http://d.com/fed", "title": "The Fed raises interest rates by quarter point", "source": "D"},
+    ]
+    for i, article in enumerate(articles):
+        article["published_at"] = (now - timedelta(minutes=10 * (len(articles) - i))).isoformat()
+    NewsStore(session_factory=session_factory).save_articles(articles)
+    
+    pipeline = IngestionPipeline.__new__(IngestionPipeline)
+    memberships = pipeline.cluster_stories(articles)
+    assert len(set(memberships.values())) == 2
+    assert pipeline.cluster_stories(articles) == {}  # re-ingest is a no-op
+    
+    # A restarted clusterer keeps joining the same story
+    clusterer.load()
+    late = [{"url": "http://e.com/fed", "title": "Fed raises interest rates by a quarter point",
+             "source": "E", "published_at": now.isoformat()}]
+    NewsStore(session_factory=session_factory).save_articles(late)
+    assert pipeline.cluster_stories(late) == {late[0]["id"]: memberships[articles[0]["id"]]}
+    
+    response = client.get("/api/stories?min_articles=2")
+    assert response.status_code == 200
+    data = response.json()["stories"]
+    assert len(data) == 1
+    assert data[0]["article_count"] == 4
+    assert data[0]["sources"] == ["A", "B", "D", "E"]
+    assert data[0]["articles"][0]["source"] == "E"
+    
+    response = client.get("/api/stories?limit=1")
+    page = response.json()
+    assert len(page["stories"]) == 1 and page["next_cursor"]
+    response = client.get(f"/api/stories?limit=1&cursor={page['next_cursor']}")
+    assert response.json()["stories"][0]["title"].startswith("Storm")
+
+
+def test_reindex_resumes_catches_up_and_swaps(test_db, tmp_path, monkeypatch):
+    """Test an interrupted reindex resumes from its checkpoint and swaps in a new generation"""
+    import numpy as np
+    from app.core.exceptions import VectorDBException
+    from app.db.models import Chunk
+    from app.ingestion import reindex
+    from app.ingestion.pipeline import NewsStore
+    from app.rag.lexical import BM25Index
+    from app.rag.pipeline import VectorDatabase
+
+    session_factory = sessionmaker(autoflush=False, bind=test_db.get_bind())
+    words = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu".split()
+    NewsStore(session_factory=session_factory).save_articles([
+        {"id": f"a{i}", "url": f"http://test.com/{i}", "title": f"Title {i}", "source": "S",
+         "content": " ".join(f"{word}{i}" for word in words)}
+        for i in range(5)
+    ])
+    index_path = str(tmp_path / "faiss_index")
+    live = VectorDatabase(embedding_dim=8, index_path=index_path)
+    live.add(np.ones((1, 8), dtype=np.float32), ["old_chunk_0"])
+
+    def make_reindexer():
+        return reindex.Reindexer(
+            session_factory=session_factory, index_path=index_path, lexical_path=str(tmp_path / "bm25.pkl"),
+            workers=0, batch_size=2, checkpoint_seconds=0, model_name="bow",
+            model_factory=lambda name: BagOfWordsEmbeddingModel(), chunk_size=5, overlap=0
+        )
+
+    embed_articles = reindex.embed_articles
+    calls = []
+
+    def interrupted(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return embed_articles(rows)
+
+    monkeypatch.setattr(reindex, "embed_articles", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        make_reindexer().run()
+    monkeypatch.setattr(reindex, "embed_articles", embed_articles)
+
+    # Changed and deleted during the build: caught up before the swap
+    db = session_factory()
+    db.query(Article).filter(Article.id == "a0").update({"content": "omega changed text", "updated_at": datetime.utcnow()})
+    db.query(Article).filter(Article.id == "a1").delete()
+    db.commit()
+    db.close()
+
+    report = make_reindexer().run()
+    assert report["articles"] == 5 and report["generation"] == 2
+    assert not (tmp_path / ".reindex").exists()
+
+    replica = VectorDatabase(embedding_dim=64, index_path=index_path, read_only=True)
+    doc_ids = sorted(replica.doc_id_map.values())
+    assert doc_ids == ["a0_chunk_0"] + [f"a{i}_chunk_{j}" for i in (2, 3, 4) for j in range(3)]
+    lexical_index = BM25Index.load(str(tmp_path / "bm25.pkl"))
+    assert sorted(lexical_index.doc_ids) == doc_ids
+    assert lexical_index.search("omega")[0][0] == "a0_chunk_0"
+
+    db = session_factory()
+    chunks = {c.id: c for c in db.query(Chunk)}
+    db.close()
+    assert sorted(chunks) == doc_ids
+    assert chunks["a2_chunk_1"].text == "zeta2 eta2 theta2 iota2 kappa2"
+    assert int(chunks["a2_chunk_1"].embedding_id) == replica.positions["a2_chunk_1"]
+
+    # The old writer must not overwrite the swapped-in generation
+    with pytest.raises(VectorDBException):
+        live.save()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_export_import_round_trip(test_db, tmp_path, fmt):
+    """Test a corpus exported to Parquet/Arrow imports into another deployment"""
+    import numpy as np
+    from app.db.models import ArticleEntity, Chunk
+    from app.ingestion import columnar
+    from app.ingestion.pipeline import NewsIndexer, NewsStore
+    from app.rag.lexical import BM25Index
+    from app.rag.pipeline import VectorDatabase
+
+    source_sessions = sessionmaker(autoflush=False, bind=test_db.get_bind())
+    now = datetime.utcnow()
+    NewsStore(session_factory=source_sessions).save_articles([
+        {"id": f"a{i}", "url": f"http://test.com/{i}", "title": f"Title {i}", "source": "S", "category": "tech",
+         "content": f"word{i} " * 10, "summary": f"Summary {i}", "published_at": now - timedelta(days=i),
+         "entities": {"PERSON": [f"Person {i}"]}, "sentiment_score": 0.5}
+        for i in range(4)
+    ])
+    chunk_ids = [f"a{i}_chunk_{j}" for i in range(4) for j in range(2)]
+    texts = [f"word{i} text{j}" for i in range(4) for j in range(2)]
+    source_db = VectorDatabase(embedding_dim=64, index_path=str(tmp_path / "source" / "faiss_index"))
+    vectors = BagOfWordsEmbeddingModel().encode(texts)
+    positions = source_db.add(vectors, chunk_ids, sources=["S"] * len(chunk_ids))
+    NewsIndexer(source_sessions).save_chunks(chunk_ids, [c.split("_")[0] for c in chunk_ids], texts, positions)
+
+    export_dir = str(tmp_path / "export")
+    counts = columnar.export_corpus(
+        export_dir, fmt=fmt, since=now - timedelta(days=2, hours=12),
+        session_factory=source_sessions, vector_db=source_db, batch_size=3
+    )
+    assert counts == {"articles": 3, "chunks": 6, "embeddings": 6}
+
+    # The target already stores article 0's URL under another ID
+    target_engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(bind=target_engine)
+    target_sessions = sessionmaker(autoflush=False, bind=target_engine)
+    NewsStore(session_factory=target_sessions).save_articles([
+        {"id": "existing", "url": "http://test.com/0", "title": "Old", "source": "S", "content": "old"}
+    ])
+    target_db = VectorDatabase(embedding_dim=64, index_path=str(tmp_path / "target" / "faiss_index"))
+    lexical_index = BM25Index()
+    counts = columnar.import_corpus(
+        export_dir, session_factory=target_sessions, vector_db=target_db, lexical_index=lexical_index,
+        lexical_path=str(tmp_path / "bm25.pkl"), batch_size=3
+    )
+    assert counts == {"articles": 3, "embeddings": 6, "chunks": 6}
+
+    db = target_sessions()
+    articles = {a.id: a for a in db.query(Article)}
+    chunks = {c.id: c for c in db.query(Chunk)}
+    n_entity_links = db.query(ArticleEntity).count()
+    db.close()
+    assert sorted(articles) == ["a1", "a2", "existing"]
+    assert articles["existing"].title == "Title 0" and articles["a2"].summary == "Summary 2"
+    assert articles["a1"].published_at == now - timedelta(days=1)
+    assert n_entity_links == 3
+
+    expected_ids = [f"{a}_chunk_{j}" for a in ("a1", "a2", "existing") for j in range(2)]
+    assert sorted(chunks) == expected_ids
+    assert chunks["existing_chunk_1"].text == "word0 text1"
+    for chunk_id, chunk in chunks.items():
+        assert int(chunk.embedding_id) == target_db.positions[chunk_id]
+    np.testing.assert_array_equal(target_db.get_vectors(["existing_chunk_1", "a2_chunk_0"]), vectors[[1, 4]])
+    assert BM25Index.load(str(tmp_path / "bm25.pkl")).search("word2")[0][0].startswith("a2_chunk_")
+
+    # Re-importing replaces rather than duplicates
+    columnar.import_corpus(export_dir, tables=["embeddings"], session_factory=target_sessions, vector_db=target_db)
+    assert len(target_db) == 6
+
+
 def test_get_sentiment_not_found(client):
     """Test sentiment analysis with non-existent article"""
     response = client.get("/api/ai/sentiment/nonexistent")
@@ -117,6 +817,335 @@ async def test_ingestion_pipeline():
     assert isinstance(articles, list)
 
 
+def test_rate_limiter_is_atomic_under_concurrency():
+    """Test concurrent requests never exceed the limit"""
+    import asyncio
+    import fakeredis
+    from app.core.ratelimit import RateLimit, RateLimiter
+    
+    async def run():
+        limiter = RateLimiter(
+            fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()),
+            default_limit=RateLimit(5, 60), route_limits={}, local_share=0
+        )
+        results = await asyncio.gather(*[limiter.check("client", "/api/news/headlines") for _ in range(20)])
+        return sum(r.allowed for r in results), results
+    
+    allowed, results = asyncio.run(run())
+    assert allowed == 5
+    assert all(r.retry_after > 0 for r in results if not r.allowed)
+
+
+def test_rate_limiter_local_leases_and_degraded_mode():
+    """Test local admission is charged to Redis and memory limits apply without Redis"""
+    import asyncio
+    import fakeredis
+    from app.core.ratelimit import RateLimit, RateLimiter
+    
+    async def run():
+        redis_client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+        limiter = RateLimiter(
+            redis_client, default_limit=RateLimit(10, 60), route_limits={"/api/ai/query": "2/60"},
+            workers=1, local_share=1.0
+        )
+        default = [(await limiter.check("client", "/api/news/headlines")).allowed for _ in range(30)]
+        route = [(await limiter.check("client", "/api/ai/query")).allowed for _ in range(5)]
+        
+        server = fakeredis.FakeServer()
+        server.connected = False
+        degraded = RateLimiter(
+            fakeredis.aioredis.FakeRedis(server=server), default_limit=RateLimit(4, 60), route_limits={},
+            workers=2
+        )
+        offline = [(await degraded.check("client", "/api/news/headlines")).allowed for _ in range(5)]
+        return default, route, offline
+    
+    default, route, offline = asyncio.run(run())
+    assert sum(default) == 10
+    assert route == [True, True, False, False, False]
+    assert offline == [True, True, False, False, False]
+
+
+def test_rate_limit_middleware_returns_429():
+    """Test the middleware enforces limits instead of swallowing its 429"""
+    import fakeredis
+    from fastapi import FastAPI
+    from app.core.middleware import RateLimitMiddleware
+    from app.core.ratelimit import RateLimit, RateLimiter
+    
+    limited_app = FastAPI()
+    
+    @limited_app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+    
+    limiter = RateLimiter(
+        fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()),
+        default_limit=RateLimit(2, 60), route_limits={}, local_share=0
+    )
+    limited_app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    
+    # One event loop for all requests, as the fake client is bound to it
+    with TestClient(limited_app) as limited_client:
+        responses = [limited_client.get("/api/ping") for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[1].headers["X-RateLimit-Remaining"] == "0"
+    assert int(responses[2].headers["Retry-After"]) >= 1
+
+
+def test_rate_limit_middleware_applies_configured_route_limits():
+    """Test the configured per-route limits name real routes and win over their prefix bucket"""
+    import fakeredis
+    from fastapi import FastAPI
+    from app.core.config import settings
+    from app.core.middleware import RateLimitMiddleware
+    from app.core.ratelimit import RateLimit, RateLimiter
+    
+    app_paths = [route.path for route in app.routes]
+    for prefix in settings.RATE_LIMIT_ROUTES:
+        assert any(path.startswith(prefix) for path in app_paths), prefix
+    
+    limited_app = FastAPI()
+    
+    @limited_app.get("/api/ai/query")
+    async def query():
+        return {"ok": True}
+    
+    @limited_app.get("/api/ai/trends")
+    async def other():
+        return {"ok": True}
+    
+    limiter = RateLimiter(
+        fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer()),
+        default_limit=RateLimit(1000, 60), route_limits=settings.RATE_LIMIT_ROUTES, local_share=0
+    )
+    limited_app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    
+    with TestClient(limited_app) as limited_client:
+        query_limit = limited_client.get("/api/ai/query").headers["X-RateLimit-Limit"]
+        other_limit = limited_client.get("/api/ai/trends").headers["X-RateLimit-Limit"]
+        statuses = [limited_client.get("/api/ai/query").status_code for _ in range(20)]
+    assert (query_limit, other_limit) == ("20", "30")
+    assert statuses == [200] * 19 + [429]
+
+
+def test_response_cache_etags_and_generation_bumps():
+    """Test cached responses are shared across workers, revalidate with 304 and expire on a bump"""
+    import fakeredis
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+    from app.core.middleware import ResponseCacheMiddleware
+    from app.core.response_cache import ResponseCache
+
+    calls = []
+
+    def make_app(server):
+        cached_app = FastAPI()
+
+        @cached_app.get("/api/news/headlines")
+        async def headlines(category: str = "general"):
+            calls.append(category)
+            return {"category": category, "calls": len(calls)}
+
+        @cached_app.get("/api/news/missing")
+        async def missing():
+            calls.append("missing")
+            return JSONResponse(status_code=404, content={"detail": "Not found"})
+
+        cache = ResponseCache(
+            fakeredis.aioredis.FakeRedis(server=server), fakeredis.FakeRedis(server=server),
+            generation_ttl_seconds=0
+        )
+        cached_app.add_middleware(
+            ResponseCacheMiddleware, cache=cache, routes={"/api/news/": 300}, max_age_seconds=30
+        )
+        return cached_app, cache
+
+    server = fakeredis.FakeServer()
+    app_a, cache_a = make_app(server)
+    app_b, _ = make_app(server)
+
+    with TestClient(app_a) as worker_a, TestClient(app_b) as worker_b:
+        first = worker_a.get("/api/news/headlines?category=tech&page=1")
+        assert first.headers["X-Cache"] == "MISS"
+        assert first.headers["Cache-Control"] == "public, max-age=30"
+        etag = first.headers["ETag"]
+
+        # Parameter order does not matter, and other workers hit through Redis
+        again = worker_b.get("/api/news/headlines?page=1&category=tech")
+        assert again.headers["X-Cache"] == "HIT" and again.headers["ETag"] == etag
+        assert again.json() == first.json() == {"category": "tech", "calls": 1}
+
+        not_modified = worker_b.get("/api/news/headlines?category=tech&page=1", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304 and not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+        # Ingestion in worker A invalidates worker B's copies too
+        cache_a.bump_generation()
+        stale = worker_b.get("/api/news/headlines?category=tech&page=1", headers={"If-None-Match": etag})
+        assert stale.status_code == 200 and stale.headers["X-Cache"] == "MISS"
+        assert stale.headers["ETag"] != etag and stale.json()["calls"] == 2
+
+        assert [worker_a.get("/api/news/missing").status_code for _ in range(2)] == [404, 404]
+        assert "ETag" not in worker_a.get("/api/news/missing").headers
+        assert worker_a.post("/api/news/headlines").status_code == 405
+    assert calls.count("missing") == 3
+
+    # Without Redis each worker still caches, under its own generation
+    offline = fakeredis.FakeServer()
+    offline.connected = False
+    app_c, cache_c = make_app(offline)
+    with TestClient(app_c) as worker_c:
+        responses = [worker_c.get("/api/news/headlines?category=offline") for _ in range(2)]
+        assert [r.headers["X-Cache"] for r in responses] == ["MISS", "HIT"]
+        cache_c.bump_generation()
+        assert worker_c.get("/api/news/headlines?category=offline").headers["X-Cache"] == "MISS"
+
+
+def test_histogram_merges_thread_shards():
+    """Test observations from many threads all reach the exposition"""
+    import threading
+    from app.core.metrics import MetricsRegistry
+    
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", labelnames=("stage",), buckets=(0.1, 1.0))
+    
+    def work():
+        for _ in range(1000):
+            histogram.observe(0.05, "embed")
+        histogram.observe(5.0, "embed")
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="embed",le="0.1"} 4000' in text
+    assert 'stage_seconds_bucket{stage="embed",le="+Inf"} 4004' in text
+    assert 'stage_seconds_count{stage="embed"} 4004' in text
+
+
+def test_metrics_endpoint(client):
+    """Test /metrics serves Prometheus text with stage histograms"""
+    from app.core.metrics import rag_stage_seconds
+    
+    rag_stage_seconds.observe(0.02, "vector_search")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE rag_stage_duration_seconds histogram" in response.text
+    assert 'rag_stage_duration_seconds_count{stage="vector_search"}' in response.text
+    assert "# TYPE vector_index_size gauge" in response.text
+
+
+def test_profiling_middleware_opt_in(tmp_path, monkeypatch):
+    """Test opted-in requests get span timings and stored stacks, others nothing"""
+    import time
+    from fastapi import FastAPI
+    from fastapi.concurrency import run_in_threadpool
+    from app.core.config import settings
+    from app.core.metrics import rag_stage_seconds
+    from app.core.middleware import ProfilingMiddleware
+    
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    profiled_app = FastAPI()
+    
+    def embed():
+        with rag_stage_seconds.time("embed"):
+            time.sleep(0.05)
+    
+    @profiled_app.get("/api/ai/query")
+    async def query():
+        await run_in_threadpool(embed)
+        return {"ok": True}
+    
+    profiled_app.add_middleware(ProfilingMiddleware, sample_rate=0.0, profile_dir=str(tmp_path))
+    profiled_client = TestClient(profiled_app)
+    
+    assert "Server-Timing" not in profiled_client.get("/api/ai/query").headers
+    denied = profiled_client.get("/api/ai/query", headers={"X-Profile": "1", "X-Admin-Token": "wrong"})
+    assert "X-Profile-Id" not in denied.headers
+    
+    response = profiled_client.get("/api/ai/query", headers={"X-Profile": "1", "X-Admin-Token": "admin-secret"})
+    assert "embed;dur=" in response.headers["Server-Timing"]
+    stacks = (tmp_path / f"{response.headers['X-Profile-Id']}.folded").read_text()
+    assert "embed (test_api.py" in stacks
+
+
+def test_component_registry_parallel_loading_and_gating():
+    """Test independent components load concurrently and failures reach dependents"""
+    import asyncio
+    import threading
+    from app.core.components import ComponentRegistry, ComponentUnavailable
+    
+    registry = ComponentRegistry(max_workers=4)
+    both_loading = threading.Barrier(2, timeout=2)  # breaks unless a and b overlap
+    release_slow = threading.Event()
+    
+    def broken():
+        raise RuntimeError("model missing")
+    
+    registry.register("a", lambda: (both_loading.wait(), "A")[1])
+    registry.register("b", lambda: (both_loading.wait(), "B")[1])
+    registry.register("ab", lambda: registry.get("a") + registry.get("b"), depends_on=["a", "b"])
+    registry.register("broken", broken)
+    registry.register("downstream", lambda: None, depends_on=["broken"])
+    registry.register("slow", lambda: release_slow.wait(2))
+    registry.start()
+    
+    with pytest.raises(ComponentUnavailable, match="Still loading: slow"):
+        asyncio.run(registry.wait_for(["slow"], timeout=0.05))
+    release_slow.set()
+    registry.wait_all(timeout=5)
+    
+    assert registry.get("ab") == "AB"
+    assert registry.is_ready(["slow"])  # the timed-out waiter did not cancel the load
+    assert registry.status()["downstream"]["state"] == "failed"
+    with pytest.raises(ComponentUnavailable):
+        asyncio.run(registry.wait_for(["ab", "downstream"], timeout=1))
+
+
+def test_db_routes_wait_for_database_component(client, test_db, monkeypatch):
+    """Test DB routes wait while the database component loads and 503 if it failed"""
+    import threading
+    from app.core import components as components_module
+    from app.core.components import ComponentRegistry
+    
+    def broken():
+        raise RuntimeError("migration failed")
+    
+    failed = ComponentRegistry(max_workers=1)
+    failed.register("database", broken)
+    failed.start()
+    failed.wait_all(timeout=5)
+    monkeypatch.setattr(components_module, "components", failed)
+    for path in ["/api/news/headlines", "/api/news/search?q=x", "/api/trending/topics",
+                 "/api/stories", "/api/entities/top", "/api/ai/sentiment/missing"]:
+        response = client.get(path)
+        assert response.status_code == 503, path
+        assert response.headers["Retry-After"]
+    
+    release = threading.Event()
+    loading = ComponentRegistry(max_workers=1)
+    loading.register("database", lambda: release.wait(5))
+    loading.start()
+    monkeypatch.setattr(components_module, "components", loading)
+    threading.Timer(0.2, release.set).start()
+    response = client.get("/api/news/headlines")
+    assert release.is_set() and response.status_code == 200
+    loading.shutdown()
+
+
+def test_health_live_and_ready(client):
+    """Test liveness always answers and readiness reports component states"""
+    assert client.get("/api/health/live").json() == {"status": "alive"}
+    response = client.get("/api/health/ready")
+    assert response.status_code in (200, 503)
+    assert "database" in response.json()["components"]
+
+
 def test_rate_limiting(client):
     """Test rate limiting"""
     # Make multiple requests
@@ -0,0 +1,35 @@
+"""Tests for NLP trend detection"""
+
+from datetime import datetime, timedelta
+from app.nlp.trends import BurstDetector
+
+
+def test_burst_detector_flags_spike_over_evergreen_topic():
+    """Test a sudden spike outranks a topic with a high steady rate"""
+    detector = BurstDetector(width=1024, depth=4, capacity=16)
+    now = datetime.utcnow()
+
+    # Evergreen: 10 articles an hour for two days
+    for hour in range(48):
+        detector.observe(("topic", "Politics"), now - timedelta(hours=hour), weight=10)
+    # Spike: 8 mentions in the last 30 minutes, nothing before
+    for minute in range(0, 30, 4):
+        detector.observe(("ORG", "Acme"), now - timedelta(minutes=minute))
+
+    emerging = detector.emerging(limit=5, min_count=3)
+    assert emerging[0]["name"] == "Acme"
+    assert emerging[0]["current_rate"] > emerging[0]["baseline_rate"]
+    assert all(item["name"] != "Politics" or item["score"] < emerging[0]["score"] for item in emerging)
+
+
+def test_burst_detector_bounds_candidates():
+    """Test heavy-hitter candidates stay bounded with many distinct keys"""
+    detector = BurstDetector(width=4096, depth=4, capacity=50)
+    for i in range(1000):
+        detector.observe(("PERSON", f"person-{i}"))
+    for _ in range(20):
+        detector.observe(("PERSON", "frequent"))
+
+    assert len(detector.candidates) <= 100
+    assert ("PERSON", "frequent") in detector.candidates
+    assert detector.emerging(limit=1)[0]["name"] == "frequent"
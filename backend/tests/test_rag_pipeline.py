@@ -0,0 +1,464 @@
+"""Tests for RAG retrieval components"""
+
+import numpy as np
+import pytest
+from app.rag.hybrid import HybridRetriever, reciprocal_rank_fusion
+from app.rag.lexical import BM25Index
+from app.rag.pipeline import VectorDatabase
+
+
+class FakeEmbeddingModel:
+    """Deterministic bag-of-words embeddings for retrieval tests"""
+
+    def __init__(self, dim: int = 16):
+        self.dim = dim
+
+    def encode(self, texts, batch_size: int = 32):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, sum(map(ord, word)) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-9)
+
+
+def test_bm25_ranks_exact_term_matches():
+    """Test BM25 prefers the rare ticker and supports incremental adds"""
+    index = BM25Index()
+    index.add(["a_chunk_0", "b_chunk_0"], [
+        "markets were broadly higher today as investors cheered",
+        "chipmakers rose ahead of earnings season",
+    ])
+    index.add(["c_chunk_0"], ["NVDA earnings beat estimates as NVDA shares jump"])
+
+    results = index.search("NVDA earnings", top_k=3)
+    assert [doc_id for doc_id, _ in results] == ["c_chunk_0", "b_chunk_0"]
+    assert results[0][1] > results[1][1]
+    assert index.search("unmatched", top_k=3) == []
+
+
+def test_bm25_save_and_load(tmp_path):
+    """Test BM25 index round-trips through disk"""
+    path = str(tmp_path / "bm25.pkl")
+    index = BM25Index()
+    index.add(["a_chunk_0"], ["central bank holds rates"])
+    index.save(path)
+
+    loaded = BM25Index.load(path)
+    assert len(loaded) == 1
+    assert loaded.search("rates") == index.search("rates")
+
+
+def test_bm25_add_and_save_appends_to_log(tmp_path):
+    """Test ingest batches append to the log, which loads replay and full saves fold in"""
+    import os
+    from app.rag.lexical import LOG_SUFFIX
+
+    path = str(tmp_path / "bm25.pkl")
+    index = BM25Index()
+    index.add_and_save(path, [f"d{i}_chunk_0" for i in range(8)], [f"filler text {i}" for i in range(8)])
+    assert not os.path.exists(path + LOG_SUFFIX)  # first save is a snapshot
+    snapshot_size = os.path.getsize(path)
+
+    index.add_and_save(path, ["e_chunk_0"], ["NVDA earnings"], compact_ratio=0.5)
+    index.add_and_save(path, ["f_chunk_0"], ["storm warning"], compact_ratio=0.5)
+    assert os.path.getsize(path) == snapshot_size and os.path.exists(path + LOG_SUFFIX)
+    loaded = BM25Index.load(path)
+    assert loaded.doc_ids == index.doc_ids
+    assert loaded.search("NVDA storm") == index.search("NVDA storm")
+
+    # A truncated last record is dropped; the records before it still load
+    with open(path + LOG_SUFFIX, "ab") as f:
+        f.write(b"\x80\x05partial")
+    assert len(BM25Index.load(path)) == 10
+
+    # Past compact_ratio the log folds into a new snapshot
+    loaded.add_and_save(path, [f"g{i}_chunk_0" for i in range(4)], ["more text"] * 4, compact_ratio=0.5)
+    assert not os.path.exists(path + LOG_SUFFIX)
+    assert len(BM25Index.load(path)) == 14
+
+    # After a removal the numbering changed, so the next save is a full one
+    loaded.remove(["e_chunk_0"])
+    loaded.add_and_save(path, ["h_chunk_0"], ["late"], compact_ratio=0.5)
+    assert not os.path.exists(path + LOG_SUFFIX)
+    assert BM25Index.load(path).doc_ids == loaded.doc_ids
+
+
+def test_reciprocal_rank_fusion_weights():
+    """Test RRF rewards documents ranked by both lists"""
+    fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], [1.0, 1.0], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+
+    fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], [1.0, 0.0], k=60)
+    assert fused[0][0] == "a"
+
+
+def test_hybrid_retriever_finds_ticker_query(tmp_path):
+    """Test hybrid retrieval surfaces exact matches the vector side misses"""
+    texts = {
+        "a_chunk_0": "stocks rally as investors cheer rate cut",
+        "b_chunk_0": "NVDA earnings beat estimates",
+        "c_chunk_0": "storm batters coastal towns",
+    }
+    embedding_model = FakeEmbeddingModel()
+    vector_db = VectorDatabase(embedding_dim=16, index_path=str(tmp_path / "faiss_index"))
+    vector_db.add(embedding_model.encode(list(texts.values())), list(texts))
+    lexical_index = BM25Index()
+    lexical_index.add(list(texts), list(texts.values()))
+
+    retriever = HybridRetriever(embedding_model, vector_db, lexical_index, candidates=3)
+    results = retriever.retrieve("NVDA", top_k=2, similarity_threshold=0.99)
+    assert results[0][0] == "b_chunk_0"
+
+
+def test_hybrid_retriever_drops_common_term_matches(tmp_path):
+    """Test BM25 hits under the score floor are not fused, so nothing relevant raises"""
+    from app.core.exceptions import NoRelevantDocumentsFound
+
+    texts = {f"d{i}_chunk_0": f"the report on topic{i}" for i in range(6)}
+    embedding_model = FakeEmbeddingModel()
+    vector_db = VectorDatabase(embedding_dim=16, index_path=str(tmp_path / "faiss_index"))
+    vector_db.add(embedding_model.encode(list(texts.values())), list(texts))
+    lexical_index = BM25Index()
+    lexical_index.add(list(texts), list(texts.values()))
+
+    retriever = HybridRetriever(embedding_model, vector_db, lexical_index, candidates=6, lexical_min_score=0.5)
+    with pytest.raises(NoRelevantDocumentsFound):
+        retriever.retrieve("the report", top_k=2, similarity_threshold=0.99)
+    assert retriever.retrieve("topic3", top_k=2, similarity_threshold=0.99)[0][0] == "d3_chunk_0"
+
+
+def test_mmr_skips_near_duplicates_and_caps_sources():
+    """Test MMR prefers a distinct chunk over a rewrite and honours the source cap"""
+    from app.rag.diversify import mmr_select
+
+    vectors = np.array([
+        [1.0, 0.0, 0.0],
+        [0.99, 0.1, 0.0],  # rewrite of 0
+        [0.6, 0.8, 0.0],
+        [0.0, 0.6, 0.8],
+    ], dtype=np.float32)
+    relevance = [0.9, 0.89, 0.85, 0.5]
+
+    assert mmr_select(vectors, relevance, k=2, lambda_=1.0) == [0, 1]
+    assert mmr_select(vectors, relevance, k=2, lambda_=0.5) == [0, 2]
+
+    sources = ["wire", "wire", "wire", "local"]
+    assert mmr_select(vectors, relevance, k=3, lambda_=1.0, groups=sources, max_per_group=1) == [0, 3]
+
+
+def test_retriever_diversifies_candidates(tmp_path):
+    """Test retrieval over-fetches and drops a duplicate rewrite"""
+    from app.rag.pipeline import Retriever
+
+    texts = {
+        "a_chunk_0": "fed raises rates by a quarter point",
+        "b_chunk_0": "fed raises rates by quarter point",
+        "c_chunk_0": "fed chair signals more rate rises",
+    }
+    embedding_model = FakeEmbeddingModel()
+    vector_db = VectorDatabase(embedding_dim=16, index_path=str(tmp_path / "faiss_index"))
+    vector_db.add(embedding_model.encode(list(texts.values())), list(texts), sources=["AP", "AP", "Reuters"])
+
+    retriever = Retriever(embedding_model, vector_db, mmr_lambda=0.7, max_per_source=1)
+    results = retriever.retrieve("fed raises rates by a quarter point", top_k=2, similarity_threshold=0.0)
+    assert [doc_id for doc_id, _ in results] == ["a_chunk_0", "c_chunk_0"]
+
+    reloaded = VectorDatabase(embedding_dim=16, index_path=str(tmp_path / "faiss_index"))
+    assert reloaded.doc_sources["c_chunk_0"] == "Reuters"
+    assert np.allclose(reloaded.get_vectors(["b_chunk_0"]), vector_db.get_vectors(["b_chunk_0"]))
+
+
+def test_read_only_replica_refreshes_to_new_generation(tmp_path):
+    """Test a read-only replica swaps in the writer's newer generation"""
+    import os
+    import pytest
+    from app.core.exceptions import VectorDBException
+
+    embedding_model = FakeEmbeddingModel()
+    index_path = str(tmp_path / "faiss_index")
+    writer = VectorDatabase(embedding_dim=16, index_path=index_path)
+    writer.add(embedding_model.encode(["fed raises rates"]), ["a_chunk_0"])  # add() saves
+
+    replica = VectorDatabase(embedding_dim=16, index_path=index_path, read_only=True)
+    assert replica.generation == 1
+    assert replica.refresh() is False
+    with pytest.raises(VectorDBException):
+        replica.add(embedding_model.encode(["oil prices fall"]), ["b_chunk_0"])
+
+    for text, doc_id in [("oil prices fall", "b_chunk_0"), ("chip stocks rally", "c_chunk_0")]:
+        writer.add(embedding_model.encode([text]), [doc_id])
+
+    assert replica.refresh() is True
+    assert replica.generation == 3
+    doc_ids, _ = replica.search(embedding_model.encode(["oil prices fall"])[0], top_k=1)
+    assert doc_ids == ["b_chunk_0"]
+    assert not os.path.exists(f"{index_path}.1")
+    assert os.path.exists(f"{index_path}.2")
+
+
+def test_remove_keeps_documents_saved_by_another_writer(tmp_path):
+    """Test retention compacting a stale copy neither drops nor half-applies another writer's saves"""
+    from app.core.exceptions import VectorDBException
+
+    embedding_model = FakeEmbeddingModel()
+    index_path = str(tmp_path / "faiss_index")
+    lexical_path = str(tmp_path / "bm25.pkl")
+    texts = {"a_chunk_0": "fed raises rates", "b_chunk_0": "oil prices fall", "c_chunk_0": "chip stocks rally"}
+
+    ingestion = VectorDatabase(embedding_dim=16, index_path=index_path)
+    ingestion.add(embedding_model.encode([texts["a_chunk_0"]]), ["a_chunk_0"])
+    ingestion_lexical = BM25Index()
+    ingestion_lexical.add_and_save(lexical_path, ["a_chunk_0"], [texts["a_chunk_0"]])
+
+    retention = VectorDatabase(embedding_dim=16, index_path=index_path)
+    retention_lexical = BM25Index.load(lexical_path)
+
+    # The ingestion process saves after retention loaded the indexes
+    for doc_id in ("b_chunk_0", "c_chunk_0"):
+        ingestion.add(embedding_model.encode([texts[doc_id]]), [doc_id])
+        ingestion_lexical.add_and_save(lexical_path, [doc_id], [texts[doc_id]])
+
+    assert retention.remove(["a_chunk_0"]) == 1
+    assert retention.generation == 4
+    assert sorted(VectorDatabase(embedding_dim=16, index_path=index_path).doc_id_map.values()) == ["b_chunk_0", "c_chunk_0"]
+    assert retention_lexical.remove(["a_chunk_0"]) == 1
+    retention_lexical.save(lexical_path)
+    assert sorted(BM25Index.load(lexical_path).doc_ids) == ["b_chunk_0", "c_chunk_0"]
+
+    # A writer that cannot catch up fails without swapping in the compacted index
+    stale = VectorDatabase(embedding_dim=16, index_path=index_path)
+    stale.add(embedding_model.encode(["gold hits record"]), ["d_chunk_0"], save=False)
+    ingestion_writer = VectorDatabase(embedding_dim=16, index_path=index_path)
+    ingestion_writer.add(embedding_model.encode(["bonds slip"]), ["e_chunk_0"])
+    with pytest.raises(VectorDBException):
+        stale.remove(["b_chunk_0"])
+    assert (len(stale), stale.generation) == (3, 4)
+
+
+class FakeCrossEncoder:
+    """Scores pairs by query-word overlap, optionally slowly"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, pairs):
+        import time
+        self.calls += 1
+        time.sleep(self.delay)
+        return [len(set(q.split()) & set(t.split())) for q, t in pairs]
+
+
+def test_cross_encoder_reranks_and_caches():
+    """Test cross-encoder order replaces bi-encoder order and scores are cached"""
+    from app.rag.rerank import CrossEncoderReranker
+
+    texts = {"a": "rates unchanged", "b": "fed raises rates today", "c": "fed raises"}
+    model = FakeCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, text_lookup=lambda ids: {i: texts[i] for i in ids})
+
+    results = [("a", 0.9), ("c", 0.8), ("b", 0.7)]
+    assert [doc_id for doc_id, _ in reranker.rerank("fed raises rates", results)] == ["b", "c", "a"]
+    assert reranker.rerank("Fed  raises rates", results)[0][0] == "b"
+    assert model.calls == 1
+
+
+def test_cross_encoder_falls_back_when_over_budget():
+    """Test re-ranking is skipped when the budget cannot cover the batch"""
+    from app.rag.rerank import CrossEncoderReranker
+
+    texts = {"a": "rates unchanged", "b": "fed raises rates today"}
+    reranker = CrossEncoderReranker(
+        model=FakeCrossEncoder(delay=0.05), text_lookup=lambda ids: {i: texts[i] for i in ids}
+    )
+
+    # Estimate says it fits, the model overruns: fall back, cache filled later
+    assert reranker.rerank("fed raises rates", [("a", 0.9), ("b", 0.7)], budget_ms=20) is None
+    # The measured cost now rules out scoring within a small budget
+    reranker._executor.shutdown(wait=True)
+    assert reranker.ms_per_pair > 5.0
+    assert reranker.rerank("other query", [("a", 0.9), ("b", 0.7)], budget_ms=1) is None
+
+
+def test_cross_encoder_keeps_unscored_candidates_and_survives_errors():
+    """Test candidates past the budget follow the scored ones and model errors fall back"""
+    from app.rag.rerank import CrossEncoderReranker
+
+    texts = {"a": "rates unchanged", "b": "fed raises rates today", "c": "fed raises", "d": "storm"}
+    reranker = CrossEncoderReranker(
+        model=FakeCrossEncoder(), text_lookup=lambda ids: {i: texts[i] for i in ids if i != "d"}, top_n=3
+    )
+    reranker.ms_per_pair = 10.0
+    results = [("a", 0.9), ("c", 0.8), ("b", 0.7), ("d", 0.6), ("e", 0.5)]
+    reranked = reranker.rerank("fed raises rates", results, budget_ms=25)  # two pairs fit
+    assert [doc_id for doc_id, _ in reranked] == ["c", "a", "b", "d", "e"]
+    assert [score for _, score in reranked] == sorted((score for _, score in reranked), reverse=True)
+
+    class BrokenCrossEncoder:
+        def predict(self, pairs):
+            raise RuntimeError("model crashed")
+
+    reranker = CrossEncoderReranker(model=BrokenCrossEncoder(), text_lookup=lambda ids: {i: texts[i] for i in ids})
+    assert reranker.rerank("fed raises rates", results[:3]) is None
+    assert reranker.pending_pairs == 0
+
+
+def test_retrieval_sidecar_matches_local_retriever(tmp_path):
+    """Test the sidecar RPC returns the in-process retriever's results and errors"""
+    import asyncio
+    import threading
+    import pytest
+    from app.core.exceptions import NoRelevantDocumentsFound
+    from app.rag.pipeline import Retriever
+    from app.rag.sidecar import (
+        BatchingEncoder, RemoteEmbeddingModel, RemoteRetriever, RetrievalClient, RetrievalServer
+    )
+
+    texts = {
+        "a_chunk_0": "fed raises rates by a quarter point",
+        "c_chunk_0": "fed chair signals more rate rises",
+    }
+    embedding_model = FakeEmbeddingModel()
+    vector_db = VectorDatabase(embedding_dim=16, index_path=str(tmp_path / "faiss_index"))
+    vector_db.add(embedding_model.encode(list(texts.values())), list(texts))
+    local = Retriever(embedding_model, vector_db, mmr_lambda=None)
+
+    encoder = BatchingEncoder(embedding_model, wait_ms=20)
+    server = RetrievalServer(Retriever(encoder, vector_db, mmr_lambda=None), socket_path=str(tmp_path / "r.sock"))
+    stop = threading.Event()
+
+    async def serve():
+        serving = asyncio.create_task(server.serve_forever())
+        await asyncio.get_running_loop().run_in_executor(None, stop.wait)
+        serving.cancel()
+
+    server_thread = threading.Thread(target=asyncio.run, args=(serve(),))
+    server_thread.start()
+
+    client = RetrievalClient(socket_path=str(tmp_path / "r.sock"), pool_size=4)
+    assert client.wait_until_ready(timeout=5)["vectors"] == 2
+    remote = RemoteRetriever(client)
+    assert remote.reranks is False
+
+    query = "fed raises rates"
+    expected = local.retrieve(query, top_k=2, similarity_threshold=0.0)
+    results = remote.retrieve(query, top_k=2, similarity_threshold=0.0)
+    assert [doc_id for doc_id, _ in results] == [doc_id for doc_id, _ in expected]
+    assert np.allclose([s for _, s in results], [s for _, s in expected], atol=1e-6)
+
+    with pytest.raises(NoRelevantDocumentsFound):
+        remote.retrieve(query, top_k=2, similarity_threshold=2.0)
+
+    # Concurrent embeds share model calls
+    remote_model = RemoteEmbeddingModel(client)
+    batches_before = encoder.batches
+    threads = [threading.Thread(target=remote_model.encode, args=([f"text {i}"],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert encoder.batches - batches_before < 4
+    assert np.allclose(remote_model.encode([query]), embedding_model.encode([query]))
+    assert remote_model.dimension == 16
+
+    stop.set()
+    server_thread.join()
+    server.close()
+    encoder.close()
+
+
+def test_retrieval_sidecar_follows_writer_generations(tmp_path, monkeypatch):
+    """Test the sidecar opens the index read-only and serves what ingestion saves later"""
+    import asyncio
+    import threading
+    from app.core.config import settings
+    from app.core.exceptions import NoRelevantDocumentsFound
+    from app.rag import pipeline as rag_pipeline
+    from app.rag.sidecar import RemoteRetriever, RetrievalClient, build_server
+
+    index_path = str(tmp_path / "faiss_index")
+    lexical_path = str(tmp_path / "bm25.pkl")
+    for name, value in [("VECTOR_DB_PATH", index_path), ("LEXICAL_INDEX_PATH", lexical_path),
+                        ("RETRIEVAL_MODE", "hybrid"), ("RERANK_ENABLED", False),
+                        ("VECTOR_DB_READ_ONLY", False), ("VECTOR_DB_REFRESH_SECONDS", 0.0)]:
+        monkeypatch.setattr(settings, name, value)
+    for name in ["embedding_model", "vector_db", "lexical_index", "retriever"]:
+        monkeypatch.setattr(rag_pipeline, name, getattr(rag_pipeline, name))
+    embedding_model = FakeEmbeddingModel(dim=384)
+    monkeypatch.setattr(rag_pipeline, "load_embedding_model", lambda: setattr(rag_pipeline, "embedding_model", embedding_model))
+
+    # The ingestion process owns the writable index
+    texts = {"a_chunk_0": "fed raises rates", "c_chunk_0": "storm batters coast", "d_chunk_0": "markets rally"}
+    writer = VectorDatabase(embedding_dim=384, index_path=index_path)
+    writer.add(embedding_model.encode(list(texts.values())), list(texts))
+    writer_lexical = BM25Index()
+    writer_lexical.add_and_save(lexical_path, list(texts), list(texts.values()))
+
+    server = build_server(str(tmp_path / "r.sock"))
+    assert rag_pipeline.vector_db.read_only and rag_pipeline.lexical_index.read_only
+    stop = threading.Event()
+
+    async def serve():
+        serving = asyncio.create_task(server.serve_forever())
+        await asyncio.get_running_loop().run_in_executor(None, stop.wait)
+        serving.cancel()
+
+    server_thread = threading.Thread(target=asyncio.run, args=(serve(),))
+    server_thread.start()
+    try:
+        client = RetrievalClient(socket_path=str(tmp_path / "r.sock"), pool_size=2)
+        client.wait_until_ready(timeout=5)
+        remote = RemoteRetriever(client)
+        with pytest.raises(NoRelevantDocumentsFound):
+            remote.retrieve("typhoon", top_k=2, similarity_threshold=0.99)
+
+        writer.add(embedding_model.encode(["typhoon nears coast"]), ["t_chunk_0"])
+        writer_lexical.add_and_save(lexical_path, ["t_chunk_0"], ["typhoon nears coast"], compact_ratio=1.0)
+        assert remote.retrieve("typhoon", top_k=2, similarity_threshold=0.99)[0][0] == "t_chunk_0"
+        assert rag_pipeline.vector_db.generation == writer.generation
+        assert rag_pipeline.lexical_index.doc_ids == writer_lexical.doc_ids
+    finally:
+        stop.set()
+        server_thread.join()
+        server.close()
+        rag_pipeline.retriever.embedding_model.close()
+
+
+def test_sharded_search_matches_single_index_and_drops_old_shards(tmp_path):
+    """Test scatter-gather over time shards equals one index and old shards drop"""
+    from datetime import datetime, timedelta
+    from app.rag.shards import ShardedVectorDatabase
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((60, 16)).astype(np.float32)
+    doc_ids = [f"a{i}_chunk_0" for i in range(60)]
+    now = datetime(2026, 10, 19)
+    timestamps = [now - timedelta(days=i % 30) for i in range(60)]
+
+    single = VectorDatabase(embedding_dim=16, index_path=str(tmp_path / "single" / "faiss_index"))
+    single.add(vectors, doc_ids, sources=["AP"] * 60)
+    sharded = ShardedVectorDatabase(
+        embedding_dim=16, base_path=str(tmp_path / "faiss_index"), scheme="time", shard_days=7
+    )
+    positions = sharded.add(vectors, doc_ids, sources=["AP"] * 60, timestamps=timestamps)
+    assert len(sharded.shard_keys) > 1 and len(sharded) == 60
+    assert positions[0].startswith(sharded.shard_key(doc_ids[0], timestamps[0]))
+
+    for query in vectors[:5] + 0.1:
+        expected_ids, expected_scores = single.search(query, top_k=10)
+        doc_ids_found, scores = sharded.search(query, top_k=10)
+        assert doc_ids_found == expected_ids
+        assert np.allclose(scores, expected_scores)
+    assert np.allclose(sharded.get_vectors(doc_ids[:3]), vectors[:3])
+    assert sharded.get_sources(["a1_chunk_0", "missing"]) == ["AP", None]
+
+    dropped = sharded.drop_shards_before(now - timedelta(days=14))
+    assert dropped and all(key not in sharded.shard_keys for key in dropped)
+    remaining = set(sharded.search(vectors[29], top_k=60)[0])
+    assert "a29_chunk_0" not in remaining and "a0_chunk_0" in remaining
+
+    reopened = ShardedVectorDatabase(
+        embedding_dim=16, base_path=str(tmp_path / "faiss_index"), scheme="time", shard_days=7, read_only=True
+    )
+    assert reopened.shard_keys == sharded.shard_keys and len(reopened) == len(sharded)